@@ -0,0 +1,9 @@
+from pydantic import BaseModel, Field
+
+from app.core.env import CHAT_BATCH_MAX_QUERIES
+
+
+class ChatBatchRequestModel(BaseModel):
+    name: str
+    queries: list[str] = Field(min_length=1, max_length=CHAT_BATCH_MAX_QUERIES)
+    concurrency: int | None = Field(default=None, ge=1, le=64)
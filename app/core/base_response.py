@@ -6,5 +6,21 @@ class BaseResponseModel(BaseModel):
     detail: str
 
 
+class ChatResponseModel(BaseResponseModel):
+    sources: list[str] = []
+
+
 class ListResponseModel(BaseResponseModel):
     data: list[str]
+
+
+class StatsResponseModel(BaseResponseModel):
+    data: dict[str, dict[str, int]]
+
+
+class JobResponseModel(BaseResponseModel):
+    job_id: str | None = None
+
+
+class JobStatusResponseModel(BaseResponseModel):
+    data: dict[str, str | int | float | None]
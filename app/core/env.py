@@ -8,3 +8,95 @@ CLOVASTUDIO_API_TOKEN = os.environ.get("CLOVASTUDIO_API_TOKEN")
 LANGFUSE_PUBLIC_KEY = os.environ.get("LANGFUSE_PUBLIC_KEY")
 LANGFUSE_SECRET_KEY = os.environ.get("LANGFUSE_SECRET_KEY")
 LANGFUSE_HOST = os.environ.get("LANGFUSE_HOST")
+
+# 로드된 벡터 스토어 캐시 설정 (개수, 메모리 상한)
+VECTOR_STORE_CACHE_SIZE = int(os.environ.get("VECTOR_STORE_CACHE_SIZE", "8"))
+VECTOR_STORE_CACHE_MAX_BYTES = int(
+    os.environ.get("VECTOR_STORE_CACHE_MAX_BYTES", str(1024 * 1024 * 1024))
+)
+
+# 업로드 임베딩 배치/동시성/재시도 설정
+EMBEDDING_BATCH_SIZE = int(os.environ.get("EMBEDDING_BATCH_SIZE", "16"))
+EMBEDDING_CONCURRENCY = int(os.environ.get("EMBEDDING_CONCURRENCY", "4"))
+EMBEDDING_MAX_RETRIES = int(os.environ.get("EMBEDDING_MAX_RETRIES", "5"))
+EMBEDDING_RETRY_BASE_DELAY = float(os.environ.get("EMBEDDING_RETRY_BASE_DELAY", "1.0"))
+
+# 청크 임베딩 캐시 최대 항목 수
+EMBEDDING_CACHE_MAX_ENTRIES = int(
+    os.environ.get("EMBEDDING_CACHE_MAX_ENTRIES", "500000")
+)
+
+# PDF 파싱 등 CPU 작업을 처리할 프로세스 풀 크기
+INGEST_WORKERS = int(os.environ.get("INGEST_WORKERS", str(os.cpu_count() or 1)))
+
+# 동시에 처리할 업로드(인제스트) 작업 수
+INGEST_JOB_CONCURRENCY = int(os.environ.get("INGEST_JOB_CONCURRENCY", "2"))
+
+# 업로드 파일 최대 크기 (바이트)
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_BYTES", str(200 * 1024 * 1024)))
+
+# 채팅 세션 히스토리 저장소 설정 (memory 또는 sqlite)
+SESSION_BACKEND = os.environ.get("SESSION_BACKEND", "memory")
+SESSION_MAX_SESSIONS = int(os.environ.get("SESSION_MAX_SESSIONS", "10000"))
+SESSION_MAX_TURNS = int(os.environ.get("SESSION_MAX_TURNS", "20"))
+SESSION_TTL_SECONDS = int(os.environ.get("SESSION_TTL_SECONDS", str(24 * 60 * 60)))
+
+# 질문-답변 캐시 설정 (유사도 0이면 정규화된 질문이 같을 때만 적중)
+ANSWER_CACHE_SIZE = int(os.environ.get("ANSWER_CACHE_SIZE", "1024"))
+ANSWER_CACHE_TTL_SECONDS = int(os.environ.get("ANSWER_CACHE_TTL_SECONDS", "3600"))
+ANSWER_CACHE_SIMILARITY = float(os.environ.get("ANSWER_CACHE_SIMILARITY", "0"))
+
+# 질문 임베딩 LRU 크기와 외부 API 연결 유지(keep-alive) 주기 (0이면 사용 안 함)
+QUERY_EMBEDDING_CACHE_SIZE = int(os.environ.get("QUERY_EMBEDDING_CACHE_SIZE", "1024"))
+KEEP_WARM_INTERVAL_SECONDS = int(os.environ.get("KEEP_WARM_INTERVAL_SECONDS", "0"))
+
+# 검색 방식 (vector, bm25, hybrid)과 반환할 청크 수
+RETRIEVAL_MODE = os.environ.get("RETRIEVAL_MODE", "hybrid")
+RETRIEVAL_K = int(os.environ.get("RETRIEVAL_K", "4"))
+
+# FAISS 인덱스 종류 (auto, flat, hnsw, ivfpq, sq8)와 auto 선택 기준 청크 수
+VECTOR_INDEX_TYPE = os.environ.get("VECTOR_INDEX_TYPE", "auto")
+VECTOR_INDEX_FLAT_MAX = int(os.environ.get("VECTOR_INDEX_FLAT_MAX", "20000"))
+VECTOR_INDEX_HNSW_MAX = int(os.environ.get("VECTOR_INDEX_HNSW_MAX", "200000"))
+
+# 근사 검색 정확도/속도 조절 값 (HNSW efSearch, IVF nprobe)
+VECTOR_INDEX_EF_SEARCH = int(os.environ.get("VECTOR_INDEX_EF_SEARCH", "64"))
+VECTOR_INDEX_NPROBE = int(os.environ.get("VECTOR_INDEX_NPROBE", "16"))
+
+# PDF 텍스트 추출 백엔드 (auto, pypdfium2, pypdf2, pdfminer)
+PDF_BACKEND = os.environ.get("PDF_BACKEND", "auto")
+
+# 청크 크기와 겹침 (모델 토큰 수 기준, 업로드마다 지정 가능)
+CHUNK_TOKENS = int(os.environ.get("CHUNK_TOKENS", "256"))
+CHUNK_OVERLAP_TOKENS = int(os.environ.get("CHUNK_OVERLAP_TOKENS", "32"))
+
+# 프롬프트 컨텍스트 구성 (검색 후보 수, 토큰 예산, MMR 관련도 가중치, 0~1)
+CONTEXT_CANDIDATES = int(os.environ.get("CONTEXT_CANDIDATES", "12"))
+CONTEXT_TOKEN_BUDGET = int(os.environ.get("CONTEXT_TOKEN_BUDGET", "768"))
+CONTEXT_MMR_LAMBDA = float(os.environ.get("CONTEXT_MMR_LAMBDA", "0.7"))
+
+# 모델 백엔드 (clovax, fake)와 가짜 모델 지연 설정 (네트워크 없는 부하 테스트/CI용)
+LLM_BACKEND = os.environ.get("LLM_BACKEND", "clovax")
+FAKE_LLM_FIRST_TOKEN_MS = float(os.environ.get("FAKE_LLM_FIRST_TOKEN_MS", "300"))
+FAKE_LLM_TOKENS_PER_SECOND = float(os.environ.get("FAKE_LLM_TOKENS_PER_SECOND", "50"))
+FAKE_EMBEDDING_LATENCY_MS = float(os.environ.get("FAKE_EMBEDDING_LATENCY_MS", "50"))
+
+# 운영 실행(serve.py) 주소와 워커 프로세스 수
+SERVER_HOST = os.environ.get("SERVER_HOST", "0.0.0.0")
+SERVER_PORT = int(os.environ.get("SERVER_PORT", "8000"))
+SERVER_WORKERS = int(os.environ.get("SERVER_WORKERS", str(os.cpu_count() or 1)))
+
+# ClovaX 호출 동시 실행 수, 대기열 길이와 대기 시간(초), 초당 호출 수(0이면 제한 없음)
+LLM_MAX_IN_FLIGHT = int(os.environ.get("LLM_MAX_IN_FLIGHT", "8"))
+LLM_MAX_QUEUE = int(os.environ.get("LLM_MAX_QUEUE", "64"))
+LLM_QUEUE_TIMEOUT_SECONDS = float(os.environ.get("LLM_QUEUE_TIMEOUT_SECONDS", "10"))
+LLM_RATE_PER_SECOND = float(os.environ.get("LLM_RATE_PER_SECOND", "0"))
+LLM_RATE_BURST = int(os.environ.get("LLM_RATE_BURST", "8"))
+
+# ClovaX 요청 한도 초과(429)/서버 오류 재시도 횟수와 기본 대기 시간(초)
+LLM_MAX_RETRIES = int(os.environ.get("LLM_MAX_RETRIES", "3"))
+LLM_RETRY_BASE_DELAY = float(os.environ.get("LLM_RETRY_BASE_DELAY", "0.5"))
+
+# /chat/batch 한 요청의 최대 질문 수와 동시에 생성할 답변 수
+CHAT_BATCH_MAX_QUERIES = int(os.environ.get("CHAT_BATCH_MAX_QUERIES", "1000"))
+CHAT_BATCH_CONCURRENCY = int(os.environ.get("CHAT_BATCH_CONCURRENCY", "4"))
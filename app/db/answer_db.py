@@ -0,0 +1,155 @@
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+
+import numpy as np
+
+from app.core.env import (
+    ANSWER_CACHE_SIMILARITY,
+    ANSWER_CACHE_SIZE,
+    ANSWER_CACHE_TTL_SECONDS,
+)
+from app.utils.langchain_util import get_embedding
+from app.utils.metrics_util import timed
+
+# 전체 문서 검색 답변을 저장할 때 사용하는 safe_name
+ALL_DOCUMENTS = "*"
+
+# (safe_name, 정규화된 질문) -> (저장 시각, 답변, 정규화된 질문 벡터, 출처 문서 이름)
+answer_cache: OrderedDict[
+    tuple[str, str], tuple[float, str, np.ndarray | None, list[str]]
+] = OrderedDict()
+answer_cache_stats = {"hits": 0, "similar_hits": 0, "misses": 0, "evictions": 0}
+
+TRAILING_PUNCTUATION = re.compile(r"[\s?!.,~]+$")
+WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """캐시 키로 사용할 수 있도록 질문을 정규화
+
+    Args:
+        query (str): 질문
+
+    Returns:
+        str: 유니코드 정규화, 소문자화, 공백/끝 문장부호 정리를 거친 질문
+    """
+    query = unicodedata.normalize("NFKC", query).lower()
+    query = TRAILING_PUNCTUATION.sub("", query)
+    return WHITESPACE.sub(" ", query).strip()
+
+
+async def embed_normalized_query(normalized: str) -> np.ndarray:
+    """정규화된 질문을 단위 벡터로 임베딩하는 함수
+
+    Args:
+        normalized (str): 정규화된 질문
+
+    Returns:
+        np.ndarray: L2 정규화된 float32 벡터
+    """
+    embedding = await get_embedding()
+    vector = np.asarray(await embedding.aembed_query(normalized), dtype=np.float32)
+    return vector / (np.linalg.norm(vector) or 1.0)
+
+
+@timed("answer_cache.find")
+async def find_answer(safe_name: str, query: str) -> tuple[str, list[str]] | None:
+    """캐시된 답변을 찾는 함수
+
+    정규화된 질문이 같으면 바로 반환하고, ANSWER_CACHE_SIMILARITY가 설정되어
+    있으면 같은 문서에 대한 질문 중 코사인 유사도가 임계값 이상인 답변을 반환합니다.
+
+    Args:
+        safe_name (str): 문서의 안전한 이름
+        query (str): 질문
+
+    Returns:
+        tuple[str, list[str]] | None: 캐시된 답변과 출처 문서 이름, 없으면 None
+    """
+    normalized = normalize_query(query)
+    key = (safe_name, normalized)
+    expire_before = time.time() - ANSWER_CACHE_TTL_SECONDS
+
+    entry = answer_cache.get(key)
+    if entry is not None and entry[0] >= expire_before:
+        answer_cache.move_to_end(key)
+        answer_cache_stats["hits"] += 1
+        return entry[1], entry[3]
+
+    if ANSWER_CACHE_SIMILARITY > 0:
+        candidates = [
+            (k, v)
+            for k, v in answer_cache.items()
+            if k[0] == safe_name and v[0] >= expire_before and v[2] is not None
+        ]
+        if candidates:
+            vector = await embed_normalized_query(normalized)
+            scores = np.stack([v[2] for _, v in candidates]) @ vector
+            best = int(np.argmax(scores))
+            if scores[best] >= ANSWER_CACHE_SIMILARITY:
+                best_key, best_entry = candidates[best]
+                answer_cache.move_to_end(best_key)
+                answer_cache_stats["similar_hits"] += 1
+                return best_entry[1], best_entry[3]
+
+    answer_cache_stats["misses"] += 1
+    return None
+
+
+async def save_answer(
+    safe_name: str, query: str, answer: str, sources: list[str] | None = None
+) -> None:
+    """답변을 캐시에 저장하고 만료/초과 항목을 제거하는 함수
+
+    Args:
+        safe_name (str): 문서의 안전한 이름 (전체 문서 검색이면 ALL_DOCUMENTS)
+        query (str): 질문
+        answer (str): 답변
+        sources (list[str] | None): 답변에 사용된 출처 문서 이름
+    """
+    if ANSWER_CACHE_SIZE <= 0 or not answer:
+        return
+
+    normalized = normalize_query(query)
+    vector = None
+    if ANSWER_CACHE_SIMILARITY > 0:
+        vector = await embed_normalized_query(normalized)
+
+    key = (safe_name, normalized)
+    answer_cache.pop(key, None)
+    answer_cache[key] = (time.time(), answer, vector, sources or [])
+
+    expire_before = time.time() - ANSWER_CACHE_TTL_SECONDS
+    while answer_cache and (
+        len(answer_cache) > ANSWER_CACHE_SIZE
+        or next(iter(answer_cache.values()))[0] < expire_before
+    ):
+        answer_cache.popitem(last=False)
+        answer_cache_stats["evictions"] += 1
+
+
+def invalidate_answers(safe_name: str) -> None:
+    """문서가 삭제되거나 다시 업로드되었을 때 해당 문서의 답변을 제거하는 함수
+
+    전체 문서 검색 답변은 어떤 문서가 바뀌어도 달라질 수 있으므로 함께 제거합니다.
+
+    Args:
+        safe_name (str): 문서의 안전한 이름
+    """
+    for key in [key for key in answer_cache if key[0] in (safe_name, ALL_DOCUMENTS)]:
+        del answer_cache[key]
+
+
+def get_answer_cache_stats() -> dict[str, int]:
+    """답변 캐시 통계를 반환하는 함수
+
+    Returns:
+        dict[str, int]: 적중/유사 적중/미스/제거 횟수와 현재 항목 수
+    """
+    return {
+        **answer_cache_stats,
+        "entries": len(answer_cache),
+        "max_entries": ANSWER_CACHE_SIZE,
+    }
@@ -0,0 +1,123 @@
+import json
+import sqlite3
+import threading
+
+from langchain_core.documents import Document
+
+CHUNK_DB_FILE_NAME = "chunks.sqlite3"
+
+
+class ChunkStore:
+    """벡터 스토어의 청크 텍스트와 메타데이터를 저장하는 SQLite 저장소
+
+    청크 ID는 FAISS 인덱스(IndexIDMap)에 함께 저장되는 ID와 같으며, 검색 결과로
+    받은 ID의 청크만 필요할 때 읽습니다. 재업로드 시 바뀐 페이지만 다시 임베딩할
+    수 있도록 페이지별 내용 해시도 함께 저장합니다.
+    """
+
+    def __init__(self, path: str):
+        self.lock = threading.Lock()
+
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunk ("
+            "id INTEGER PRIMARY KEY, content TEXT NOT NULL, metadata TEXT NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS page ("
+            "page INTEGER PRIMARY KEY, hash TEXT NOT NULL)"
+        )
+
+    def add(self, documents: list[Document]) -> list[int]:
+        with self.lock, self.conn:
+            start = self.conn.execute(
+                "SELECT COALESCE(MAX(id), -1) + 1 FROM chunk"
+            ).fetchone()[0]
+            ids = list(range(start, start + len(documents)))
+            self.conn.executemany(
+                "INSERT INTO chunk (id, content, metadata) VALUES (?, ?, ?)",
+                [
+                    (
+                        chunk_id,
+                        document.page_content,
+                        json.dumps(document.metadata, ensure_ascii=False),
+                    )
+                    for chunk_id, document in zip(ids, documents)
+                ],
+            )
+        return ids
+
+    def get(self, ids: list[int]) -> list[Document]:
+        if not ids:
+            return []
+
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT id, content, metadata FROM chunk "
+                f"WHERE id IN ({', '.join('?' * len(ids))})",
+                ids,
+            ).fetchall()
+
+        documents = {
+            chunk_id: Document(page_content=content, metadata=json.loads(metadata))
+            for chunk_id, content, metadata in rows
+        }
+        # 요청한 ID 순서(관련도 순)를 유지합니다.
+        return [documents[chunk_id] for chunk_id in ids if chunk_id in documents]
+
+    def delete(self, ids: list[int]) -> None:
+        with self.lock, self.conn:
+            self.conn.executemany("DELETE FROM chunk WHERE id = ?", [(i,) for i in ids])
+
+    def ids_by_page(self) -> dict[int, list[int]]:
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT id, json_extract(metadata, '$.page') FROM chunk ORDER BY id"
+            ).fetchall()
+
+        pages: dict[int, list[int]] = {}
+        for chunk_id, page in rows:
+            pages.setdefault(page, []).append(chunk_id)
+        return pages
+
+    def set_pages(self, pages: list[tuple[int, int]]) -> None:
+        # (청크 ID, 새 페이지 번호) 리스트로 페이지가 옮겨진 청크의 메타데이터를 고칩니다.
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "UPDATE chunk SET metadata = json_set(metadata, '$.page', ?) "
+                "WHERE id = ?",
+                [(page, chunk_id) for chunk_id, page in pages],
+            )
+
+    def page_hashes(self) -> dict[int, str]:
+        with self.lock:
+            return dict(self.conn.execute("SELECT page, hash FROM page"))
+
+    def set_page_hashes(self, hashes: list[str]) -> None:
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM page")
+            self.conn.executemany(
+                "INSERT INTO page (page, hash) VALUES (?, ?)",
+                [(page, page_hash) for page, page_hash in enumerate(hashes, start=1)],
+            )
+
+    def copy_to(self, path: str) -> None:
+        # 다른 연결이 열려 있어도 일관된 사본을 만들도록 SQLite 백업 API를 사용합니다.
+        target = sqlite3.connect(path)
+        try:
+            with self.lock:
+                self.conn.backup(target)
+        finally:
+            target.close()
+
+    def texts(self) -> list[tuple[int, str]]:
+        with self.lock:
+            return self.conn.execute(
+                "SELECT id, content FROM chunk ORDER BY id"
+            ).fetchall()
+
+    def close(self) -> None:
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,197 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+
+from app.core.env import EMBEDDING_CACHE_MAX_ENTRIES
+
+# 임베딩 캐시 파일은 이 스크립트와 같은 디렉토리에 생성됩니다.
+EMBEDDING_DB_PATH = os.path.join(os.path.dirname(__file__), "embedding_cache.sqlite3")
+
+# 조회 시각은 모아 두었다가 이 개수가 되거나 저장할 때 한 번에 기록합니다.
+ACCESS_FLUSH_SIZE = 1000
+# 최대 항목 수를 넘으면 이 비율만큼 여유를 두고 한 번에 제거합니다.
+EVICTION_HEADROOM = 0.05
+
+connection: sqlite3.Connection | None = None
+connection_lock = threading.Lock()
+embedding_cache_stats = {"hits": 0, "misses": 0, "evictions": 0}
+# 저장된 항목 수 (처음 필요할 때 COUNT(*)로 읽고 이후에는 저장/제거할 때 갱신)
+entry_count: int | None = None
+# 아직 기록하지 않은 조회 시각 (키 -> 시각)
+pending_access: dict[str, float] = {}
+
+
+def get_connection() -> sqlite3.Connection:
+    """임베딩 캐시 SQLite 연결을 반환합니다.
+
+    Returns:
+        WAL 모드로 열린 SQLite 연결입니다.
+    """
+    global connection
+
+    if connection is None:
+        conn = sqlite3.connect(EMBEDDING_DB_PATH, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS embedding ("
+            "key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_access REAL NOT NULL)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS embedding_last_access "
+            "ON embedding (last_access)"
+        )
+        connection = conn
+
+    return connection
+
+
+def make_embedding_key(text: str, model: str, dimensions: int) -> str:
+    """청크 텍스트와 임베딩 모델/차원으로 캐시 키를 만듭니다.
+
+    Args:
+        text: 청크 텍스트입니다.
+        model: 임베딩 모델 이름입니다.
+        dimensions: 임베딩 차원입니다.
+
+    Returns:
+        sha256 해시 문자열입니다.
+    """
+    return hashlib.sha256(f"{model}\0{dimensions}\0{text}".encode()).hexdigest()
+
+
+def select_embeddings(keys: list[str]) -> dict[str, list[float]]:
+    """캐시에 저장된 임베딩을 조회합니다.
+
+    Args:
+        keys: 조회할 캐시 키 리스트입니다.
+
+    Returns:
+        찾은 키와 벡터의 딕셔너리입니다.
+    """
+    found: dict[str, list[float]] = {}
+    unique_keys = list(dict.fromkeys(keys))
+
+    with connection_lock:
+        conn = get_connection()
+        # SQLite 변수 개수 제한을 넘지 않도록 나누어 조회합니다.
+        for i in range(0, len(unique_keys), 500):
+            part = unique_keys[i : i + 500]
+            placeholders = ",".join("?" * len(part))
+            for key, blob in conn.execute(
+                f"SELECT key, vector FROM embedding WHERE key IN ({placeholders})",
+                part,
+            ):
+                found[key] = array("f", blob).tolist()
+
+        if found:
+            now = time.time()
+            pending_access.update((key, now) for key in found)
+            if len(pending_access) >= ACCESS_FLUSH_SIZE:
+                with conn:
+                    flush_access(conn)
+
+        hits = sum(1 for key in keys if key in found)
+        embedding_cache_stats["hits"] += hits
+        embedding_cache_stats["misses"] += len(keys) - hits
+
+    return found
+
+
+def flush_access(conn: sqlite3.Connection) -> None:
+    """모아 둔 조회 시각을 기록합니다. (connection_lock을 잡은 상태에서 호출)
+
+    Args:
+        conn: 임베딩 캐시 SQLite 연결입니다.
+    """
+    if pending_access:
+        conn.executemany(
+            "UPDATE embedding SET last_access = ? WHERE key = ?",
+            [(now, key) for key, now in pending_access.items()],
+        )
+        pending_access.clear()
+
+
+def evict_embeddings(conn: sqlite3.Connection) -> None:
+    """최대 항목 수를 넘은 만큼과 여유분을 오래 조회되지 않은 순서로 제거합니다.
+
+    다른 워커 프로세스가 저장한 항목도 있을 수 있으므로 제거 전에 항목 수를
+    다시 읽습니다. (connection_lock을 잡은 상태에서 호출)
+
+    Args:
+        conn: 임베딩 캐시 SQLite 연결입니다.
+    """
+    global entry_count
+
+    (entry_count,) = conn.execute("SELECT COUNT(*) FROM embedding").fetchone()
+    overflow = entry_count - EMBEDDING_CACHE_MAX_ENTRIES
+    if overflow <= 0:
+        return
+
+    overflow += int(EMBEDDING_CACHE_MAX_ENTRIES * EVICTION_HEADROOM)
+    cursor = conn.execute(
+        "DELETE FROM embedding WHERE key IN ("
+        "SELECT key FROM embedding ORDER BY last_access LIMIT ?)",
+        (overflow,),
+    )
+    entry_count -= cursor.rowcount
+    embedding_cache_stats["evictions"] += cursor.rowcount
+
+
+def insert_embeddings(items: dict[str, list[float]]) -> None:
+    """임베딩을 캐시에 저장하고 최대 항목 수를 넘으면 오래된 항목을 제거합니다.
+
+    항목 수는 저장할 때마다 세지 않고 따로 세어 두며, 최대 항목 수를 넘었을
+    때만 여유분까지 한 번에 제거합니다.
+
+    Args:
+        items: 캐시 키와 벡터의 딕셔너리입니다.
+    """
+    global entry_count
+
+    if not items:
+        return
+
+    now = time.time()
+    with connection_lock:
+        conn = get_connection()
+        if entry_count is None:
+            (entry_count,) = conn.execute("SELECT COUNT(*) FROM embedding").fetchone()
+
+        with conn:
+            # 같은 키는 같은 텍스트/모델/차원이므로 벡터는 그대로 두고 조회 시각만 갱신합니다.
+            cursor = conn.executemany(
+                "INSERT OR IGNORE INTO embedding (key, vector, last_access) "
+                "VALUES (?, ?, ?)",
+                [(key, array("f", v).tobytes(), now) for key, v in items.items()],
+            )
+            entry_count += cursor.rowcount
+            if cursor.rowcount < len(items):
+                pending_access.update((key, now) for key in items)
+            flush_access(conn)
+
+            if entry_count > EMBEDDING_CACHE_MAX_ENTRIES:
+                evict_embeddings(conn)
+
+
+def get_embedding_cache_stats() -> dict[str, int]:
+    """임베딩 캐시 통계를 반환합니다.
+
+    Returns:
+        적중/미스/제거 횟수와 저장된 항목 수입니다.
+    """
+    global entry_count
+
+    with connection_lock:
+        (entry_count,) = (
+            get_connection().execute("SELECT COUNT(*) FROM embedding").fetchone()
+        )
+
+    return {
+        **embedding_cache_stats,
+        "entries": entry_count,
+        "max_entries": EMBEDDING_CACHE_MAX_ENTRIES,
+    }
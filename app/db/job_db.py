@@ -0,0 +1,248 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import TypedDict, cast
+
+# 작업 데이터베이스 파일은 이 스크립트와 같은 디렉토리에 생성됩니다.
+JOB_DB_PATH = os.path.join(os.path.dirname(__file__), "job_db.sqlite3")
+
+JOB_COLUMNS = (
+    "id",
+    "name",
+    "safe_name",
+    "file_path",
+    "content_hash",
+    "index_type",
+    "chunk_tokens",
+    "chunk_overlap",
+    "owner",
+    "stage",
+    "pages_parsed",
+    "pages_total",
+    "chunks_embedded",
+    "chunks_total",
+    "pages_reused",
+    "error",
+    "created_at",
+    "updated_at",
+)
+
+
+class IngestJob(TypedDict):
+    """인제스트 작업 한 건 (JOB_COLUMNS와 같은 키)"""
+
+    id: str
+    name: str
+    safe_name: str
+    file_path: str
+    content_hash: str | None
+    index_type: str | None
+    chunk_tokens: int | None
+    chunk_overlap: int | None
+    owner: int | None
+    stage: str
+    pages_parsed: int
+    pages_total: int
+    chunks_embedded: int
+    chunks_total: int
+    pages_reused: int | None
+    error: str | None
+    created_at: float
+    updated_at: float
+
+
+# 테이블 생성 이후 추가된 컬럼 (이전 데이터베이스에 ALTER TABLE로 추가)
+ADDED_COLUMNS = {
+    "index_type": "TEXT",
+    "chunk_tokens": "INTEGER",
+    "chunk_overlap": "INTEGER",
+    "owner": "INTEGER",
+    "pages_reused": "INTEGER",
+}
+
+# 완료되어 다시 실행하지 않는 단계
+FINISHED_STAGES = ("done", "failed")
+
+connection: sqlite3.Connection | None = None
+connection_lock = threading.Lock()
+
+
+def get_connection() -> sqlite3.Connection:
+    """작업 SQLite 연결을 반환합니다.
+
+    Returns:
+        WAL 모드로 열린 SQLite 연결입니다.
+    """
+    global connection
+
+    if connection is None:
+        conn = sqlite3.connect(JOB_DB_PATH, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS job ("
+            "id TEXT PRIMARY KEY, name TEXT NOT NULL, safe_name TEXT NOT NULL, "
+            "file_path TEXT NOT NULL, content_hash TEXT, stage TEXT NOT NULL, "
+            "pages_parsed INTEGER NOT NULL DEFAULT 0, "
+            "pages_total INTEGER NOT NULL DEFAULT 0, "
+            "chunks_embedded INTEGER NOT NULL DEFAULT 0, "
+            "chunks_total INTEGER NOT NULL DEFAULT 0, "
+            "error TEXT, created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+
+        existing = {row[1] for row in conn.execute("PRAGMA table_info(job)")}
+        for column, column_type in ADDED_COLUMNS.items():
+            if column not in existing:
+                conn.execute(f"ALTER TABLE job ADD COLUMN {column} {column_type}")
+        connection = conn
+
+    return connection
+
+
+async def insert_job(job: IngestJob) -> None:
+    """작업을 저장합니다.
+
+    Args:
+        job: JOB_COLUMNS 키를 가진 작업 딕셔너리입니다.
+    """
+    values = dict(job)
+    with connection_lock:
+        conn = get_connection()
+        with conn:
+            conn.execute(
+                f"INSERT INTO job ({', '.join(JOB_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(JOB_COLUMNS))})",
+                [values[column] for column in JOB_COLUMNS],
+            )
+
+
+async def insert_job_if_idle(job: IngestJob) -> bool:
+    """같은 문서의 완료되지 않은 작업이 없을 때만 작업을 저장합니다.
+
+    확인과 저장을 한 문장으로 처리하므로 여러 워커가 동시에 시작해도 작업이
+    한 번만 만들어집니다.
+
+    Args:
+        job: JOB_COLUMNS 키를 가진 작업 딕셔너리입니다.
+
+    Returns:
+        저장했으면 True, 이미 진행 중인 작업이 있으면 False입니다.
+    """
+    placeholders = ", ".join("?" * len(FINISHED_STAGES))
+    values = dict(job)
+    with connection_lock:
+        conn = get_connection()
+        with conn:
+            cursor = conn.execute(
+                f"INSERT INTO job ({', '.join(JOB_COLUMNS)}) "
+                f"SELECT {', '.join('?' * len(JOB_COLUMNS))} "
+                "WHERE NOT EXISTS (SELECT 1 FROM job WHERE safe_name = ? "
+                f"AND stage NOT IN ({placeholders}))",
+                [values[column] for column in JOB_COLUMNS]
+                + [job["safe_name"], *FINISHED_STAGES],
+            )
+    return cursor.rowcount == 1
+
+
+async def claim_job(job_id: str, owner: int, previous_owner: int | None) -> bool:
+    """작업의 담당 프로세스를 바꿉니다. (다른 워커와 동시에 가져가지 않도록 비교 후 교체)
+
+    Args:
+        job_id: 작업 ID입니다.
+        owner: 새 담당 프로세스 ID입니다.
+        previous_owner: 조회 시점의 담당 프로세스 ID입니다.
+
+    Returns:
+        담당을 가져왔으면 True, 다른 워커가 먼저 가져갔으면 False입니다.
+    """
+    with connection_lock:
+        conn = get_connection()
+        with conn:
+            cursor = conn.execute(
+                "UPDATE job SET owner = ? WHERE id = ? AND owner IS ?",
+                (owner, job_id, previous_owner),
+            )
+    return cursor.rowcount == 1
+
+
+async def update_job(job: IngestJob) -> None:
+    """작업의 단계와 진행 상황을 갱신합니다.
+
+    Args:
+        job: JOB_COLUMNS 키를 가진 작업 딕셔너리입니다.
+    """
+    job["updated_at"] = time.time()
+    columns = JOB_COLUMNS[1:]
+    values = dict(job)
+
+    with connection_lock:
+        conn = get_connection()
+        with conn:
+            conn.execute(
+                f"UPDATE job SET {', '.join(f'{c} = ?' for c in columns)} "
+                "WHERE id = ?",
+                [values[column] for column in columns] + [job["id"]],
+            )
+
+
+async def select_job(job_id: str) -> IngestJob | None:
+    """작업 하나를 조회합니다.
+
+    Args:
+        job_id: 작업 ID입니다.
+
+    Returns:
+        작업 딕셔너리 또는 찾지 못한 경우 None입니다.
+    """
+    with connection_lock:
+        row = (
+            get_connection()
+            .execute(
+                f"SELECT {', '.join(JOB_COLUMNS)} FROM job WHERE id = ?", (job_id,)
+            )
+            .fetchone()
+        )
+    return cast(IngestJob, dict(zip(JOB_COLUMNS, row))) if row else None
+
+
+async def select_last_done_job(safe_name: str) -> IngestJob | None:
+    """같은 문서의 마지막으로 완료된 작업을 조회합니다.
+
+    Args:
+        safe_name: 문서의 안전한 이름입니다.
+
+    Returns:
+        작업 딕셔너리 또는 완료된 작업이 없는 경우 None입니다.
+    """
+    with connection_lock:
+        row = (
+            get_connection()
+            .execute(
+                f"SELECT {', '.join(JOB_COLUMNS)} FROM job "
+                "WHERE safe_name = ? AND stage = 'done' "
+                "ORDER BY updated_at DESC LIMIT 1",
+                (safe_name,),
+            )
+            .fetchone()
+        )
+    return cast(IngestJob, dict(zip(JOB_COLUMNS, row))) if row else None
+
+
+async def select_unfinished_jobs() -> list[IngestJob]:
+    """완료되지 않은 작업을 생성 순서대로 조회합니다. (재시작 시 재실행용)
+
+    Returns:
+        작업 딕셔너리 리스트입니다.
+    """
+    placeholders = ", ".join("?" * len(FINISHED_STAGES))
+    with connection_lock:
+        rows = (
+            get_connection()
+            .execute(
+                f"SELECT {', '.join(JOB_COLUMNS)} FROM job "
+                f"WHERE stage NOT IN ({placeholders}) ORDER BY created_at",
+                FINISHED_STAGES,
+            )
+            .fetchall()
+        )
+    return [cast(IngestJob, dict(zip(JOB_COLUMNS, row))) for row in rows]
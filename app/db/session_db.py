@@ -0,0 +1,181 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+
+from app.core.env import (
+    SESSION_BACKEND,
+    SESSION_MAX_SESSIONS,
+    SESSION_MAX_TURNS,
+    SESSION_TTL_SECONDS,
+)
+
+# 세션 데이터베이스 파일은 이 스크립트와 같은 디렉토리에 생성됩니다.
+SESSION_DB_PATH = os.path.join(os.path.dirname(__file__), "session_db.sqlite3")
+
+session_store: "MemorySessionStore | SqliteSessionStore | None" = None
+
+
+class MemorySessionStore:
+    """프로세스 메모리에 세션 히스토리를 저장하는 저장소 (LRU + TTL)"""
+
+    def __init__(self, max_sessions: int, max_turns: int, ttl_seconds: int):
+        self.max_sessions = max_sessions
+        self.max_messages = max_turns * 2
+        self.ttl_seconds = ttl_seconds
+        self.sessions: OrderedDict[str, tuple[float, deque]] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get_messages(self, session_id: str) -> list[tuple[str, str]]:
+        with self.lock:
+            self._evict_expired()
+            entry = self.sessions.get(session_id)
+            if entry is None:
+                return []
+            self.sessions[session_id] = (time.time(), entry[1])
+            self.sessions.move_to_end(session_id)
+            return list(entry[1])
+
+    def add_messages(self, session_id: str, messages: list[tuple[str, str]]) -> None:
+        with self.lock:
+            entry = self.sessions.pop(session_id, None)
+            history = entry[1] if entry else deque(maxlen=self.max_messages)
+            history.extend(messages)
+            self.sessions[session_id] = (time.time(), history)
+
+            self._evict_expired()
+            while len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+
+    def delete(self, session_id: str) -> None:
+        with self.lock:
+            self.sessions.pop(session_id, None)
+
+    def _evict_expired(self) -> None:
+        # 가장 오래 사용하지 않은 세션부터 확인하므로 만료되지 않은 세션에서 멈춥니다.
+        deadline = time.time() - self.ttl_seconds
+        while self.sessions:
+            session_id, (last_access, _) = next(iter(self.sessions.items()))
+            if last_access >= deadline:
+                break
+            self.sessions.pop(session_id)
+
+
+class SqliteSessionStore:
+    """SQLite 파일에 세션 히스토리를 저장하는 저장소 (재시작 후에도 유지)"""
+
+    def __init__(self, path: str, max_sessions: int, max_turns: int, ttl_seconds: int):
+        self.max_sessions = max_sessions
+        self.max_messages = max_turns * 2
+        self.ttl_seconds = ttl_seconds
+        self.lock = threading.Lock()
+
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS session ("
+            "session_id TEXT PRIMARY KEY, last_access REAL NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS session_last_access ON session (last_access)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS session_message ("
+            "seq INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT NOT NULL, "
+            "role TEXT NOT NULL, content TEXT NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS session_message_session "
+            "ON session_message (session_id, seq)"
+        )
+
+    def get_messages(self, session_id: str) -> list[tuple[str, str]]:
+        with self.lock, self.conn:
+            self._evict_expired()
+            updated = self.conn.execute(
+                "UPDATE session SET last_access = ? WHERE session_id = ?",
+                (time.time(), session_id),
+            ).rowcount
+            if not updated:
+                return []
+            return self.conn.execute(
+                "SELECT role, content FROM session_message "
+                "WHERE session_id = ? ORDER BY seq",
+                (session_id,),
+            ).fetchall()
+
+    def add_messages(self, session_id: str, messages: list[tuple[str, str]]) -> None:
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO session (session_id, last_access) VALUES (?, ?) "
+                "ON CONFLICT(session_id) DO UPDATE SET last_access = excluded.last_access",
+                (session_id, time.time()),
+            )
+            self.conn.executemany(
+                "INSERT INTO session_message (session_id, role, content) "
+                "VALUES (?, ?, ?)",
+                [(session_id, role, content) for role, content in messages],
+            )
+            # 세션당 최근 max_messages 개만 유지합니다.
+            self.conn.execute(
+                "DELETE FROM session_message WHERE session_id = ? AND seq NOT IN ("
+                "SELECT seq FROM session_message WHERE session_id = ? "
+                "ORDER BY seq DESC LIMIT ?)",
+                (session_id, session_id, self.max_messages),
+            )
+
+            self._evict_expired()
+            evicted = self.conn.execute(
+                "DELETE FROM session WHERE session_id NOT IN ("
+                "SELECT session_id FROM session ORDER BY last_access DESC LIMIT ?)",
+                (self.max_sessions,),
+            ).rowcount
+            if evicted:
+                self._delete_orphan_messages()
+
+    def delete(self, session_id: str) -> None:
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM session WHERE session_id = ?", (session_id,))
+            self._delete_orphan_messages()
+
+    def _evict_expired(self) -> None:
+        deleted = self.conn.execute(
+            "DELETE FROM session WHERE last_access < ?",
+            (time.time() - self.ttl_seconds,),
+        ).rowcount
+        if deleted:
+            self._delete_orphan_messages()
+
+    def _delete_orphan_messages(self) -> None:
+        self.conn.execute(
+            "DELETE FROM session_message WHERE session_id NOT IN "
+            "(SELECT session_id FROM session)"
+        )
+
+
+def get_session_store() -> MemorySessionStore | SqliteSessionStore:
+    """SESSION_BACKEND 설정에 맞는 세션 저장소를 반환합니다.
+
+    Returns:
+        세션 저장소 객체입니다.
+    """
+    global session_store
+
+    if session_store is None:
+        if SESSION_BACKEND == "sqlite":
+            session_store = SqliteSessionStore(
+                path=SESSION_DB_PATH,
+                max_sessions=SESSION_MAX_SESSIONS,
+                max_turns=SESSION_MAX_TURNS,
+                ttl_seconds=SESSION_TTL_SECONDS,
+            )
+        else:
+            session_store = MemorySessionStore(
+                max_sessions=SESSION_MAX_SESSIONS,
+                max_turns=SESSION_MAX_TURNS,
+                ttl_seconds=SESSION_TTL_SECONDS,
+            )
+
+    return session_store
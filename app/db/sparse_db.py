@@ -0,0 +1,219 @@
+import hashlib
+import json
+import os
+import re
+import unicodedata
+from collections import Counter
+
+import numpy as np
+
+from app.utils.metrics_util import timed
+
+# BM25 파라미터
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+SPARSE_DIRECTORY_NAME = "bm25"
+# 역색인 형식 버전 (문서 번호 대신 청크 ID를 반환하도록 바뀐 형식은 2)
+SPARSE_INDEX_VERSION = 2
+
+# 영문/숫자 코드(예: ab-123, 3.2.1), 공백 단위 단어, 한글 연속 구간
+CODE_PATTERN = re.compile(r"[a-z0-9]+(?:[-./][a-z0-9]+)*")
+WORD_PATTERN = re.compile(r"[가-힣a-z0-9]+(?:[-./][가-힣a-z0-9]+)*")
+HANGUL_PATTERN = re.compile(r"[가-힣]+")
+
+# 로드된 희소 인덱스 (safe_name -> 배열 딕셔너리), 배열은 mmap으로 열려 있음
+sparse_index_cache: dict[str, dict] = {}
+
+
+def tokenize(text: str) -> list[str]:
+    """한국어를 고려한 BM25 토크나이저
+
+    형태소 분석기 없이 조사가 붙은 어절도 매칭되도록 한글은 글자 바이그램으로
+    나누고, 조항 번호나 제품 코드처럼 정확히 일치해야 하는 단어와 영문/숫자
+    코드는 통째로 토큰에 포함합니다.
+
+    Args:
+        text (str): 토큰화할 텍스트
+
+    Returns:
+        list[str]: 토큰 리스트
+    """
+    text = unicodedata.normalize("NFKC", text).lower()
+
+    tokens = WORD_PATTERN.findall(text)
+    words = set(tokens)
+    tokens.extend(code for code in CODE_PATTERN.findall(text) if code not in words)
+    for run in HANGUL_PATTERN.findall(text):
+        if len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i : i + 2] for i in range(len(run) - 1))
+
+    return tokens
+
+
+def hash_terms(terms: list[str]) -> np.ndarray:
+    """단어를 64비트 해시로 변환 (어휘 사전 없이 정렬 배열로 검색하기 위함)
+
+    Args:
+        terms (list[str]): 단어 리스트
+
+    Returns:
+        np.ndarray: uint64 해시 배열
+    """
+    return np.array(
+        [
+            int.from_bytes(
+                hashlib.blake2b(t.encode(), digest_size=8).digest(), "little"
+            )
+            for t in terms
+        ],
+        dtype=np.uint64,
+    )
+
+
+@timed("sparse_db.build")
+def build_sparse_index(path: str, chunks: list[tuple[int, str]]) -> None:
+    """청크 텍스트로 BM25 역색인을 만들어 저장
+
+    단어 해시(정렬), 포스팅 오프셋, 문서 번호, 단어 빈도, 문서 길이, 문서 번호별
+    청크 ID를 각각 .npy 파일로 저장하여 로드 시 mmap으로 바로 열 수 있게 합니다.
+
+    Args:
+        path (str): 벡터 스토어 디렉토리
+        chunks (list[tuple[int, str]]): (청크 ID, 청크 텍스트) 리스트
+    """
+    postings: dict[str, list[tuple[int, int]]] = {}
+    doc_lengths = np.zeros(len(chunks), dtype=np.float32)
+    chunk_ids = np.array([chunk_id for chunk_id, _ in chunks], dtype=np.int64)
+
+    for doc_id, (_, text) in enumerate(chunks):
+        counts = Counter(tokenize(text))
+        doc_lengths[doc_id] = sum(counts.values())
+        for term, tf in counts.items():
+            postings.setdefault(term, []).append((doc_id, tf))
+
+    terms = list(postings)
+    term_hashes = hash_terms(terms)
+    order = np.argsort(term_hashes)
+
+    indptr = np.zeros(len(terms) + 1, dtype=np.int64)
+    doc_ids: list[int] = []
+    tfs: list[int] = []
+    for i, term_index in enumerate(order):
+        entries = postings[terms[term_index]]
+        doc_ids.extend(doc_id for doc_id, _ in entries)
+        tfs.extend(tf for _, tf in entries)
+        indptr[i + 1] = len(doc_ids)
+
+    directory = os.path.join(path, SPARSE_DIRECTORY_NAME)
+    os.makedirs(directory, exist_ok=True)
+    np.save(os.path.join(directory, "terms.npy"), term_hashes[order])
+    np.save(os.path.join(directory, "indptr.npy"), indptr)
+    np.save(os.path.join(directory, "doc_ids.npy"), np.array(doc_ids, dtype=np.int32))
+    np.save(os.path.join(directory, "tfs.npy"), np.array(tfs, dtype=np.float32))
+    np.save(os.path.join(directory, "doc_lengths.npy"), doc_lengths)
+    np.save(os.path.join(directory, "chunk_ids.npy"), chunk_ids)
+    with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "version": SPARSE_INDEX_VERSION,
+                "n_docs": len(chunks),
+                "avgdl": float(doc_lengths.mean()) if len(chunks) else 0.0,
+                "k1": BM25_K1,
+                "b": BM25_B,
+            },
+            f,
+        )
+
+
+@timed("sparse_db.load")
+def load_sparse_index(name: str, path: str) -> dict | None:
+    """BM25 역색인을 mmap으로 여는 함수 (한 번 연 인덱스는 재사용)
+
+    Args:
+        name (str): 벡터 스토어 이름
+        path (str): 벡터 스토어 디렉토리
+
+    Returns:
+        dict | None: 역색인 배열 딕셔너리, 없으면 None
+    """
+    index = sparse_index_cache.get(name)
+    if index is not None:
+        return index
+
+    directory = os.path.join(path, SPARSE_DIRECTORY_NAME)
+    if not os.path.exists(os.path.join(directory, "meta.json")):
+        return None
+
+    with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+        index = json.load(f)
+    if index.get("version") != SPARSE_INDEX_VERSION:
+        return None
+
+    for array_name in (
+        "terms",
+        "indptr",
+        "doc_ids",
+        "tfs",
+        "doc_lengths",
+        "chunk_ids",
+    ):
+        index[array_name] = np.load(
+            os.path.join(directory, f"{array_name}.npy"), mmap_mode="r"
+        )
+
+    sparse_index_cache[name] = index
+    return index
+
+
+def invalidate_sparse_index(name: str) -> None:
+    """캐시된 BM25 역색인을 제거하는 함수 (재생성, 삭제 시 호출)
+
+    Args:
+        name (str): 벡터 스토어 이름
+    """
+    sparse_index_cache.pop(name, None)
+
+
+@timed("sparse_db.search")
+def search_sparse_index(index: dict, query: str, k: int) -> list[tuple[int, float]]:
+    """BM25 점수가 높은 청크 ID와 점수를 반환
+
+    Args:
+        index (dict): load_sparse_index로 연 역색인
+        query (str): 질문
+        k (int): 반환할 문서 수
+
+    Returns:
+        list[tuple[int, float]]: 점수 순으로 정렬된 (청크 ID, 점수) 리스트
+    """
+    n_docs = index["n_docs"]
+    if n_docs == 0:
+        return []
+
+    terms = index["terms"]
+    hashes = hash_terms(list(set(tokenize(query))))
+    positions = np.searchsorted(terms, hashes)
+    scores = np.zeros(n_docs, dtype=np.float32)
+    k1, b = index["k1"], index["b"]
+    length_norm = k1 * (1 - b + b * index["doc_lengths"] / (index["avgdl"] or 1.0))
+
+    for term_hash, position in zip(hashes, positions):
+        if position >= len(terms) or terms[position] != term_hash:
+            continue
+
+        start, stop = index["indptr"][position], index["indptr"][position + 1]
+        doc_ids = index["doc_ids"][start:stop]
+        tfs = index["tfs"][start:stop]
+        idf = np.log(1 + (n_docs - len(doc_ids) + 0.5) / (len(doc_ids) + 0.5))
+        scores[doc_ids] += idf * tfs * (k1 + 1) / (tfs + length_norm[doc_ids])
+
+    matched = np.flatnonzero(scores)
+    if len(matched) > k:
+        matched = matched[np.argpartition(-scores[matched], k)[:k]]
+
+    matched = matched[np.argsort(-scores[matched], kind="stable")]
+    chunk_ids = index["chunk_ids"]
+    return [(int(chunk_ids[doc_id]), float(scores[doc_id])) for doc_id in matched]
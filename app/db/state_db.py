@@ -0,0 +1,97 @@
+import os
+import sqlite3
+import threading
+
+# 여러 워커 프로세스가 공유하는 상태 버전 데이터베이스 (이 스크립트와 같은 디렉토리)
+STATE_DB_PATH = os.path.join(os.path.dirname(__file__), "state_db.sqlite3")
+
+# 버전 키: 카탈로그 전체, 벡터 스토어별("store:<safe_name>")
+CATALOG_KEY = "catalog"
+STORE_KEY_PREFIX = "store:"
+
+connection: sqlite3.Connection | None = None
+connection_lock = threading.Lock()
+
+# 이 프로세스가 마지막으로 확인한 키별 버전과 PRAGMA data_version
+seen_versions: dict[str, int] = {}
+seen_data_version: int | None = None
+
+
+def get_connection() -> sqlite3.Connection:
+    """상태 SQLite 연결을 반환합니다. 최초 호출 시 현재 버전을 기준값으로 읽습니다.
+
+    Returns:
+        WAL 모드로 열린 SQLite 연결입니다.
+    """
+    global connection, seen_data_version
+
+    if connection is None:
+        conn = sqlite3.connect(STATE_DB_PATH, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS version ("
+            "key TEXT PRIMARY KEY, version INTEGER NOT NULL)"
+        )
+        seen_versions.update(conn.execute("SELECT key, version FROM version"))
+        seen_data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        connection = conn
+
+    return connection
+
+
+def store_key(name: str) -> str:
+    """벡터 스토어의 버전 키를 반환합니다.
+
+    Args:
+        name: 벡터 스토어 이름(safe_name)입니다.
+
+    Returns:
+        버전 키입니다.
+    """
+    return STORE_KEY_PREFIX + name
+
+
+def bump_version(key: str) -> None:
+    """키의 버전을 올려 다른 워커가 캐시를 비우도록 알립니다.
+
+    Args:
+        key: 버전 키입니다.
+    """
+    with connection_lock:
+        conn = get_connection()
+        with conn:
+            (version,) = conn.execute(
+                "INSERT INTO version (key, version) VALUES (?, 1) "
+                "ON CONFLICT(key) DO UPDATE SET version = version + 1 "
+                "RETURNING version",
+                (key,),
+            ).fetchone()
+        # 자신이 올린 버전은 이미 반영했으므로 변경으로 보지 않습니다.
+        seen_versions[key] = version
+
+
+def poll_changed_keys() -> list[str]:
+    """마지막 확인 이후 다른 프로세스가 버전을 올린 키를 반환합니다.
+
+    PRAGMA data_version은 다른 연결이 커밋했을 때만 바뀌므로, 변경이 없으면
+    테이블을 읽지 않고 바로 반환합니다.
+
+    Returns:
+        버전이 바뀐 키 리스트입니다.
+    """
+    global seen_data_version
+
+    with connection_lock:
+        conn = get_connection()
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == seen_data_version:
+            return []
+        seen_data_version = data_version
+
+        changed = []
+        for key, version in conn.execute("SELECT key, version FROM version"):
+            if seen_versions.get(key) != version:
+                seen_versions[key] = version
+                changed.append(key)
+        return changed
@@ -1,70 +1,158 @@
 import os
+import sqlite3
+import threading
+
+from app.db.state_db import CATALOG_KEY, bump_version
+from app.utils.metrics_util import timed
 
 # 데이터베이스 파일은 이 스크립트와 같은 디렉토리에 생성됩니다.
 DB_FILE_PATH = os.path.join(os.path.dirname(__file__), "text_db.txt")
+CATALOG_DB_PATH = os.path.join(os.path.dirname(__file__), "text_db.sqlite3")
 
+connection: sqlite3.Connection | None = None
+connection_lock = threading.Lock()
+
+# name <-> safe_name 메모리 인덱스 (SQLite 내용과 항상 동일하게 유지)
+name_index: dict[str, str] = {}
+safe_name_index: dict[str, str] = {}
 
-async def read_text_db() -> list[list[str]]:
-    """
-    텍스트 파일 데이터베이스를 읽습니다.
 
-    각 항목은 'name,safe_name;' 형식입니다.
+def parse_legacy_text_db(content: str) -> list[list[str]]:
+    """기존 'name,safe_name;' 형식의 텍스트를 파싱합니다.
+
+    Args:
+        content: text_db.txt 파일 내용입니다.
 
     Returns:
         각 내부 리스트가 [name, safe_name] 쌍인 리스트입니다.
-        예: [['file1.pdf', 'safe_file1.pdf'], ['file2.txt', 'safe_file2.txt']]
+    """
+    data = []
+    # 항목은 ';'로 구분됩니다. 마지막 항목에 ';'가 있을 수 있습니다.
+    for entry in content.strip().split(";"):
+        parts = entry.split(",")
+        if len(parts) == 2:
+            data.append([parts[0].strip(), parts[1].strip()])
+    return data
+
+
+def migrate_legacy_text_db(conn: sqlite3.Connection) -> None:
+    """text_db.txt가 남아 있으면 카탈로그로 한 번만 옮기고 파일 이름을 바꿉니다.
+
+    Args:
+        conn: 카탈로그 SQLite 연결입니다.
     """
     if not os.path.exists(DB_FILE_PATH):
-        return []
+        return
 
     try:
         with open(DB_FILE_PATH, encoding="utf-8") as f:
-            content = f.read().strip()
+            entries = parse_legacy_text_db(f.read())
     except OSError:
-        return []
+        return
 
-    if not content:
-        return []
+    with conn:
+        conn.executemany(
+            "INSERT INTO catalog (name, safe_name) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET safe_name = excluded.safe_name",
+            entries,
+        )
+    os.replace(DB_FILE_PATH, DB_FILE_PATH + ".migrated")
 
-    # 항목은 ';'로 구분됩니다. 마지막 항목에 ';'가 있을 수 있습니다.
-    entries = content.split(";")
 
-    # 분할로 인해 발생할 수 있는 빈 문자열을 제거합니다.
-    entries = [entry for entry in entries if entry]
+def get_connection() -> sqlite3.Connection:
+    """카탈로그 SQLite 연결을 반환합니다. 최초 호출 시 스키마 생성, 마이그레이션,
+    메모리 인덱스 적재를 수행합니다.
 
-    data = []
-    for entry in entries:
-        parts = entry.split(",")
-        if len(parts) == 2:
-            data.append([parts[0].strip(), parts[1].strip()])
-    return data
+    Returns:
+        WAL 모드로 열린 SQLite 연결입니다.
+    """
+    global connection
 
+    if connection is None:
+        conn = sqlite3.connect(CATALOG_DB_PATH, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS catalog ("
+            "name TEXT PRIMARY KEY, safe_name TEXT NOT NULL)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS catalog_safe_name ON catalog (safe_name)"
+        )
+        migrate_legacy_text_db(conn)
 
-async def write_text_db(name: str, safe_name: str) -> None:
-    """
-    텍스트 파일 데이터베이스에 이름/안전한 이름 쌍을 쓰거나 업데이트합니다.
-    이름이 이미 있으면 safe_name을 덮어쓰고, 그렇지 않으면 새 쌍을 추가합니다.
+        load_indexes(conn)
+        connection = conn
+
+    return connection
+
+
+def load_indexes(conn: sqlite3.Connection) -> None:
+    """카탈로그 내용으로 메모리 인덱스를 다시 채웁니다.
 
     Args:
-        name: 원본 이름입니다.
-        safe_name: 저장할 안전한 이름입니다.
+        conn: 카탈로그 SQLite 연결입니다.
     """
-    db_data = await read_text_db()
-    data_dict = {entry[0]: entry[1] for entry in db_data}
+    name_index.clear()
+    safe_name_index.clear()
+    for name, safe_name in conn.execute(
+        "SELECT name, safe_name FROM catalog ORDER BY rowid"
+    ):
+        name_index[name] = safe_name
+        safe_name_index[safe_name] = name
 
-    data_dict[name] = safe_name
 
-    new_content = ";".join([f"{n},{s}" for n, s in data_dict.items()])
-    if new_content:
-        new_content += ";"
+def reload_text_db() -> None:
+    """다른 워커가 카탈로그를 바꾼 뒤 메모리 인덱스를 다시 읽습니다."""
+    with connection_lock:
+        load_indexes(get_connection())
 
-    with open(DB_FILE_PATH, "w", encoding="utf-8") as f:
-        f.write(new_content)
 
+@timed("text_db.read")
+async def read_text_db() -> list[list[str]]:
+    """
+    카탈로그 데이터베이스를 읽습니다.
 
+    Returns:
+        각 내부 리스트가 [name, safe_name] 쌍인 리스트입니다.
+        예: [['file1.pdf', 'safe_file1.pdf'], ['file2.txt', 'safe_file2.txt']]
+    """
+    with connection_lock:
+        get_connection()
+        return [[name, safe_name] for name, safe_name in name_index.items()]
+
+
+@timed("text_db.write")
+async def write_text_db(name: str, safe_name: str) -> None:
+    """
+    카탈로그 데이터베이스에 이름/안전한 이름 쌍을 쓰거나 업데이트합니다.
+    이름이 이미 있으면 safe_name을 덮어쓰고, 그렇지 않으면 새 쌍을 추가합니다.
+
+    Args:
+        name: 원본 이름입니다.
+        safe_name: 저장할 안전한 이름입니다.
+    """
+    with connection_lock:
+        conn = get_connection()
+        with conn:
+            conn.execute(
+                "INSERT INTO catalog (name, safe_name) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET safe_name = excluded.safe_name",
+                (name, safe_name),
+            )
+
+        previous = name_index.get(name)
+        if previous is not None:
+            safe_name_index.pop(previous, None)
+        name_index[name] = safe_name
+        safe_name_index[safe_name] = name
+    bump_version(CATALOG_KEY)
+
+
+@timed("text_db.delete")
 async def delete_text_db(name: str) -> bool:
     """
-    텍스트 파일 데이터베이스에서 특정 이름을 삭제합니다.
+    카탈로그 데이터베이스에서 특정 이름을 삭제합니다.
 
     Args:
         name: 삭제할 원본 이름입니다.
@@ -73,17 +161,15 @@ async def delete_text_db(name: str) -> bool:
         bool: 삭제 성공 여부
     """
     try:
-        db_data = await read_text_db()
-        # 삭제할 이름을 제외한 데이터만 유지
-        filtered_data = [entry for entry in db_data if entry[0] != name]
-
-        # 새로운 내용 생성
-        new_content = ";".join([f"{n},{s}" for n, s in filtered_data])
-        if new_content:
-            new_content += ";"
+        with connection_lock:
+            conn = get_connection()
+            with conn:
+                conn.execute("DELETE FROM catalog WHERE name = ?", (name,))
 
-        with open(DB_FILE_PATH, "w", encoding="utf-8") as f:
-            f.write(new_content)
+            safe_name = name_index.pop(name, None)
+            if safe_name is not None:
+                safe_name_index.pop(safe_name, None)
+        bump_version(CATALOG_KEY)
 
         return True
     except Exception as e:
@@ -91,6 +177,7 @@ async def delete_text_db(name: str) -> bool:
         return False
 
 
+@timed("text_db.find_safe_name_by_name")
 async def find_safe_name_by_name(name: str) -> str | None:
     """
     주어진 이름에 대한 안전한 이름을 찾습니다.
@@ -101,13 +188,12 @@ async def find_safe_name_by_name(name: str) -> str | None:
     Returns:
         해당하는 안전한 이름 또는 찾지 못한 경우 None입니다.
     """
-    db = await read_text_db()
-    for entry in db:
-        if entry[0] == name:
-            return entry[1]
-    return None
+    with connection_lock:
+        get_connection()
+        return name_index.get(name)
 
 
+@timed("text_db.find_name_by_safe_name")
 async def find_name_by_safe_name(safe_name: str) -> str | None:
     """
     주어진 안전한 이름에 대한 원본 이름을 찾습니다.
@@ -118,8 +204,6 @@ async def find_name_by_safe_name(safe_name: str) -> str | None:
     Returns:
         해당하는 원본 이름 또는 찾지 못한 경우 None입니다.
     """
-    db = await read_text_db()
-    for entry in db:
-        if entry[1] == safe_name:
-            return entry[0]
-    return None
+    with connection_lock:
+        get_connection()
+        return safe_name_index.get(safe_name)
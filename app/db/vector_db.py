@@ -1,53 +1,559 @@
+import asyncio
 import os
 import shutil
+import tempfile
+from collections import OrderedDict
+from collections.abc import Callable
 
-from langchain_community.vectorstores import FAISS
+import faiss
+import numpy as np
 from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
 
+from app.core.env import VECTOR_STORE_CACHE_MAX_BYTES, VECTOR_STORE_CACHE_SIZE
+from app.db.answer_db import invalidate_answers
+from app.db.chunk_db import CHUNK_DB_FILE_NAME, ChunkStore
+from app.db.sparse_db import build_sparse_index, invalidate_sparse_index
+from app.db.state_db import bump_version, store_key
+from app.utils.embedding_util import embed_texts
+from app.utils.index_util import (
+    build_index,
+    choose_index_type,
+    describe_index,
+    estimate_index_bytes,
+    remove_vectors,
+    save_index_meta,
+    set_search_params,
+)
 from app.utils.langchain_util import get_embedding
+from app.utils.metrics_util import timed
 
-vector_store = None
+VECTOR_DB_DIRECTORY = "./vector_db/"
+INDEX_FILE_NAME = "index.faiss"
 
+# 검색용으로 열 때 벡터 코드를 메모리에 복사하지 않고 mmap으로 읽습니다.
+# (IO_FLAG_MMAP은 온디스크 IVF 목록 전용이라 일반 인덱스에는 IO_FLAG_MMAP_IFC 사용)
+INDEX_MMAP_FLAGS = faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY
 
-async def create_vector_store(name: str, chunks: list[Document]):
-    """FAISS 벡터 데이터베이스 생성
+# 로드된 벡터 스토어 LRU 캐시 (safe_name -> (VectorStore, 추정 바이트 수))
+vector_store_cache: OrderedDict[str, tuple["VectorStore", int]] = OrderedDict()
+vector_store_cache_bytes = 0
+vector_store_cache_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+class VectorStore:
+    """FAISS 인덱스와 SQLite 청크 저장소로 구성된 문서별 벡터 스토어
+
+    인덱스는 IndexIDMap으로 감싸 청크 ID를 그대로 반환하므로 검색된 청크만
+    ChunkStore에서 읽습니다. pickle을 사용하지 않아 로드 시 임의 코드가 실행되지
+    않습니다.
+    """
+
+    def __init__(
+        self, index: faiss.Index, chunks: ChunkStore, embedding_function: Embeddings
+    ):
+        self.index = index
+        self.chunks = chunks
+        self.embedding_function = embedding_function
+
+    @timed("vector_db.search")
+    def search(self, vector: list[float], k: int) -> list[tuple[int, float]]:
+        distances, ids = self.index.search(np.array([vector], dtype=np.float32), k)
+        return [
+            (int(chunk_id), float(distance))
+            for chunk_id, distance in zip(ids[0], distances[0])
+            if chunk_id >= 0
+        ]
+
+    @timed("vector_db.search_batch")
+    def search_batch(
+        self, vectors: list[list[float]], k: int
+    ) -> list[list[tuple[int, float]]]:
+        distances, ids = self.index.search(np.array(vectors, dtype=np.float32), k)
+        return [
+            [
+                (int(chunk_id), float(distance))
+                for chunk_id, distance in zip(row_ids, row_distances)
+                if chunk_id >= 0
+            ]
+            for row_ids, row_distances in zip(ids, distances)
+        ]
+
+    @timed("chunk_db.get")
+    def get_documents(self, ids: list[int]) -> list[Document]:
+        return self.chunks.get(ids)
+
+    def add(self, documents: list[Document], vectors: list[list[float]]) -> list[int]:
+        ids = self.chunks.add(documents)
+        self.index.add_with_ids(
+            np.array(vectors, dtype=np.float32), np.array(ids, dtype=np.int64)
+        )
+        return ids
+
+
+def open_vector_store(
+    path: str, embedding: Embeddings, writable: bool = False
+) -> VectorStore | None:
+    """디스크의 벡터 스토어를 여는 함수
+
+    검색용으로 열면 인덱스를 mmap으로 읽어 문서 크기와 관계없이 빠르게 열리며,
+    청크는 검색 결과에 필요한 것만 읽습니다. 이전 형식(pickle)의 스토어는 열지 않습니다.
+
+    Args:
+        path (str): 벡터 스토어 디렉토리
+        embedding (Embeddings): 질문 임베딩 객체
+        writable (bool): 청크를 추가할 수 있도록 인덱스를 메모리로 읽을지 여부
+
+    Returns:
+        VectorStore | None: 벡터 스토어 객체, 없거나 이전 형식이면 None
+    """
+    # 링크를 한 번만 따라가 인덱스와 청크를 같은 버전의 디렉토리에서 읽습니다.
+    path = os.path.realpath(path)
+    chunk_db_path = os.path.join(path, CHUNK_DB_FILE_NAME)
+    if not os.path.exists(chunk_db_path):
+        return None
+
+    index = faiss.read_index(
+        os.path.join(path, INDEX_FILE_NAME), 0 if writable else INDEX_MMAP_FLAGS
+    )
+    # 저장 이후 바뀐 검색 파라미터(efSearch, nprobe) 설정을 적용합니다.
+    set_search_params(index)
+
+    return VectorStore(index, ChunkStore(chunk_db_path), embedding)
+
+
+def write_index(path: str, index: faiss.Index) -> None:
+    """인덱스를 임시 파일에 쓴 뒤 교체하여 읽는 쪽이 반쯤 쓰인 파일을 보지 않게 함
+
+    Args:
+        path (str): 벡터 스토어 디렉토리
+        index (faiss.Index): FAISS 인덱스
+    """
+    index_path = os.path.join(path, INDEX_FILE_NAME)
+    faiss.write_index(index, index_path + ".tmp")
+    os.replace(index_path + ".tmp", index_path)
+
+
+def make_building_directory(name: str) -> str:
+    """새 스토어를 만들 디렉토리를 만드는 함수
+
+    같은 이름의 작업이 동시에 실행되어도 서로의 디렉토리를 지우지 않도록 매번
+    고유한 이름을 사용합니다.
+
+    Args:
+        name (str): 벡터 스토어 이름
+
+    Returns:
+        str: 생성된 디렉토리 경로
+    """
+    os.makedirs(VECTOR_DB_DIRECTORY, exist_ok=True)
+    return tempfile.mkdtemp(prefix=f".{name}.", dir=VECTOR_DB_DIRECTORY)
+
+
+def replace_directory(source: str, target: str) -> None:
+    """새로 만든 스토어 디렉토리로 기존 스토어를 교체
+
+    target은 실제 스토어 디렉토리를 가리키는 심볼릭 링크입니다. 새 디렉토리를
+    가리키는 링크를 만든 뒤 os.replace로 바꾸므로 읽는 쪽은 교체 중에도 항상
+    이전 스토어나 새 스토어 중 하나를 봅니다.
+
+    Args:
+        source (str): 새 스토어 디렉토리 (target과 같은 디렉토리 안)
+        target (str): 교체할 스토어 경로
+    """
+    previous = None
+    if os.path.islink(target):
+        previous = os.path.realpath(target)
+    elif os.path.isdir(target):
+        # 심볼릭 링크를 쓰기 전에 만든 디렉토리는 한 번만 옮긴 뒤 교체합니다.
+        previous = source + ".previous"
+        os.rename(target, previous)
+
+    link = source + ".link"
+    os.symlink(os.path.basename(source), link)
+    os.replace(link, target)
+
+    if previous is not None:
+        shutil.rmtree(previous, ignore_errors=True)
+
+
+def remove_directory(path: str) -> None:
+    """스토어 경로와 링크가 가리키는 디렉토리를 함께 지우는 함수
+
+    Args:
+        path (str): 벡터 스토어 경로
+    """
+    if os.path.islink(path):
+        real_path = os.path.realpath(path)
+        os.unlink(path)
+        shutil.rmtree(real_path, ignore_errors=True)
+    else:
+        shutil.rmtree(path)
+
+
+def estimate_vector_store_bytes(store: VectorStore) -> int:
+    """벡터 스토어가 차지하는 메모리를 대략적으로 계산하는 함수
+
+    청크 텍스트는 필요할 때만 읽으므로 인덱스 크기만 계산합니다.
+
+    Args:
+        store (VectorStore): 벡터 스토어 객체
+
+    Returns:
+        int: 인덱스의 추정 바이트 수
+    """
+    return estimate_index_bytes(store.index)
+
+
+def cache_vector_store(name: str, store: VectorStore) -> None:
+    """벡터 스토어를 캐시에 넣고 개수/메모리 상한을 넘으면 오래된 항목을 제거
+
+    Args:
+        name (str): 벡터 스토어 이름
+        store (VectorStore): 벡터 스토어 객체
+    """
+    global vector_store_cache_bytes
+
+    invalidate_vector_store_cache(name=name)
+
+    size = estimate_vector_store_bytes(store)
+    if VECTOR_STORE_CACHE_SIZE <= 0 or size > VECTOR_STORE_CACHE_MAX_BYTES:
+        return
+
+    vector_store_cache[name] = (store, size)
+    vector_store_cache_bytes += size
+
+    while (
+        len(vector_store_cache) > VECTOR_STORE_CACHE_SIZE
+        or vector_store_cache_bytes > VECTOR_STORE_CACHE_MAX_BYTES
+    ):
+        _, (_, evicted_size) = vector_store_cache.popitem(last=False)
+        vector_store_cache_bytes -= evicted_size
+        vector_store_cache_stats["evictions"] += 1
+
+
+def invalidate_vector_store_cache(name: str) -> None:
+    """캐시에서 벡터 스토어를 제거하는 함수 (삭제, 재업로드 시 호출)
+
+    Args:
+        name (str): 벡터 스토어 이름
+    """
+    global vector_store_cache_bytes
+
+    cached = vector_store_cache.pop(name, None)
+    if cached is not None:
+        vector_store_cache_bytes -= cached[1]
+
+
+def get_vector_store_cache_stats() -> dict[str, int]:
+    """벡터 스토어 캐시 통계를 반환하는 함수
+
+    Returns:
+        dict[str, int]: 적중/미스/제거 횟수와 현재 캐시 크기
+    """
+    return {
+        **vector_store_cache_stats,
+        "entries": len(vector_store_cache),
+        "bytes": vector_store_cache_bytes,
+        "max_entries": VECTOR_STORE_CACHE_SIZE,
+        "max_bytes": VECTOR_STORE_CACHE_MAX_BYTES,
+    }
+
+
+def is_legacy_vector_store(name: str) -> bool:
+    """pickle 기반 이전 형식으로 저장된 스토어인지 확인하는 함수
+
+    Args:
+        name (str): 벡터 스토어 이름
+
+    Returns:
+        bool: 이전 형식이면 True (다시 인제스트해야 검색 가능)
+    """
+    path = os.path.join(VECTOR_DB_DIRECTORY, name)
+    return os.path.isdir(path) and not os.path.exists(
+        os.path.join(path, CHUNK_DB_FILE_NAME)
+    )
+
+
+@timed("vector_db.create")
+async def create_vector_store(
+    name: str,
+    chunks: list[Document],
+    on_progress: Callable[[int], None] | None = None,
+    index_type: str | None = None,
+    page_hashes: list[str] | None = None,
+) -> VectorStore | None:
+    """전달받은 청크를 임베딩하여 문서별 벡터 데이터베이스 생성
+
+    청크는 배치 단위로 동시에 임베딩한 뒤 반환된 벡터로 인덱스를 조립합니다.
+    새 스토어는 임시 디렉토리에 만든 뒤 기존 스토어와 교체합니다.
 
     Args:
         name (str): 데이터베이스 이름
         chunks (list[Document]): 청크(Documents)
-        embedding (ClovaXEmbeddings): 임베딩 객체
+        on_progress (Callable[[int], None] | None): 임베딩된 청크 수를 받는 콜백
+        index_type (str | None): 인덱스 종류 (auto, flat, hnsw, ivfpq, sq8),
+            None이면 VECTOR_INDEX_TYPE 설정을 따름
+        page_hashes (list[str] | None): 재업로드 시 비교할 페이지별 내용 해시
+
+    Returns:
+        VectorStore | None: 생성된 벡터 스토어 객체
+
+    Raises:
+        ValueError: 청크가 하나도 없는 경우
     """
-    global vector_store
+    if not chunks:
+        raise ValueError("벡터 스토어에 저장할 청크가 없습니다.")
+
+    embedding = await get_embedding()
+    vectors = await embed_texts(
+        texts=[chunk.page_content for chunk in chunks],
+        embedding=embedding,
+        on_progress=on_progress,
+    )
 
-    if vector_store is None:
-        vector_store = FAISS.from_documents(
-            documents=chunks,
-            embedding=await get_embedding(),
+    path = os.path.join(VECTOR_DB_DIRECTORY, name)
+    building_path = make_building_directory(name)
+
+    try:
+        # 인덱스 학습, 생성과 저장은 이벤트 루프를 막지 않도록 스레드에서 실행합니다.
+        index = await asyncio.to_thread(
+            build_index,
+            np.array(vectors, dtype=np.float32),
+            choose_index_type(count=len(chunks), index_type=index_type),
         )
+        store = VectorStore(
+            index=faiss.IndexIDMap(index),
+            chunks=ChunkStore(os.path.join(building_path, CHUNK_DB_FILE_NAME)),
+            embedding_function=embedding,
+        )
+        await asyncio.to_thread(store.add, chunks, vectors)
+        if page_hashes is not None:
+            await asyncio.to_thread(store.chunks.set_page_hashes, page_hashes)
+        await save_vector_store(path=building_path, store=store)
+
+        # 완성된 스토어로 교체합니다. 이미 열린 이전 스토어는 지운 파일을 계속 읽습니다.
+        await asyncio.to_thread(replace_directory, building_path, path)
+    except BaseException:
+        shutil.rmtree(building_path, ignore_errors=True)
+        raise
+    publish_vector_store_change(name=name)
+
+    return await select_vector_store(name=name)
+
+
+async def diff_vector_store_pages(
+    name: str, page_hashes: list[str], index_type: str | None = None
+) -> dict | None:
+    """저장된 페이지 해시와 새 페이지 해시를 비교하는 함수
+
+    내용이 같은 페이지는 위치가 바뀌어도(페이지 삽입/삭제) 기존 청크와 벡터를
+    그대로 사용합니다.
+
+    Args:
+        name (str): 벡터 스토어 이름
+        page_hashes (list[str]): 새 PDF의 페이지별 내용 해시
+        index_type (str | None): 요청한 인덱스 종류, 기존과 다르면 다시 생성
+
+    Returns:
+        dict | None: moved(기존 페이지 -> 새 페이지), removed(지울 기존 페이지),
+            added(새로 임베딩할 페이지) 딕셔너리, 재사용할 페이지가 없으면 None
+    """
+    store = await select_vector_store(name=name)
+    if store is None:
+        return None
+    if index_type not in (None, "auto", describe_index(store.index)["type"]):
+        return None
+
+    old_pages: dict[str, list[int]] = {}
+    for page, page_hash in sorted(
+        (await asyncio.to_thread(store.chunks.page_hashes)).items()
+    ):
+        old_pages.setdefault(page_hash, []).append(page)
+
+    moved: dict[int, int] = {}
+    added: list[int] = []
+    for page, page_hash in enumerate(page_hashes, start=1):
+        candidates = old_pages.get(page_hash)
+        if candidates:
+            moved[candidates.pop(0)] = page
+        else:
+            added.append(page)
+
+    if not moved:
+        return None
+
+    removed = [page for pages in old_pages.values() for page in pages]
+    return {"moved": moved, "removed": sorted(removed), "added": added}
+
+
+def apply_page_diff(store: VectorStore, diff: dict) -> None:
+    """지워진 페이지의 청크와 벡터를 지우고 옮겨진 페이지 번호를 고치는 함수
+
+    Args:
+        store (VectorStore): 수정용으로 연 벡터 스토어
+        diff (dict): diff_vector_store_pages 결과
+    """
+    ids_by_page = store.chunks.ids_by_page()
+
+    # 내용이 바뀐 페이지는 기존 페이지가 removed, 새 페이지가 added에 들어갑니다.
+    removed = [
+        chunk_id for page in diff["removed"] for chunk_id in ids_by_page.get(page, [])
+    ]
+    store.chunks.delete(removed)
+    store.index = remove_vectors(store.index, removed)
 
-    os.makedirs("./vector_db/", exist_ok=True)
-    vector_store.save_local("./vector_db/" + name)
+    store.chunks.set_pages(
+        [
+            (chunk_id, new_page)
+            for old_page, new_page in diff["moved"].items()
+            if old_page != new_page
+            for chunk_id in ids_by_page.get(old_page, [])
+        ]
+    )
 
 
-async def select_vector_store(name: str) -> FAISS | None:
+@timed("vector_db.update")
+async def update_vector_store(
+    name: str,
+    diff: dict,
+    chunks: list[Document],
+    page_hashes: list[str],
+    on_progress: Callable[[int], None] | None = None,
+) -> VectorStore | None:
+    """바뀐 페이지만 반영하여 벡터 스토어를 갱신하는 함수
+
+    바뀌지 않은 페이지의 청크와 벡터는 그대로 두고, 지워지거나 바뀐 페이지의
+    청크는 ID로 인덱스에서 지운 뒤 새 청크만 임베딩해 추가합니다. 수정은 기존
+    스토어의 사본에서 하고 완성되면 create_vector_store와 같이 교체합니다.
+
+    Args:
+        name (str): 벡터 스토어 이름
+        diff (dict): diff_vector_store_pages 결과
+        chunks (list[Document]): 새로 추가할(바뀐 페이지의) 청크
+        page_hashes (list[str]): 새 PDF의 페이지별 내용 해시
+        on_progress (Callable[[int], None] | None): 임베딩된 청크 수를 받는 콜백
+
+    Returns:
+        VectorStore | None: 갱신된 벡터 스토어 객체
+    """
+    # 같은 내용을 다시 올린 경우에는 스토어를 바꾸지 않습니다.
+    if (
+        not chunks
+        and not diff["removed"]
+        and all(old == new for old, new in diff["moved"].items())
+    ):
+        return await select_vector_store(name=name)
+
+    embedding = await get_embedding()
+    vectors = await embed_texts(
+        texts=[chunk.page_content for chunk in chunks],
+        embedding=embedding,
+        on_progress=on_progress,
+    )
+
+    path = os.path.join(VECTOR_DB_DIRECTORY, name)
+    store = await asyncio.to_thread(open_vector_store, path, embedding, True)
+    if store is None:
+        raise FileNotFoundError(f"벡터 스토어가 존재하지 않습니다: {name}")
+
+    building_path = make_building_directory(name)
+    try:
+        chunk_db_path = os.path.join(building_path, CHUNK_DB_FILE_NAME)
+        await asyncio.to_thread(store.chunks.copy_to, chunk_db_path)
+        store.chunks.close()
+        store.chunks = ChunkStore(chunk_db_path)
+
+        await asyncio.to_thread(apply_page_diff, store, diff)
+        if chunks:
+            await asyncio.to_thread(store.add, chunks, vectors)
+        await asyncio.to_thread(store.chunks.set_page_hashes, page_hashes)
+        await save_vector_store(path=building_path, store=store)
+
+        await asyncio.to_thread(replace_directory, building_path, path)
+    except BaseException:
+        store.chunks.close()
+        shutil.rmtree(building_path, ignore_errors=True)
+        raise
+    publish_vector_store_change(name=name)
+
+    return await select_vector_store(name=name)
+
+
+@timed("vector_db.save")
+async def save_vector_store(path: str, store: VectorStore) -> None:
+    """인덱스, 인덱스 메타데이터, BM25 역색인을 디스크에 저장하는 함수
+
+    저장이 끝나면 수정용으로 연 청크 저장소 연결을 닫습니다.
+
+    Args:
+        path (str): 벡터 스토어 디렉토리
+        store (VectorStore): 저장할 벡터 스토어 객체
+    """
+    await asyncio.to_thread(write_index, path, store.index)
+    save_index_meta(path=path, index=store.index)
+
+    # 청크 ID 순서대로 텍스트를 모아 BM25 역색인을 함께 생성합니다.
+    await asyncio.to_thread(build_sparse_index, path, store.chunks.texts())
+    store.chunks.close()
+
+
+def invalidate_vector_store(name: str) -> None:
+    """스토어가 바뀐 뒤 로드된 스토어, BM25 역색인, 답변 캐시를 비우는 함수
+
+    Args:
+        name (str): 벡터 스토어 이름
+    """
+    invalidate_vector_store_cache(name=name)
+    invalidate_sparse_index(name=name)
+    invalidate_answers(safe_name=name)
+
+
+def publish_vector_store_change(name: str) -> None:
+    """이 프로세스의 캐시를 비우고 다른 워커에도 스토어 변경을 알리는 함수
+
+    Args:
+        name (str): 벡터 스토어 이름
+    """
+    invalidate_vector_store(name=name)
+    bump_version(store_key(name))
+
+
+@timed("vector_db.select")
+async def select_vector_store(name: str) -> VectorStore | None:
     """벡터 스토어를 불러오는 함수
 
+    한 번 로드한 스토어는 LRU 캐시에 보관하여 다음 요청에서 재사용합니다.
+
     Args:
         name (str): 벡터 스토어 이름
 
     Returns:
-        FAISS: 벡터 스토어 객체
+        VectorStore | None: 벡터 스토어 객체, 없으면 None
     """
+    cached = vector_store_cache.get(name)
+    if cached is not None:
+        vector_store_cache.move_to_end(name)
+        vector_store_cache_stats["hits"] += 1
+        return cached[0]
+
+    vector_store_cache_stats["misses"] += 1
+
     try:
-        return FAISS.load_local(
-            "./vector_db/" + name,
+        store = await asyncio.to_thread(
+            open_vector_store,
+            os.path.join(VECTOR_DB_DIRECTORY, name),
             await get_embedding(),
-            allow_dangerous_deserialization=True,  # pickle 파일 로드 허용
         )
     except Exception as e:
         return None
 
+    if store is not None:
+        cache_vector_store(name=name, store=store)
+    return store
 
+
+@timed("vector_db.delete")
 async def delete_vector_store(name: str) -> bool:
     """벡터 스토어를 삭제하는 함수
 
@@ -57,12 +563,17 @@ async def delete_vector_store(name: str) -> bool:
     Returns:
         bool: 삭제 성공 여부
     """
+    invalidate_vector_store(name=name)
+
     try:
-        vector_store_path = f"./vector_db/{name}"
-        if os.path.exists(vector_store_path):
-            shutil.rmtree(vector_store_path)
+        vector_store_path = os.path.join(VECTOR_DB_DIRECTORY, name)
+        if os.path.lexists(vector_store_path):
+            remove_directory(vector_store_path)
             return True
         return False
     except Exception as e:
         print(f"Error deleting vector store {name}: {e}")
         return False
+    finally:
+        # 다른 워커는 디렉토리가 지워진 뒤에 캐시를 비워야 이전 스토어를 다시 열지 않습니다.
+        bump_version(store_key(name))
@@ -1,24 +1,72 @@
-from fastapi import APIRouter, HTTPException, UploadFile
-from fastapi.responses import FileResponse, StreamingResponse
-
-from app.core.base_response import BaseResponseModel, ListResponseModel
-from app.services import file_service
+from fastapi import APIRouter, HTTPException, Query, UploadFile
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
+
+from app.core.base_request import ChatBatchRequestModel
+from app.core.base_response import (
+    BaseResponseModel,
+    ChatResponseModel,
+    JobResponseModel,
+    JobStatusResponseModel,
+    ListResponseModel,
+    StatsResponseModel,
+)
+from app.services import file_service, job_service
+from app.utils.admission_util import get_llm_admission
+from app.utils.metrics_util import render_metrics
 
 router = APIRouter(prefix="")
 
 
-@router.post("/upload", response_model=BaseResponseModel)
-async def upload_file(file: UploadFile) -> BaseResponseModel:
-    status_code, detail = await file_service.file_upload_service(file=file)
+@router.post("/upload", response_model=JobResponseModel, status_code=202)
+async def upload_file(
+    file: UploadFile,
+    index_type: str | None = Query(
+        default=None, pattern="^(auto|flat|hnsw|ivfpq|sq8)$"
+    ),
+    chunk_tokens: int | None = Query(default=None, ge=16, le=4096),
+    chunk_overlap: int | None = Query(default=None, ge=0),
+) -> JobResponseModel:
+    status_code, detail, job_id = await file_service.file_upload_service(
+        file=file,
+        index_type=index_type,
+        chunk_tokens=chunk_tokens,
+        chunk_overlap=chunk_overlap,
+    )
+    if job_id is None:
+        raise HTTPException(status_code=status_code, detail=detail)
 
-    return BaseResponseModel(status_code=status_code, detail=detail)
+    return JobResponseModel(status_code=status_code, detail=detail, job_id=job_id)
 
 
-@router.get("/chat", response_model=BaseResponseModel)
-async def chat(name: str, query: str) -> BaseResponseModel:
-    status_code, detail = await file_service.chat_service(name=name, query=query)
+@router.get("/jobs/{job_id}", response_model=JobStatusResponseModel)
+async def get_job_status(job_id: str) -> JobStatusResponseModel:
+    status_code, detail, data = await job_service.get_job_status_service(job_id=job_id)
+    if data is None:
+        raise HTTPException(status_code=status_code, detail=detail)
+
+    return JobStatusResponseModel(status_code=status_code, detail=detail, data=data)
 
-    return BaseResponseModel(status_code=status_code, detail=detail)
+
+@router.get("/chat", response_model=ChatResponseModel)
+async def chat(query: str, name: str | None = None) -> ChatResponseModel:
+    status_code, detail, sources = await file_service.chat_service(
+        name=name, query=query
+    )
+
+    return ChatResponseModel(status_code=status_code, detail=detail, sources=sources)
+
+
+@router.post("/chat/batch")
+async def chat_batch(request: ChatBatchRequestModel):
+    status_code, detail, answers = await file_service.chat_batch_service(
+        name=request.name,
+        queries=request.queries,
+        concurrency=request.concurrency,
+    )
+    if answers is None:
+        raise HTTPException(status_code=status_code, detail=detail)
+
+    return StreamingResponse(answers, media_type="application/x-ndjson")
 
 
 @router.get("/list", response_model=ListResponseModel)
@@ -43,14 +91,43 @@ async def delete_file(file_name: str):
 
 
 @router.get("/stream")
-async def chat_stream(name: str, query: str, session_id: str):
+async def chat_stream(
+    query: str,
+    session_id: str,
+    name: str | None = None,
+    flush_ms: int = Query(default=0, ge=0),
+    flush_bytes: int = Query(default=0, ge=0),
+):
+    # 대기열이 가득 찼으면 스트림을 열기 전에 429로 거절합니다.
+    get_llm_admission().check_capacity()
+
     headers = {
         "Cache-Control": "no-cache",
         "Connection": "keep-alive",
         "X-Accel-Buffering": "no",
     }
     return StreamingResponse(
-        file_service.chat_stream_service(name=name, query=query, session_id=session_id),
+        file_service.chat_stream_service(
+            name=name,
+            query=query,
+            session_id=session_id,
+            flush_ms=flush_ms,
+            flush_bytes=flush_bytes,
+        ),
         media_type="text/event-stream",
         headers=headers,
     )
+
+
+@router.get("/stats", response_model=StatsResponseModel)
+async def get_stats() -> StatsResponseModel:
+    status_code, detail, data = await file_service.get_stats_service()
+
+    return StatsResponseModel(status_code=status_code, detail=detail, data=data)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics() -> PlainTextResponse:
+    return PlainTextResponse(
+        render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -1,74 +1,117 @@
 import asyncio
 import hashlib
+import json
 import os
+import time
 from collections.abc import AsyncGenerator
 
 from fastapi import UploadFile
-from langchain_community.chat_message_histories import ChatMessageHistory
-from starlette.status import HTTP_200_OK, HTTP_404_NOT_FOUND
-
-from app.db.text_db import (
-    delete_text_db,
-    find_safe_name_by_name,
-    read_text_db,
-    write_text_db,
+from langchain_core.documents import Document
+from starlette.status import (
+    HTTP_200_OK,
+    HTTP_202_ACCEPTED,
+    HTTP_400_BAD_REQUEST,
+    HTTP_404_NOT_FOUND,
+    HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+    HTTP_500_INTERNAL_SERVER_ERROR,
+    HTTP_502_BAD_GATEWAY,
 )
+
+from app.core.env import (
+    CHAT_BATCH_CONCURRENCY,
+    CHUNK_OVERLAP_TOKENS,
+    CHUNK_TOKENS,
+    CONTEXT_CANDIDATES,
+    MAX_UPLOAD_BYTES,
+)
+from app.db.answer_db import (
+    ALL_DOCUMENTS,
+    find_answer,
+    get_answer_cache_stats,
+    save_answer,
+)
+from app.db.embedding_db import get_embedding_cache_stats
+from app.db.text_db import delete_text_db, find_safe_name_by_name, read_text_db
 from app.db.vector_db import (
-    create_vector_store,
+    VectorStore,
     delete_vector_store,
+    get_vector_store_cache_stats,
     select_vector_store,
 )
+from app.services.job_service import enqueue_ingest_job
+from app.utils.admission_util import AdmissionRejectedError, get_llm_admission
+from app.utils.context_util import build_context, get_context_stats
 from app.utils.langchain_util import (
     add_to_history,
-    create_chunks_to_text,
     get_chain_clovaX,
-    get_langfuse_handler,
+    get_embedding,
+    get_run_config,
     use_chain_clovaX,
 )
-from app.utils.pdf_util import parse_pdf, save_pdf
+from app.utils.metrics_util import STAGE_METRIC, get_trace_id, observe, timed
+from app.utils.pdf_util import UploadTooLargeError, save_pdf
+from app.utils.retrieval_util import (
+    retrieve_documents,
+    retrieve_documents_across,
+    retrieve_documents_batch,
+)
+from app.utils.sse_util import coalesce_deltas, format_ndjson, format_sse
 
 UPLOAD_DIRECTORY = os.path.abspath(
     os.path.join(os.path.dirname(__file__), "..", "..", "uploaded_files")
 )
 
-# 채팅 히스토리 저장용
-store = {}
-
 
-def get_session_history(session_id: str) -> ChatMessageHistory:
-    if session_id not in store:
-        store[session_id] = ChatMessageHistory()
-    return store[session_id]
-
-
-async def file_upload_service(file: UploadFile) -> tuple[int, str]:
+async def file_upload_service(
+    file: UploadFile,
+    index_type: str | None = None,
+    chunk_tokens: int | None = None,
+    chunk_overlap: int | None = None,
+) -> tuple[int, str, str | None]:
     """파일 업로드 서비스
 
+    파일을 저장한 뒤 파싱/청킹/임베딩은 백그라운드 작업으로 넘기고 바로 반환합니다.
+
     Args:
         file (UploadFile): 업로드된 파일 객체
+        index_type (str | None): 벡터 인덱스 종류, None이면 설정 값 사용
+        chunk_tokens (int | None): 청크 최대 토큰 수, None이면 설정 값 사용
+        chunk_overlap (int | None): 청크 겹침 토큰 수, None이면 설정 값 사용
 
     Returns:
-        tuple[int, str]: 상태 코드와 메시지
+        tuple[int, str, str | None]: 상태 코드, 메시지, 작업 ID
     """
+    if (chunk_tokens or CHUNK_TOKENS) <= (
+        CHUNK_OVERLAP_TOKENS if chunk_overlap is None else chunk_overlap
+    ):
+        return HTTP_400_BAD_REQUEST, "청크 겹침은 청크 크기보다 작아야 합니다.", None
+
     # 저장 이름 설정
     file_basename, _ = os.path.splitext(file.filename)
     safe_folder_name = hashlib.sha256(file_basename.encode("utf-8")).hexdigest()
 
-    # PDF 파싱
-    parse_text = await parse_pdf(file=file)
-
-    # PDF 저장
-    await save_pdf(file=file, safe_name=safe_folder_name)
-
-    # 청킹
-    documents = await create_chunks_to_text(parse_text)
-
-    # 텍스트 디비에 이름, 안전 이름 쌍 저장
-    await write_text_db(file_basename, safe_folder_name)
-
-    await create_vector_store(name=safe_folder_name, chunks=documents)
-
-    return HTTP_200_OK, "저장 성공"
+    # PDF 저장 (한 번만 읽으면서 디스크에 쓰고 해시 계산)
+    try:
+        file_path, content_hash = await save_pdf(file=file, safe_name=safe_folder_name)
+    except UploadTooLargeError:
+        return (
+            HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            f"파일 크기는 {MAX_UPLOAD_BYTES} 바이트를 넘을 수 없습니다.",
+            None,
+        )
+
+    # 인제스트 작업 등록
+    job_id = await enqueue_ingest_job(
+        name=file_basename,
+        safe_name=safe_folder_name,
+        file_path=file_path,
+        content_hash=content_hash,
+        index_type=index_type,
+        chunk_tokens=chunk_tokens,
+        chunk_overlap=chunk_overlap,
+    )
+
+    return HTTP_202_ACCEPTED, "업로드 접수", job_id
 
 
 async def file_delete_service(name: str) -> tuple[int, str]:
@@ -94,36 +137,241 @@ async def file_delete_service(name: str) -> tuple[int, str]:
     return HTTP_200_OK, "삭제 성공"
 
 
-async def chat_service(
-    name: str, query: str, session_id: str = "default"
-) -> tuple[int, str]:
-    """채팅 서비스
+async def find_search_scope(name: str | None) -> tuple[str, VectorStore | None] | None:
+    """질문할 범위(문서 하나 또는 전체 문서)를 찾는 함수
 
     Args:
-        name (str): 벡터 스토어 이름
-        query (str): 질문
-        session_id (str): 세션 ID
+        name (str | None): 파일 이름, None이면 전체 문서
 
     Returns:
-        tuple[int, str]: 상태코드와 메시지
+        tuple[str, VectorStore | None] | None: (답변 캐시 키, 벡터 스토어), 파일이 없으면 None
     """
+    if name is None:
+        return ALL_DOCUMENTS, None
 
     safe_name = await find_safe_name_by_name(name=name)
     vector_store = await select_vector_store(name=safe_name)
+    if vector_store is None:
+        return None
+
+    return safe_name, vector_store
+
+
+@timed("chat.retrieve")
+async def retrieve_context(
+    name: str | None, safe_name: str, vector_store: VectorStore | None, query: str
+) -> tuple[str, list[str]]:
+    """질문과 관련된 청크를 검색해 프롬프트 컨텍스트와 출처 문서 이름을 만드는 함수
 
+    CONTEXT_CANDIDATES개의 후보를 검색한 뒤 중복 제거, MMR 재정렬을 거쳐 토큰
+    예산 안에서 텍스트로 담습니다.
+
+    Args:
+        name (str | None): 파일 이름, None이면 전체 문서
+        safe_name (str): 벡터 스토어 이름
+        vector_store (VectorStore | None): 벡터 스토어 객체, 전체 문서 검색이면 None
+        query (str): 질문
+
+    Returns:
+        tuple[str, list[str]]: 컨텍스트 텍스트와 출처 문서 이름 리스트
+    """
+    if vector_store is None:
+        chunk = await retrieve_documents_across(query=query, k=CONTEXT_CANDIDATES)
+    else:
+        chunk = await retrieve_documents(
+            vector_store=vector_store,
+            safe_name=safe_name,
+            query=query,
+            k=CONTEXT_CANDIDATES,
+        )
+
+    context, packed = await build_context(
+        documents=chunk, embedding=await get_embedding()
+    )
     if vector_store is None:
-        return HTTP_404_NOT_FOUND, "벡터 스토어가 존재하지 않습니다."
+        return context, list(dict.fromkeys(doc.metadata["source"] for doc in packed))
+    return context, [name]
+
+
+async def chat_service(
+    name: str | None, query: str, session_id: str = "default"
+) -> tuple[int, str, list[str]]:
+    """채팅 서비스
+
+    Args:
+        name (str | None): 벡터 스토어 이름, None이면 업로드된 전체 문서에서 검색
+        query (str): 질문
+        session_id (str): 세션 ID
 
-    chunk = vector_store.similarity_search(query=query)
+    Returns:
+        tuple[int, str, list[str]]: 상태코드, 메시지, 출처 문서 이름
+    """
 
-    # AI 응답 생성
-    result = await use_chain_clovaX(chunk=chunk, query=query)
+    scope = await find_search_scope(name=name)
+    if scope is None:
+        return HTTP_404_NOT_FOUND, "벡터 스토어가 존재하지 않습니다.", []
+    safe_name, vector_store = scope
+
+    # 같은 문서에 대한 같은(비슷한) 질문이면 캐시된 답변 사용
+    cached = await find_answer(safe_name=safe_name, query=query)
+    if cached is not None:
+        result, sources = cached
+    else:
+        context, sources = await retrieve_context(
+            name=name, safe_name=safe_name, vector_store=vector_store, query=query
+        )
+
+        # AI 응답 생성
+        result = await use_chain_clovaX(context=context, query=query)
+        await save_answer(
+            safe_name=safe_name, query=query, answer=result, sources=sources
+        )
 
     # 히스토리에 추가
     await add_to_history(session_id=session_id, query=query, response=result)
 
     # 반환
-    return HTTP_200_OK, result
+    return HTTP_200_OK, result, sources
+
+
+async def chat_batch_service(
+    name: str, queries: list[str], concurrency: int | None = None
+) -> tuple[int, str, AsyncGenerator[str, None] | None]:
+    """배치 채팅 서비스
+
+    벡터 스토어를 한 번만 열고, 답변 생성은 generate_batch_answers에서 합니다.
+
+    Args:
+        name (str): 파일 이름
+        queries (list[str]): 질문 리스트
+        concurrency (int | None): 동시에 생성할 답변 수, None이면 설정 값 사용
+
+    Returns:
+        tuple[int, str, AsyncGenerator[str, None] | None]: 상태 코드, 메시지,
+            답변을 NDJSON 줄로 내보내는 제너레이터 (파일이 없으면 None)
+    """
+    scope = await find_search_scope(name=name)
+    if scope is None:
+        return HTTP_404_NOT_FOUND, "벡터 스토어가 존재하지 않습니다.", None
+    safe_name, vector_store = scope
+
+    answers = generate_batch_answers(
+        name=name,
+        safe_name=safe_name,
+        vector_store=vector_store,
+        queries=queries,
+        concurrency=concurrency or CHAT_BATCH_CONCURRENCY,
+    )
+    return HTTP_200_OK, "배치 질문 접수", answers
+
+
+async def generate_batch_answers(
+    name: str,
+    safe_name: str,
+    vector_store: VectorStore,
+    queries: list[str],
+    concurrency: int,
+) -> AsyncGenerator[str, None]:
+    """여러 질문의 답변을 완료되는 순서대로 NDJSON 줄로 내보내는 함수
+
+    캐시된 답변을 먼저 보내고, 나머지 질문은 임베딩과 FAISS 검색을 한 번에
+    수행한 뒤 concurrency개씩 컨텍스트를 만들어 동시에 모델을 호출합니다. 각 줄에는
+    질문 위치(index)가 들어 있으며, 한 질문의 검색이나 답변 생성이 실패해도 그
+    질문만 오류 줄로 보내고 나머지 질문은 계속 처리합니다. 배치 질문은 세션
+    히스토리에 저장하지 않습니다.
+
+    Args:
+        name (str): 파일 이름
+        safe_name (str): 벡터 스토어 이름
+        vector_store (VectorStore): 벡터 스토어 객체
+        queries (list[str]): 질문 리스트
+        concurrency (int): 동시에 생성할 답변 수
+
+    Yields:
+        str: index, query, status_code, detail, sources가 담긴 JSON 줄
+    """
+
+    def make_record(
+        index: int, status_code: int, detail: str, sources: list[str]
+    ) -> dict:
+        return {
+            "index": index,
+            "query": queries[index],
+            "status_code": status_code,
+            "detail": detail,
+            "sources": sources,
+        }
+
+    pending = []
+    for index, query in enumerate(queries):
+        cached = await find_answer(safe_name=safe_name, query=query)
+        if cached is None:
+            pending.append(index)
+            continue
+        cached_answer, cached_sources = cached
+        yield format_ndjson(
+            make_record(index, HTTP_200_OK, cached_answer, cached_sources)
+        )
+
+    if not pending:
+        return
+
+    try:
+        chunks = await retrieve_documents_batch(
+            vector_store=vector_store,
+            safe_name=safe_name,
+            queries=[queries[index] for index in pending],
+            k=CONTEXT_CANDIDATES,
+        )
+    except Exception as e:
+        # 한 번에 검색하므로 실패하면 남은 질문 모두 오류 줄로 보냅니다.
+        for index in pending:
+            yield format_ndjson(
+                make_record(
+                    index, HTTP_500_INTERNAL_SERVER_ERROR, f"검색 실패: {e}", []
+                )
+            )
+        return
+
+    embedding = await get_embedding()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def generate_answer(index: int, chunk: list[Document]) -> dict:
+        query = queries[index]
+        async with semaphore:
+            try:
+                context, _ = await build_context(documents=chunk, embedding=embedding)
+            except Exception as e:
+                return make_record(
+                    index, HTTP_500_INTERNAL_SERVER_ERROR, f"검색 실패: {e}", []
+                )
+
+            try:
+                result = await use_chain_clovaX(context=context, query=query)
+            except AdmissionRejectedError as e:
+                return make_record(index, e.status_code, e.detail, [])
+            except Exception as e:
+                return make_record(
+                    index, HTTP_502_BAD_GATEWAY, f"답변 생성 실패: {e}", []
+                )
+
+            await save_answer(
+                safe_name=safe_name, query=query, answer=result, sources=[name]
+            )
+
+        return make_record(index, HTTP_200_OK, result, [name])
+
+    tasks = [
+        asyncio.create_task(generate_answer(index, chunk))
+        for index, chunk in zip(pending, chunks)
+    ]
+    try:
+        for task in asyncio.as_completed(tasks):
+            yield format_ndjson(await task)
+    finally:
+        # 클라이언트가 연결을 끊으면 남은 모델 호출을 취소합니다.
+        for task in tasks:
+            task.cancel()
 
 
 async def get_pdf_file_list() -> tuple[int, str, list[str]]:
@@ -133,6 +381,24 @@ async def get_pdf_file_list() -> tuple[int, str, list[str]]:
     return HTTP_200_OK, "리스트 조회 성공", file_names
 
 
+async def get_stats_service() -> tuple[int, str, dict[str, dict[str, int]]]:
+    """캐시 통계 조회 서비스
+
+    Returns:
+        tuple[int, str, dict[str, dict[str, int]]]: 상태 코드, 메시지, 캐시별 통계
+    """
+    data = {
+        "vector_store_cache": get_vector_store_cache_stats(),
+        "embedding_cache": get_embedding_cache_stats(),
+        "answer_cache": get_answer_cache_stats(),
+        "query_embedding_cache": (await get_embedding()).get_query_cache_stats(),
+        "context": get_context_stats(),
+        "llm_admission": get_llm_admission().get_stats(),
+    }
+
+    return HTTP_200_OK, "통계 조회 성공", data
+
+
 async def get_file_path_service(name: str) -> str | None:
     file_basename, _ = os.path.splitext(name)
     safe_name = await find_safe_name_by_name(name=file_basename)
@@ -146,60 +412,131 @@ async def get_file_path_service(name: str) -> str | None:
 
 
 async def chat_stream_service(
-    name: str, query: str, session_id: str
+    name: str | None,
+    query: str,
+    session_id: str,
+    flush_ms: int = 0,
+    flush_bytes: int = 0,
 ) -> AsyncGenerator[str, None]:
     """스트리밍 채팅 서비스
 
+    모델이 보내는 토큰 조각을 도착하는 즉시 전달합니다. flush_ms 또는 flush_bytes를
+    지정하면 그 시간/크기만큼 조각을 모아서 하나의 SSE 프레임으로 보냅니다.
+    답변이 끝나면 출처 문서 이름을 sources 이벤트(JSON 리스트)로 보냅니다.
+    요청의 트레이스 ID는 첫 프레임의 trace 이벤트로 보냅니다.
+    입장 제어에서 거절되면 rejected 이벤트(JSON, retry_after 포함)를 보내고 스트림을
+    끝냅니다. EventSource의 기본 error 이벤트와 겹치지 않도록 이름을 따로 둡니다.
+
     Args:
-        name (str): 벡터 스토어 이름
+        name (str | None): 벡터 스토어 이름, None이면 업로드된 전체 문서에서 검색
         query (str): 질문
         session_id (str): 세션 ID
+        flush_ms (int): 조각을 모아 보낼 최대 시간(ms), 0이면 사용하지 않음
+        flush_bytes (int): 조각을 모아 보낼 최대 크기(바이트), 0이면 사용하지 않음
 
     Yields:
         str: 스트리밍 응답 데이터
     """
-    safe_name = await find_safe_name_by_name(name=name)
-    vector_store = await select_vector_store(name=safe_name)
+    event_id = 0
+
+    # 이름 있는 이벤트라 EventSource의 onmessage(본문)에는 섞이지 않습니다.
+    trace_id = get_trace_id()
+    if trace_id is not None:
+        yield format_sse(trace_id, event="trace")
+
+    scope = await find_search_scope(name=name)
     chain = await get_chain_clovaX()
 
-    if vector_store is None:
-        yield "data: 선택한 파일의 벡터 스토어가 존재하지 않습니다. 파일을 다시 선택하거나 업로드하세요.\n\n"
-        yield "data: [DONE]\n\n"
+    if scope is None:
+        yield format_sse(
+            "선택한 파일의 벡터 스토어가 존재하지 않습니다. 파일을 다시 선택하거나 업로드하세요.",
+            event_id=event_id,
+        )
+        yield format_sse("[DONE]", event_id=event_id + 1)
         return
 
-    chunk = vector_store.similarity_search(query=query)
+    safe_name, vector_store = scope
+
+    # 캐시된 답변이 있으면 모델 호출 없이 그대로 전송
+    cached = await find_answer(safe_name=safe_name, query=query)
+    if cached is not None:
+        answer, sources = cached
+        await add_to_history(session_id=session_id, query=query, response=answer)
+        yield format_sse(answer, event_id=event_id)
+        yield format_sse(json.dumps(sources), event_id=event_id + 1, event="sources")
+        yield format_sse("[DONE]", event_id=event_id + 2)
+        return
 
-    # 세션 히스토리 가져오기
-    history = get_session_history(session_id)
-    # 사용자 질의 저장
-    history.add_user_message(query)
+    context, sources = await retrieve_context(
+        name=name, safe_name=safe_name, vector_store=vector_store, query=query
+    )
 
     # 스트리밍 응답 누적 버퍼
     accumulated_content: list[str] = []
 
-    # 핸들러 불러오기
-    handler = await get_langfuse_handler()
-
-    async for event in chain.astream(
-        {
-            "results": chunk,
-            "query": query,
-        },
-        config={
-            "callbacks": [handler],
-        },
-    ):
-        if event and hasattr(event, "content"):
-            for text in event.content:
-                for t in text:
-                    yield f"data: {t}\n\n"
-                    await asyncio.sleep(0.02)
+    # 첫 토큰까지의 시간과 전체 생성 시간을 따로 기록
+    started = time.perf_counter()
+    first_token = True
+
+    config = await get_run_config()
+    events = get_llm_admission().stream(
+        lambda: chain.astream(
+            {
+                "results": context,
+                "query": query,
+            },
+            config=config,
+        )
+    )
+
+    async def deltas() -> AsyncGenerator[str, None]:
+        nonlocal first_token
+        async for event in events:
+            if not (event and getattr(event, "content", None)):
+                continue
+
+            if first_token:
+                observe(
+                    STAGE_METRIC, time.perf_counter() - started, stage="llm.first_token"
+                )
+                first_token = False
+
+            accumulated_content.append(event.content)
+            yield event.content
+
+    try:
+        async for text in coalesce_deltas(deltas(), flush_ms, flush_bytes):
+            yield format_sse(text, event_id=event_id)
+            event_id += 1
+    except AdmissionRejectedError as e:
+        # 헤더를 이미 보냈으므로 상태 코드 대신 rejected 이벤트로 알립니다.
+        yield format_sse(
+            json.dumps(
+                {
+                    "status_code": e.status_code,
+                    "detail": e.detail,
+                    "retry_after": e.retry_after,
+                },
+                ensure_ascii=False,
+            ),
+            event_id=event_id,
+            event="rejected",
+        )
+        yield format_sse("[DONE]", event_id=event_id + 1)
+        return
+    finally:
+        # 클라이언트가 연결을 끊어도 입장 슬롯을 바로 반납합니다.
+        await events.aclose()
 
-            # yield f"data: {event.content}\n\n"
+    observe(STAGE_METRIC, time.perf_counter() - started, stage="llm.stream")
 
     # ai 답변 저장 (전체 내용)
     full_content = "".join(accumulated_content)
     if full_content:
         await add_to_history(session_id=session_id, query=query, response=full_content)
+        await save_answer(
+            safe_name=safe_name, query=query, answer=full_content, sources=sources
+        )
 
-    yield "data: [DONE]\n\n"
+    yield format_sse(json.dumps(sources), event_id=event_id, event="sources")
+    yield format_sse("[DONE]", event_id=event_id + 1)
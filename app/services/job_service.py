@@ -0,0 +1,339 @@
+import asyncio
+import os
+import time
+import uuid
+
+from starlette.status import HTTP_200_OK, HTTP_404_NOT_FOUND
+
+from app.core.env import INGEST_JOB_CONCURRENCY
+from app.db.job_db import (
+    IngestJob,
+    claim_job,
+    insert_job,
+    insert_job_if_idle,
+    select_job,
+    select_last_done_job,
+    select_unfinished_jobs,
+    update_job,
+)
+from app.db.text_db import read_text_db, write_text_db
+from app.db.vector_db import (
+    create_vector_store,
+    diff_vector_store_pages,
+    is_legacy_vector_store,
+    select_vector_store,
+    update_vector_store,
+)
+from app.utils.langchain_util import create_chunks_to_text, hash_pages
+from app.utils.metrics_util import start_trace, timed
+from app.utils.pdf_util import discard_pdf, get_pdf_path, parse_pdf, promote_pdf
+
+# 실행 중이거나 대기 중인 작업 (진행 상황은 메모리에서 바로 갱신)
+jobs: dict[str, IngestJob] = {}
+job_queue: asyncio.Queue[str] | None = None
+# 같은 문서(safe_name)의 작업을 순서대로 실행하기 위한 잠금
+document_locks: dict[str, asyncio.Lock] = {}
+workers: list[asyncio.Task] = []
+
+
+async def start_job_workers() -> None:
+    """인제스트 워커를 시작하고 완료되지 않은 작업을 다시 큐에 넣는 함수"""
+    global job_queue
+
+    job_queue = asyncio.Queue()
+    workers.extend(
+        asyncio.create_task(job_worker()) for _ in range(max(1, INGEST_JOB_CONCURRENCY))
+    )
+
+    # 담당 프로세스가 종료되어 끝나지 않은 작업은 처음부터 다시 실행합니다.
+    # 여러 워커가 동시에 시작해도 담당을 먼저 바꾼 워커 하나만 실행합니다.
+    for job in await select_unfinished_jobs():
+        if is_process_alive(job["owner"]):
+            continue
+        if not await claim_job(job["id"], os.getpid(), job["owner"]):
+            continue
+        job["owner"] = os.getpid()
+        job["stage"] = "queued"
+        jobs[job["id"]] = job
+        job_queue.put_nowait(job["id"])
+
+    await requeue_legacy_stores()
+
+
+def is_process_alive(pid: int | None) -> bool:
+    """작업을 담당한 다른 프로세스가 아직 실행 중인지 확인하는 함수
+
+    Args:
+        pid (int | None): 담당 프로세스 ID
+
+    Returns:
+        bool: 다른 프로세스가 실행 중이면 True (자기 자신이나 None이면 False)
+    """
+    if pid is None or pid == os.getpid():
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+async def requeue_legacy_stores() -> None:
+    """pickle 기반 이전 형식의 벡터 스토어를 저장된 PDF로 다시 인제스트하는 함수
+
+    이전 형식은 안전하게 열 수 없으므로 새 형식으로 다시 만들 때까지 검색에서 제외됩니다.
+    """
+    for name, safe_name in await read_text_db():
+        file_path = get_pdf_path(safe_name)
+        if is_legacy_vector_store(safe_name) and os.path.exists(file_path):
+            # 다른 워커가 이미 같은 문서를 다시 인제스트하고 있으면 건너뜁니다.
+            await enqueue_ingest_job(
+                name=name,
+                safe_name=safe_name,
+                file_path=file_path,
+                content_hash=None,
+                exclusive=True,
+            )
+
+
+async def stop_job_workers() -> None:
+    """인제스트 워커를 종료하는 함수 (남은 작업은 다음 시작 시 재실행)"""
+    for worker in workers:
+        worker.cancel()
+    await asyncio.gather(*workers, return_exceptions=True)
+    workers.clear()
+
+
+async def enqueue_ingest_job(
+    name: str,
+    safe_name: str,
+    file_path: str,
+    content_hash: str | None,
+    index_type: str | None = None,
+    chunk_tokens: int | None = None,
+    chunk_overlap: int | None = None,
+    exclusive: bool = False,
+) -> str | None:
+    """저장된 PDF의 인제스트 작업을 생성하고 큐에 넣는 함수
+
+    작업은 이 프로세스가 담당하며(owner), 이 프로세스의 워커가 실행합니다.
+
+    Args:
+        name (str): 원본 파일 이름
+        safe_name (str): 안전한 이름
+        file_path (str): 인제스트할 PDF 경로 (업로드면 save_pdf가 저장한 임시 파일)
+        content_hash (str | None): PDF 내용의 sha256 해시
+        index_type (str | None): 벡터 인덱스 종류, None이면 설정 값 사용
+        chunk_tokens (int | None): 청크 최대 토큰 수, None이면 설정 값 사용
+        chunk_overlap (int | None): 청크 겹침 토큰 수, None이면 설정 값 사용
+        exclusive (bool): True면 같은 문서의 완료되지 않은 작업이 없을 때만 생성
+
+    Returns:
+        str | None: 작업 ID, exclusive이고 진행 중인 작업이 있으면 None
+    """
+    now = time.time()
+    job: IngestJob = {
+        "id": uuid.uuid4().hex,
+        "name": name,
+        "safe_name": safe_name,
+        "file_path": file_path,
+        "content_hash": content_hash,
+        "index_type": index_type,
+        "chunk_tokens": chunk_tokens,
+        "chunk_overlap": chunk_overlap,
+        "owner": os.getpid(),
+        "stage": "queued",
+        "pages_parsed": 0,
+        "pages_total": 0,
+        "chunks_embedded": 0,
+        "chunks_total": 0,
+        "pages_reused": 0,
+        "error": None,
+        "created_at": now,
+        "updated_at": now,
+    }
+    if exclusive:
+        if not await insert_job_if_idle(job):
+            return None
+    else:
+        await insert_job(job)
+
+    jobs[job["id"]] = job
+    job_queue.put_nowait(job["id"])
+
+    return job["id"]
+
+
+async def get_job(job_id: str) -> IngestJob | None:
+    """작업 상태를 조회하는 함수
+
+    Args:
+        job_id (str): 작업 ID
+
+    Returns:
+        IngestJob | None: 작업 딕셔너리, 없으면 None
+    """
+    job = jobs.get(job_id)
+    if job is not None:
+        return job.copy()
+    return await select_job(job_id)
+
+
+async def get_job_status_service(job_id: str) -> tuple[int, str, dict | None]:
+    """작업 상태 조회 서비스
+
+    Args:
+        job_id (str): 작업 ID
+
+    Returns:
+        tuple[int, str, dict | None]: 상태 코드, 메시지, 작업 정보
+    """
+    job = await get_job(job_id)
+    if job is None:
+        return HTTP_404_NOT_FOUND, "작업이 존재하지 않습니다.", None
+
+    return HTTP_200_OK, "작업 조회 성공", dict(job)
+
+
+async def job_worker() -> None:
+    """큐에서 작업을 꺼내 순서대로 실행하는 워커
+
+    같은 문서의 작업은 문서별 잠금으로 하나씩 실행하므로, 인제스트 중에 같은
+    문서를 다시 올리면 앞선 작업이 끝난 뒤에 실행됩니다.
+    """
+    while True:
+        job_id = await job_queue.get()
+        job = jobs[job_id]
+        lock = document_locks.setdefault(job["safe_name"], asyncio.Lock())
+        try:
+            async with lock:
+                await run_ingest_job(job)
+        except Exception as e:
+            # 실패한 업로드 파일만 지우고 기존 PDF와 벡터 스토어는 그대로 둡니다.
+            await asyncio.to_thread(discard_pdf, job["file_path"], job["safe_name"])
+            job["stage"] = "failed"
+            job["error"] = str(e)
+            await update_job(job)
+        finally:
+            # 끝난 작업은 메모리에서 제거하고 이후 조회는 DB에서 처리합니다.
+            jobs.pop(job_id, None)
+            job_queue.task_done()
+
+
+async def is_unchanged_upload(job: IngestJob) -> bool:
+    """같은 PDF를 같은 설정으로 다시 올려 인제스트할 필요가 없는지 확인하는 함수
+
+    Args:
+        job (IngestJob): 작업 딕셔너리
+
+    Returns:
+        bool: 마지막으로 완료된 작업과 내용 해시, 인덱스/청크 설정이 같고
+            벡터 스토어가 남아 있으면 True (페이지 수를 재사용한 것으로 기록)
+    """
+    if job["content_hash"] is None:
+        return False
+
+    previous = await select_last_done_job(job["safe_name"])
+    if previous is None or any(
+        previous[key] != job[key]
+        for key in ("content_hash", "index_type", "chunk_tokens", "chunk_overlap")
+    ):
+        return False
+    if await select_vector_store(name=job["safe_name"]) is None:
+        return False
+
+    pages = previous["pages_total"]
+    job["pages_parsed"] = job["pages_total"] = job["pages_reused"] = pages
+    return True
+
+
+@timed("ingest.total")
+async def run_ingest_job(job: IngestJob) -> None:
+    """PDF 파싱, 청킹, 임베딩, 저장을 수행하고 단계별 진행 상황을 기록하는 함수
+
+    같은 이름의 문서가 이미 있으면 페이지별 내용 해시를 비교하여 바뀐 페이지만
+    청킹, 임베딩하고 나머지 청크와 벡터는 그대로 사용합니다. 내용 해시와 설정이
+    마지막으로 완료된 작업과 같으면 파싱하지 않고 바로 완료합니다. 작업 ID를
+    트레이스 ID로 사용합니다.
+
+    Args:
+        job (IngestJob): 작업 딕셔너리
+    """
+    start_trace(job["id"])
+
+    if await is_unchanged_upload(job):
+        job["file_path"] = await asyncio.to_thread(
+            promote_pdf, job["file_path"], job["safe_name"]
+        )
+        job["stage"] = "done"
+        await update_job(job)
+        return
+
+    def on_pages(parsed: int, total: int) -> None:
+        job["pages_parsed"] = parsed
+        job["pages_total"] = total
+
+    def on_chunks(embedded: int) -> None:
+        job["chunks_embedded"] = embedded
+
+    # PDF 파싱
+    job["stage"] = "parsing"
+    await update_job(job)
+    parse_text = await parse_pdf(file=job["file_path"], on_progress=on_pages)
+    if not any(text.strip() for text in parse_text):
+        # 스캔한 이미지 PDF는 텍스트 레이어가 없어 만들 청크가 없습니다.
+        raise ValueError("PDF에서 추출할 수 있는 텍스트가 없습니다.")
+    page_hashes = hash_pages(
+        texts=parse_text,
+        chunk_tokens=job["chunk_tokens"],
+        chunk_overlap=job["chunk_overlap"],
+    )
+    diff = await diff_vector_store_pages(
+        name=job["safe_name"], page_hashes=page_hashes, index_type=job["index_type"]
+    )
+
+    # 청킹 (재업로드면 바뀐 페이지만)
+    job["stage"] = "chunking"
+    await update_job(job)
+    pages = None if diff is None else diff["added"]
+    documents = await create_chunks_to_text(
+        texts=parse_text if pages is None else [parse_text[p - 1] for p in pages],
+        chunk_tokens=job["chunk_tokens"],
+        chunk_overlap=job["chunk_overlap"],
+        pages=pages,
+    )
+
+    # 임베딩 및 벡터 스토어 저장
+    job["stage"] = "embedding"
+    job["chunks_total"] = len(documents)
+    await update_job(job)
+    if diff is None:
+        await create_vector_store(
+            name=job["safe_name"],
+            chunks=documents,
+            on_progress=on_chunks,
+            index_type=job["index_type"],
+            page_hashes=page_hashes,
+        )
+    else:
+        job["pages_reused"] = len(diff["moved"])
+        await update_vector_store(
+            name=job["safe_name"],
+            diff=diff,
+            chunks=documents,
+            page_hashes=page_hashes,
+            on_progress=on_chunks,
+        )
+
+    # 검색 가능한 상태가 된 뒤 텍스트 디비에 이름, 안전 이름 쌍 저장
+    await write_text_db(job["name"], job["safe_name"])
+
+    # 모두 성공한 뒤에 업로드 파일로 원본 PDF를 교체합니다.
+    job["file_path"] = await asyncio.to_thread(
+        promote_pdf, job["file_path"], job["safe_name"]
+    )
+
+    job["stage"] = "done"
+    await update_job(job)
@@ -0,0 +1,17 @@
+from app.db.state_db import CATALOG_KEY, STORE_KEY_PREFIX, poll_changed_keys
+from app.db.text_db import reload_text_db
+from app.db.vector_db import invalidate_vector_store
+
+
+async def sync_shared_state() -> None:
+    """다른 워커 프로세스의 변경을 이 프로세스의 캐시에 반영하는 서비스
+
+    공유 상태 DB의 버전이 바뀐 카탈로그는 메모리 인덱스를 다시 읽고, 바뀐 벡터
+    스토어는 로드된 스토어, BM25 역색인, 답변 캐시를 비웁니다. 변경이 없으면
+    PRAGMA data_version 한 번만 읽으므로 요청마다 호출해도 됩니다.
+    """
+    for key in poll_changed_keys():
+        if key == CATALOG_KEY:
+            reload_text_db()
+        elif key.startswith(STORE_KEY_PREFIX):
+            invalidate_vector_store(name=key[len(STORE_KEY_PREFIX) :])
@@ -0,0 +1,239 @@
+import asyncio
+import random
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from typing import TypeVar
+
+from starlette.status import HTTP_429_TOO_MANY_REQUESTS, HTTP_503_SERVICE_UNAVAILABLE
+
+from app.core.env import (
+    LLM_MAX_IN_FLIGHT,
+    LLM_MAX_QUEUE,
+    LLM_MAX_RETRIES,
+    LLM_QUEUE_TIMEOUT_SECONDS,
+    LLM_RATE_BURST,
+    LLM_RATE_PER_SECOND,
+    LLM_RETRY_BASE_DELAY,
+)
+from app.utils.embedding_util import get_retry_after, is_rate_limited
+from app.utils.metrics_util import (
+    LLM_IN_FLIGHT_METRIC,
+    LLM_QUEUE_METRIC,
+    LLM_REJECTED_METRIC,
+    LLM_RETRIES_METRIC,
+    LLM_WAIT_METRIC,
+    increment,
+    observe,
+    set_gauge,
+)
+
+T = TypeVar("T")
+
+llm_admission = None
+
+
+class AdmissionRejectedError(Exception):
+    """LLM 호출이 대기열 초과나 대기 시간 초과로 거절되었을 때 발생하는 예외"""
+
+    def __init__(self, status_code: int, detail: str, retry_after: float):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class LLMAdmission:
+    """ClovaX 호출 앞에 두는 입장 제어
+
+    동시에 실행하는 호출 수를 세마포어로 제한하고, 세마포어를 기다리는 호출이
+    max_queue를 넘으면 바로 429로, queue_timeout 안에 차례가 오지 않으면 503으로
+    거절합니다. rate_per_second가 0보다 크면 토큰 버킷으로 호출(재시도 포함)
+    간격을 맞춥니다. 제한은 워커 프로세스마다 적용됩니다.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int,
+        max_queue: int,
+        queue_timeout: float,
+        rate_per_second: float = 0.0,
+        burst: int = 1,
+        max_retries: int = 0,
+        retry_base_delay: float = 0.5,
+    ):
+        self.semaphore = asyncio.Semaphore(max_in_flight)
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.rate_per_second = rate_per_second
+        self.burst = max(1, burst)
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.tokens = float(self.burst)
+        self.refilled = time.monotonic()
+        self.waiting = 0
+        self.in_flight = 0
+        self.stats = {"admitted": 0, "rejected": 0, "retries": 0}
+
+    def _publish(self) -> None:
+        set_gauge(LLM_QUEUE_METRIC, self.waiting)
+        set_gauge(LLM_IN_FLIGHT_METRIC, self.in_flight)
+
+    def _reject(self, status_code: int, reason: str, detail: str):
+        self.stats["rejected"] += 1
+        increment(LLM_REJECTED_METRIC, reason=reason)
+        return AdmissionRejectedError(
+            status_code=status_code,
+            detail=detail,
+            retry_after=max(1.0, self.queue_timeout / 2),
+        )
+
+    def check_capacity(self) -> None:
+        # 슬롯이 모두 찼고 대기열도 가득 찼으면 기다리지 않고 바로 거절합니다.
+        if self.semaphore.locked() and self.waiting >= self.max_queue:
+            raise self._reject(
+                HTTP_429_TOO_MANY_REQUESTS,
+                "queue_full",
+                "요청이 많아 답변 대기열이 가득 찼습니다. 잠시 후 다시 시도하세요.",
+            )
+
+    async def _pace(self) -> None:
+        if self.rate_per_second <= 0:
+            return
+
+        while True:
+            now = time.monotonic()
+            self.tokens = min(
+                self.burst, self.tokens + (now - self.refilled) * self.rate_per_second
+            )
+            self.refilled = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+
+            wait = (1 - self.tokens) / self.rate_per_second
+            if wait > self.queue_timeout:
+                raise self._reject(
+                    HTTP_503_SERVICE_UNAVAILABLE,
+                    "rate_limit",
+                    "답변 생성 호출 한도를 넘었습니다. 잠시 후 다시 시도하세요.",
+                )
+            await asyncio.sleep(wait)
+
+    async def _backoff(self, error: Exception, attempt: int) -> None:
+        self.stats["retries"] += 1
+        increment(LLM_RETRIES_METRIC)
+        # 지수 백오프에 지터를 섞어 여러 요청이 같은 시점에 다시 몰리지 않게 합니다.
+        delay = self.retry_base_delay * 2**attempt
+        await asyncio.sleep(get_retry_after(error) or random.uniform(delay / 2, delay))
+
+    def _should_retry(self, error: Exception, attempt: int) -> bool:
+        return attempt < self.max_retries and is_retryable_error(error)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        if not self.semaphore.locked():
+            # 빈 슬롯이 있으면 기다리지 않고 바로 얻습니다.
+            await self.semaphore.acquire()
+            observe(LLM_WAIT_METRIC, 0.0)
+        else:
+            self.check_capacity()
+            start = time.perf_counter()
+            self.waiting += 1
+            self._publish()
+            try:
+                await asyncio.wait_for(self.semaphore.acquire(), self.queue_timeout)
+            except TimeoutError:
+                raise self._reject(
+                    HTTP_503_SERVICE_UNAVAILABLE,
+                    "timeout",
+                    "답변 대기 시간이 초과되었습니다. 잠시 후 다시 시도하세요.",
+                ) from None
+            finally:
+                self.waiting -= 1
+                observe(LLM_WAIT_METRIC, time.perf_counter() - start)
+
+        self.in_flight += 1
+        self.stats["admitted"] += 1
+        self._publish()
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self.semaphore.release()
+            self._publish()
+
+    async def run(self, call: Callable[[], Awaitable[T]]) -> T:
+        async with self.slot():
+            attempt = 0
+            while True:
+                await self._pace()
+                try:
+                    return await call()
+                except Exception as e:
+                    if not self._should_retry(e, attempt):
+                        raise
+                    await self._backoff(e, attempt)
+                    attempt += 1
+
+    async def stream(self, open_stream: Callable[[], AsyncIterator[T]]):
+        async with self.slot():
+            attempt = 0
+            while True:
+                await self._pace()
+                started = False
+                try:
+                    async for item in open_stream():
+                        started = True
+                        yield item
+                    return
+                except Exception as e:
+                    # 이미 보낸 토큰이 있으면 다시 시도하지 않습니다.
+                    if started or not self._should_retry(e, attempt):
+                        raise
+                    await self._backoff(e, attempt)
+                    attempt += 1
+
+    def get_stats(self) -> dict[str, int]:
+        return {"waiting": self.waiting, "in_flight": self.in_flight, **self.stats}
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """LLM 호출을 다시 시도해도 되는 오류인지 확인하는 함수
+
+    Args:
+        error (Exception): 발생한 예외
+
+    Returns:
+        bool: 요청 한도 초과(429), 서버 오류(5xx), 연결/시간 초과면 True
+    """
+    if is_rate_limited(error) or isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+
+    response = getattr(error, "response", None)
+    status_code = getattr(error, "status_code", None) or getattr(
+        response, "status_code", None
+    )
+    return isinstance(status_code, int) and status_code >= 500
+
+
+def get_llm_admission() -> LLMAdmission:
+    """ClovaX 호출이 함께 쓰는 입장 제어 객체를 반환하는 함수
+
+    Returns:
+        LLMAdmission: LLM_* 설정으로 만든 입장 제어 객체
+    """
+    global llm_admission
+
+    if llm_admission is None:
+        llm_admission = LLMAdmission(
+            max_in_flight=LLM_MAX_IN_FLIGHT,
+            max_queue=LLM_MAX_QUEUE,
+            queue_timeout=LLM_QUEUE_TIMEOUT_SECONDS,
+            rate_per_second=LLM_RATE_PER_SECOND,
+            burst=LLM_RATE_BURST,
+            max_retries=LLM_MAX_RETRIES,
+            retry_base_delay=LLM_RETRY_BASE_DELAY,
+        )
+
+    return llm_admission
@@ -0,0 +1,263 @@
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from app.core.env import CONTEXT_MMR_LAMBDA, CONTEXT_TOKEN_BUDGET, RETRIEVAL_K
+from app.utils.metrics_util import timed
+from app.utils.text_util import count_tokens
+
+# 누적 컨텍스트 통계 (baseline_tokens는 이전처럼 상위 RETRIEVAL_K개 청크의
+# Document repr을 그대로 넣었을 때의 토큰 수)
+context_stats = {
+    "requests": 0,
+    "candidates": 0,
+    "duplicates": 0,
+    "packed": 0,
+    "baseline_tokens": 0,
+    "context_tokens": 0,
+    "saved_tokens": 0,
+}
+
+
+def get_chunk_span(document: Document) -> tuple[tuple, int, int] | None:
+    """청크의 (문서, 페이지) 키와 페이지 내 문자 구간을 반환하는 함수
+
+    Args:
+        document (Document): 청크
+
+    Returns:
+        tuple[tuple, int, int] | None: (키, 시작 위치, 끝 위치),
+            페이지/위치 메타데이터가 없는 이전 청크면 None
+    """
+    start = document.metadata.get("start_index")
+    page = document.metadata.get("page")
+    if start is None or page is None:
+        return None
+
+    key = (document.metadata.get("source"), page)
+    return key, start, start + len(document.page_content)
+
+
+def dedupe_documents(documents: list[Document]) -> list[Document]:
+    """내용이 같거나 더 높은 순위의 청크에 포함되는 청크를 제거하는 함수
+
+    Args:
+        documents (list[Document]): 관련도 순 청크 리스트
+
+    Returns:
+        list[Document]: 순서를 유지한 채 중복을 제거한 청크 리스트
+    """
+    kept: list[Document] = []
+    texts: list[str] = []
+    spans: list[tuple[tuple, int, int]] = []
+    for document in documents:
+        text = " ".join(document.page_content.split())
+        span = get_chunk_span(document)
+        if any(text in kept_text for kept_text in texts):
+            continue
+        if span is not None and any(
+            key == span[0] and start <= span[1] and span[2] <= end
+            for key, start, end in spans
+        ):
+            continue
+
+        kept.append(document)
+        texts.append(text)
+        if span is not None:
+            spans.append(span)
+
+    return kept
+
+
+def mmr_order(vectors: np.ndarray, mmr_lambda: float) -> list[int]:
+    """Maximal Marginal Relevance 순서를 계산하는 함수
+
+    관련도는 검색 순위(1에서 0으로 선형 감소)를 사용하고, 이미 고른 청크와의
+    최대 코사인 유사도를 중복도로 뺍니다.
+
+    Args:
+        vectors (np.ndarray): 검색 순위 순 청크 임베딩 (행 단위 정규화)
+        mmr_lambda (float): 관련도 가중치 (1이면 검색 순위 그대로)
+
+    Returns:
+        list[int]: 선택 순서대로 정렬된 청크 인덱스 리스트
+    """
+    count = len(vectors)
+    relevance = 1.0 - np.arange(count) / count
+    redundancy = np.zeros(count)
+    remaining = list(range(count))
+    order = []
+    while remaining:
+        scores = (
+            mmr_lambda * relevance[remaining]
+            - (1.0 - mmr_lambda) * redundancy[remaining]
+        )
+        best = remaining.pop(int(np.argmax(scores)))
+        order.append(best)
+        redundancy = np.maximum(redundancy, vectors @ vectors[best])
+
+    return order
+
+
+async def rerank_documents(
+    documents: list[Document],
+    embedding: Embeddings,
+    mmr_lambda: float = CONTEXT_MMR_LAMBDA,
+) -> list[Document]:
+    """MMR로 비슷한 청크가 연달아 들어가지 않도록 순서를 바꾸는 함수
+
+    청크 임베딩은 업로드 시 임베딩 캐시에 저장된 값을 다시 읽으므로 보통 API를
+    호출하지 않습니다.
+
+    Args:
+        documents (list[Document]): 관련도 순 청크 리스트
+        embedding (Embeddings): 임베딩 객체
+        mmr_lambda (float): 관련도 가중치 (1 이상이면 순서를 바꾸지 않음)
+
+    Returns:
+        list[Document]: MMR 순으로 정렬된 청크 리스트
+    """
+    if mmr_lambda >= 1.0 or len(documents) < 3:
+        return documents
+
+    vectors = np.asarray(
+        await embedding.aembed_documents([d.page_content for d in documents]),
+        dtype=np.float32,
+    )
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors /= np.where(norms == 0, 1.0, norms)
+
+    return [documents[i] for i in mmr_order(vectors, mmr_lambda)]
+
+
+def pack_documents(
+    documents: list[Document], budget: int = CONTEXT_TOKEN_BUDGET
+) -> list[Document]:
+    """청크를 토큰 예산 안에서 순서대로 담는 함수
+
+    같은 페이지에서 구간이 겹치거나 맞닿은 청크는 겹치는 부분을 한 번만 넣도록
+    하나의 구간으로 합칩니다. 예산을 넘는 청크는 건너뛰고 다음 청크를 시도하며,
+    첫 청크는 예산과 관계없이 담습니다.
+
+    Args:
+        documents (list[Document]): 담을 순서대로 정렬된 청크 리스트
+        budget (int): 컨텍스트 토큰 예산
+
+    Returns:
+        list[Document]: 담긴 구간 리스트 (합쳐진 구간은 첫 청크의 메타데이터 사용)
+    """
+    passages: list[dict] = []
+    used = 0
+    for document in documents:
+        span = get_chunk_span(document)
+        passage = None
+        if span is not None:
+            key, start, end = span
+            passage = next(
+                (
+                    p
+                    for p in passages
+                    if p["key"] == key and start <= p["end"] and end >= p["start"]
+                ),
+                None,
+            )
+
+        if passage is None:
+            cost = count_tokens(document.page_content)
+            if passages and used + cost > budget:
+                continue
+            passages.append(
+                {
+                    "key": span[0] if span else None,
+                    "start": span[1] if span else 0,
+                    "end": span[2] if span else 0,
+                    "text": document.page_content,
+                    "metadata": document.metadata,
+                }
+            )
+            used += cost
+            continue
+
+        text = passage["text"]
+        if start < passage["start"]:
+            text = document.page_content[: passage["start"] - start] + text
+        if end > passage["end"]:
+            text += document.page_content[passage["end"] - start :]
+        cost = count_tokens(text) - count_tokens(passage["text"])
+        if used + cost > budget:
+            continue
+        passage.update(
+            start=min(start, passage["start"]), end=max(end, passage["end"]), text=text
+        )
+        used += cost
+
+    return [Document(page_content=p["text"], metadata=p["metadata"]) for p in passages]
+
+
+def format_context(documents: list[Document]) -> str:
+    """청크를 프롬프트에 넣을 텍스트로 만드는 함수
+
+    Args:
+        documents (list[Document]): 청크 리스트
+
+    Returns:
+        str: "[번호] 문서 이름 페이지" 머리글과 본문으로 이루어진 컨텍스트
+    """
+    blocks = []
+    for i, document in enumerate(documents, 1):
+        source = document.metadata.get("source")
+        page = document.metadata.get("page")
+        label = " ".join(
+            part for part in (source, f"{page}쪽" if page else None) if part
+        )
+        blocks.append(f"[{i}] {label}".rstrip() + "\n" + document.page_content)
+
+    return "\n\n".join(blocks)
+
+
+@timed("context.build")
+async def build_context(
+    documents: list[Document],
+    embedding: Embeddings,
+    budget: int = CONTEXT_TOKEN_BUDGET,
+    mmr_lambda: float = CONTEXT_MMR_LAMBDA,
+) -> tuple[str, list[Document]]:
+    """검색된 청크로 프롬프트 컨텍스트를 만드는 함수
+
+    중복 제거 -> MMR 재정렬 -> 토큰 예산 안에서 겹치는 구간을 합치며 담기 ->
+    텍스트 포맷 순으로 처리하고, 이전 방식 대비 줄어든 토큰 수를 통계에 더합니다.
+
+    Args:
+        documents (list[Document]): 관련도 순 검색 후보 청크 리스트
+        embedding (Embeddings): 임베딩 객체
+        budget (int): 컨텍스트 토큰 예산
+        mmr_lambda (float): MMR 관련도 가중치
+
+    Returns:
+        tuple[str, list[Document]]: 컨텍스트 텍스트와 담긴 구간 리스트
+    """
+    unique = dedupe_documents(documents)
+    ordered = await rerank_documents(unique, embedding, mmr_lambda)
+    packed = pack_documents(ordered, budget)
+    context = format_context(packed)
+
+    baseline_tokens = count_tokens(str(documents[:RETRIEVAL_K]))
+    context_tokens = count_tokens(context)
+    context_stats["requests"] += 1
+    context_stats["candidates"] += len(documents)
+    context_stats["duplicates"] += len(documents) - len(unique)
+    context_stats["packed"] += len(packed)
+    context_stats["baseline_tokens"] += baseline_tokens
+    context_stats["context_tokens"] += context_tokens
+    context_stats["saved_tokens"] += baseline_tokens - context_tokens
+
+    return context, packed
+
+
+def get_context_stats() -> dict[str, int]:
+    """컨텍스트 구성 누적 통계를 반환하는 함수
+
+    Returns:
+        dict[str, int]: 요청 수, 후보/중복/담긴 청크 수, 이전 방식/실제 토큰 수와 차이
+    """
+    return dict(context_stats)
@@ -0,0 +1,227 @@
+import asyncio
+import random
+from collections import OrderedDict
+from collections.abc import Callable
+
+from langchain_core.embeddings import Embeddings
+
+from app.core.env import (
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_CONCURRENCY,
+    EMBEDDING_MAX_RETRIES,
+    EMBEDDING_RETRY_BASE_DELAY,
+    QUERY_EMBEDDING_CACHE_SIZE,
+)
+from app.db.embedding_db import insert_embeddings, make_embedding_key, select_embeddings
+from app.utils.metrics_util import timed
+
+
+class CachedEmbeddings(Embeddings):
+    """청크 텍스트 해시로 임베딩을 캐시하는 임베딩 래퍼
+
+    같은 텍스트(같은 모델/차원)는 다른 문서, 다른 파일 이름으로 업로드되어도
+    다시 임베딩하지 않습니다. 질문 임베딩은 메모리 LRU에 보관합니다.
+    """
+
+    def __init__(
+        self,
+        embedding: Embeddings,
+        model: str,
+        dimensions: int,
+        query_cache_size: int = QUERY_EMBEDDING_CACHE_SIZE,
+    ):
+        self.embedding = embedding
+        self.model = model
+        self.dimensions = dimensions
+        # 반복되는 질문은 임베딩 API를 다시 호출하지 않도록 메모리에 보관
+        self.query_cache: OrderedDict[str, list[float]] = OrderedDict()
+        self.query_cache_size = query_cache_size
+        self.query_cache_stats = {"hits": 0, "misses": 0}
+
+    def _split_cached(
+        self, texts: list[str]
+    ) -> tuple[list[str], dict[str, list[float]], list[str]]:
+        keys = [make_embedding_key(t, self.model, self.dimensions) for t in texts]
+        found = select_embeddings(keys)
+        missing = list(
+            dict.fromkeys(t for t, key in zip(texts, keys) if key not in found)
+        )
+        return keys, found, missing
+
+    def _merge(
+        self,
+        keys: list[str],
+        found: dict[str, list[float]],
+        missing: list[str],
+        vectors: list[list[float]],
+    ) -> list[list[float]]:
+        new = {
+            make_embedding_key(t, self.model, self.dimensions): v
+            for t, v in zip(missing, vectors)
+        }
+        insert_embeddings(new)
+        found.update(new)
+        return [found[key] for key in keys]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        keys, found, missing = self._split_cached(texts)
+        vectors = self.embedding.embed_documents(missing) if missing else []
+        return self._merge(keys, found, missing, vectors)
+
+    @timed("embedding.documents")
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        # 캐시 조회/저장은 SQLite 작업이므로 이벤트 루프를 막지 않도록 스레드에서 실행합니다.
+        keys, found, missing = await asyncio.to_thread(self._split_cached, texts)
+        vectors = await self.embedding.aembed_documents(missing) if missing else []
+        return await asyncio.to_thread(self._merge, keys, found, missing, vectors)
+
+    def _get_cached_query(self, text: str) -> list[float] | None:
+        vector = self.query_cache.get(text)
+        if vector is None:
+            self.query_cache_stats["misses"] += 1
+            return None
+        self.query_cache.move_to_end(text)
+        self.query_cache_stats["hits"] += 1
+        return vector
+
+    def _put_cached_query(self, text: str, vector: list[float]) -> list[float]:
+        if self.query_cache_size > 0:
+            self.query_cache[text] = vector
+            if len(self.query_cache) > self.query_cache_size:
+                self.query_cache.popitem(last=False)
+        return vector
+
+    def embed_query(self, text: str) -> list[float]:
+        vector = self._get_cached_query(text)
+        if vector is None:
+            vector = self._put_cached_query(text, self.embedding.embed_query(text))
+        return vector
+
+    @timed("embedding.query")
+    async def aembed_query(self, text: str) -> list[float]:
+        vector = self._get_cached_query(text)
+        if vector is None:
+            vector = self._put_cached_query(
+                text, await self.embedding.aembed_query(text)
+            )
+        return vector
+
+    @timed("embedding.queries")
+    async def aembed_queries(self, texts: list[str]) -> list[list[float]]:
+        vectors = {text: self._get_cached_query(text) for text in texts}
+        missing = [text for text, vector in vectors.items() if vector is None]
+        if missing:
+            # 없는 질문만 모아 배치 단위로 동시에 임베딩합니다.
+            for text, vector in zip(
+                missing, await embed_texts(missing, self.embedding)
+            ):
+                vectors[text] = self._put_cached_query(text, vector)
+        return [vectors[text] for text in texts]
+
+    def get_query_cache_stats(self) -> dict[str, int]:
+        return {
+            **self.query_cache_stats,
+            "entries": len(self.query_cache),
+            "max_entries": self.query_cache_size,
+        }
+
+
+def is_rate_limited(error: Exception) -> bool:
+    """임베딩 API가 요청 한도 초과(429)로 실패했는지 확인하는 함수
+
+    Args:
+        error (Exception): 발생한 예외
+
+    Returns:
+        bool: 요청 한도 초과 여부
+    """
+    response = getattr(error, "response", None)
+    status_code = getattr(error, "status_code", None) or getattr(
+        response, "status_code", None
+    )
+    return status_code == 429 or "429" in str(error)
+
+
+def get_retry_after(error: Exception) -> float | None:
+    """응답의 Retry-After 헤더 값을 초 단위로 반환하는 함수
+
+    Args:
+        error (Exception): 발생한 예외
+
+    Returns:
+        float | None: 대기 시간(초), 헤더가 없으면 None
+    """
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+@timed("ingest.embed")
+async def embed_texts(
+    texts: list[str],
+    embedding: Embeddings,
+    batch_size: int = EMBEDDING_BATCH_SIZE,
+    concurrency: int = EMBEDDING_CONCURRENCY,
+    max_retries: int = EMBEDDING_MAX_RETRIES,
+    on_progress: Callable[[int], None] | None = None,
+) -> list[list[float]]:
+    """텍스트를 배치로 나누어 동시에 임베딩하는 함수
+
+    세마포어로 동시 요청 수를 제한하고, 실패한 배치는 지수 백오프(지터 포함)로
+    재시도합니다. 요청 한도 초과(429)가 발생하면 모든 배치가 함께 대기합니다.
+
+    Args:
+        texts (list[str]): 임베딩할 텍스트 리스트
+        embedding (Embeddings): 임베딩 객체
+        batch_size (int): 한 번에 보낼 텍스트 수
+        concurrency (int): 동시에 보낼 배치 수
+        max_retries (int): 배치별 최대 재시도 횟수
+        on_progress (Callable[[int], None] | None): 배치 완료 시 누적 임베딩 수를 받는 콜백
+
+    Returns:
+        list[list[float]]: 입력 순서와 같은 순서의 벡터 리스트
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    loop = asyncio.get_running_loop()
+    # 429 응답 이후 모든 배치가 재개할 수 있는 시각
+    cooldown_until = 0.0
+    done = 0
+
+    async def embed_batch(batch: list[str]) -> list[list[float]]:
+        nonlocal cooldown_until, done
+
+        attempt = 0
+        while True:
+            async with semaphore:
+                wait = cooldown_until - loop.time()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+
+                try:
+                    vectors = await embedding.aembed_documents(batch)
+                except Exception as e:
+                    if attempt >= max_retries:
+                        raise
+
+                    delay = EMBEDDING_RETRY_BASE_DELAY * 2**attempt
+                    delay = get_retry_after(e) or random.uniform(delay / 2, delay)
+                    if is_rate_limited(e):
+                        cooldown_until = max(cooldown_until, loop.time() + delay)
+                else:
+                    done += len(batch)
+                    if on_progress is not None:
+                        on_progress(done)
+                    return vectors
+
+            # 세마포어를 반납한 뒤 대기하여 다른 배치가 진행될 수 있게 합니다.
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    batches = [
+        texts[i : i + batch_size] for i in range(0, len(texts), max(1, batch_size))
+    ]
+    results = await asyncio.gather(*(embed_batch(batch) for batch in batches))
+
+    return [vector for vectors in results for vector in vectors]
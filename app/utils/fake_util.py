@@ -0,0 +1,137 @@
+import asyncio
+import re
+import time
+from collections.abc import AsyncIterator, Iterator
+from typing import Any
+
+import numpy as np
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from app.db.sparse_db import hash_terms, tokenize
+
+# 가짜 답변을 스트리밍할 때 한 토큰으로 보내는 단위 (단어 + 뒤 공백)
+FAKE_TOKEN_PATTERN = re.compile(r"\S+\s*")
+FAKE_EMPTY_ANSWER = "문서에 없음"
+
+
+class FakeEmbeddings(Embeddings):
+    """네트워크 없이 동작하는 결정적 임베딩
+
+    BM25와 같은 토크나이저로 나눈 단어를 해시해 차원에 더하는 방식(feature
+    hashing)이라 단어가 겹치는 텍스트끼리 가깝고, 호출마다 지정한 지연을 줍니다.
+    """
+
+    def __init__(self, dimensions: int, latency: float = 0.0):
+        self.dimensions = dimensions
+        self.latency = latency
+
+    def _embed(self, text: str) -> list[float]:
+        buckets = hash_terms(tokenize(text)) % np.uint64(self.dimensions)
+        vector = np.bincount(buckets.astype(np.int64), minlength=self.dimensions)
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).astype(np.float32).tolist()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        time.sleep(self.latency)
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        time.sleep(self.latency)
+        return self._embed(text)
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        await asyncio.sleep(self.latency)
+        return [self._embed(text) for text in texts]
+
+    async def aembed_query(self, text: str) -> list[float]:
+        await asyncio.sleep(self.latency)
+        return self._embed(text)
+
+
+class FakeChatModel(BaseChatModel):
+    """네트워크 없이 동작하는 결정적 채팅 모델
+
+    시스템 프롬프트의 [Context] 뒤 텍스트 앞부분을 답변으로 돌려주며, 첫 토큰
+    지연과 초당 토큰 수로 ClovaX의 응답 시간을 흉내 냅니다.
+    """
+
+    first_token_latency: float = 0.0
+    tokens_per_second: float = 0.0
+    max_tokens: int = 128
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-clovax"
+
+    def _answer_tokens(self, messages: list[BaseMessage]) -> list[str]:
+        context = str(messages[0].content).split("[Context]")[-1]
+        tokens = FAKE_TOKEN_PATTERN.findall(context)[: self.max_tokens]
+        return tokens or [FAKE_EMPTY_ANSWER]
+
+    def _token_delay(self) -> float:
+        return 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        tokens = self._answer_tokens(messages)
+        time.sleep(self.first_token_latency + len(tokens) * self._token_delay())
+        message = AIMessage(content="".join(tokens))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        tokens = self._answer_tokens(messages)
+        await asyncio.sleep(
+            self.first_token_latency + len(tokens) * self._token_delay()
+        )
+        message = AIMessage(content="".join(tokens))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self.first_token_latency)
+        for i, token in enumerate(self._answer_tokens(messages)):
+            if i > 0:
+                time.sleep(self._token_delay())
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager is not None:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self.first_token_latency)
+        for i, token in enumerate(self._answer_tokens(messages)):
+            if i > 0:
+                await asyncio.sleep(self._token_delay())
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager is not None:
+                await run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
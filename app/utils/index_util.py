@@ -0,0 +1,243 @@
+import json
+import math
+import os
+
+import faiss
+import numpy as np
+
+from app.core.env import (
+    VECTOR_INDEX_EF_SEARCH,
+    VECTOR_INDEX_FLAT_MAX,
+    VECTOR_INDEX_HNSW_MAX,
+    VECTOR_INDEX_NPROBE,
+    VECTOR_INDEX_TYPE,
+)
+
+INDEX_TYPES = ("flat", "hnsw", "ivfpq", "sq8")
+INDEX_META_FILE_NAME = "index.json"
+
+# HNSW 그래프 이웃 수와 생성 시 탐색 폭
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 80
+
+# IVF-PQ 서브 벡터 수(차원을 나눠야 함)와 코드 비트 수
+PQ_SUBQUANTIZERS = 64
+PQ_BITS = 8
+# k-means 학습에 필요한 중심점당 최소 벡터 수와 학습 샘플 상한
+MIN_POINTS_PER_CENTROID = 39
+MAX_TRAIN_POINTS = 100000
+
+
+def choose_index_type(count: int, index_type: str | None = None) -> str:
+    """청크 수에 맞는 인덱스 종류를 고르는 함수
+
+    Args:
+        count (int): 인덱스에 넣을 벡터 수
+        index_type (str | None): 지정한 인덱스 종류, None이면 VECTOR_INDEX_TYPE 사용
+
+    Returns:
+        str: flat, hnsw, ivfpq, sq8 중 하나
+    """
+    index_type = index_type or VECTOR_INDEX_TYPE
+    if index_type in INDEX_TYPES:
+        return index_type
+
+    if count < VECTOR_INDEX_FLAT_MAX:
+        return "flat"
+    if count < VECTOR_INDEX_HNSW_MAX:
+        return "hnsw"
+    return "ivfpq"
+
+
+def get_pq_subquantizers(dimensions: int) -> int:
+    """차원을 나누어 떨어지게 하는 가장 큰 PQ 서브 벡터 수
+
+    Args:
+        dimensions (int): 벡터 차원
+
+    Returns:
+        int: 서브 벡터 수
+    """
+    m = min(PQ_SUBQUANTIZERS, dimensions)
+    while dimensions % m:
+        m -= 1
+    return m
+
+
+def build_index(vectors: np.ndarray, index_type: str) -> faiss.Index:
+    """학습까지 마친 빈 FAISS 인덱스를 만드는 함수
+
+    벡터 추가는 호출하는 쪽에서 IndexIDMap으로 감싸 청크 ID와 함께 처리합니다.
+    IVF-PQ 학습에 벡터가 부족하면 SQ8로 대신 생성합니다.
+
+    Args:
+        vectors (np.ndarray): (개수, 차원) float32 벡터, 학습에 사용
+        index_type (str): flat, hnsw, ivfpq, sq8 중 하나
+
+    Returns:
+        faiss.Index: 검색 파라미터가 적용된 인덱스
+    """
+    count, dimensions = vectors.shape
+
+    nlist = max(1, min(int(4 * math.sqrt(count)), count // MIN_POINTS_PER_CENTROID))
+    if (
+        index_type == "ivfpq"
+        and count < max(2**PQ_BITS, nlist) * MIN_POINTS_PER_CENTROID
+    ):
+        index_type = "sq8"
+
+    if index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dimensions, HNSW_M)
+        index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+    elif index_type == "ivfpq":
+        quantizer = faiss.IndexFlatL2(dimensions)
+        index = faiss.IndexIVFPQ(
+            quantizer, dimensions, nlist, get_pq_subquantizers(dimensions), PQ_BITS
+        )
+        # quantizer가 파이썬에서 먼저 해제되지 않도록 소유권을 인덱스로 넘깁니다.
+        quantizer.this.disown()
+        index.own_fields = True
+    elif index_type == "sq8":
+        index = faiss.IndexScalarQuantizer(dimensions, faiss.ScalarQuantizer.QT_8bit)
+    else:
+        index = faiss.IndexFlatL2(dimensions)
+
+    if not index.is_trained:
+        if count > MAX_TRAIN_POINTS:
+            sample = np.random.default_rng(0).choice(
+                count, MAX_TRAIN_POINTS, replace=False
+            )
+            vectors = vectors[sample]
+        index.train(np.ascontiguousarray(vectors, dtype=np.float32))
+
+    set_search_params(index)
+    return index
+
+
+def unwrap_index(index: faiss.Index) -> faiss.Index:
+    """IndexIDMap으로 감싼 인덱스에서 실제 인덱스를 꺼내는 함수
+
+    Args:
+        index (faiss.Index): FAISS 인덱스
+
+    Returns:
+        faiss.Index: 구체 타입으로 변환된 내부 인덱스
+    """
+    index = faiss.downcast_index(index)
+    if isinstance(index, faiss.IndexIDMap):
+        return faiss.downcast_index(index.index)
+    return index
+
+
+def remove_vectors(index: faiss.Index, ids: list[int]) -> faiss.Index:
+    """IndexIDMap에서 청크 ID의 벡터를 지운 인덱스를 반환하는 함수
+
+    HNSW 그래프는 벡터를 지울 수 없으므로 인덱스에 저장된 나머지 벡터를 꺼내
+    그래프를 다시 만듭니다(임베딩 API는 호출하지 않음).
+
+    Args:
+        index (faiss.Index): IndexIDMap으로 감싼 인덱스
+        ids (list[int]): 지울 청크 ID 리스트
+
+    Returns:
+        faiss.Index: 벡터가 지워진 인덱스 (HNSW면 새로 만든 인덱스)
+    """
+    if not ids:
+        return index
+
+    inner = unwrap_index(index)
+    if not isinstance(inner, faiss.IndexHNSW):
+        index.remove_ids(np.array(ids, dtype=np.int64))
+        return index
+
+    chunk_ids = faiss.vector_to_array(faiss.downcast_index(index).id_map)
+    keep = ~np.isin(chunk_ids, np.array(ids, dtype=np.int64))
+    vectors = inner.reconstruct_n(0, inner.ntotal)[keep]
+
+    rebuilt = faiss.IndexIDMap(build_index(vectors, "hnsw"))
+    rebuilt.add_with_ids(vectors, chunk_ids[keep])
+    return rebuilt
+
+
+def set_search_params(index: faiss.Index) -> None:
+    """근사 인덱스의 검색 파라미터를 현재 설정 값으로 맞추는 함수
+
+    Args:
+        index (faiss.Index): FAISS 인덱스
+    """
+    index = unwrap_index(index)
+    if isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efSearch = VECTOR_INDEX_EF_SEARCH
+    elif isinstance(index, faiss.IndexIVF):
+        index.nprobe = min(VECTOR_INDEX_NPROBE, index.nlist)
+
+
+def describe_index(index: faiss.Index) -> dict:
+    """인덱스 종류와 파라미터를 메타데이터로 정리하는 함수
+
+    Args:
+        index (faiss.Index): FAISS 인덱스
+
+    Returns:
+        dict: 인덱스 종류, 차원, 벡터 수, 종류별 파라미터
+    """
+    meta = {"type": "flat", "dimensions": index.d, "ntotal": index.ntotal}
+    meta["bytes"] = estimate_index_bytes(index)
+
+    index = unwrap_index(index)
+
+    if isinstance(index, faiss.IndexHNSW):
+        meta.update(
+            type="hnsw",
+            m=index.hnsw.nb_neighbors(1),
+            ef_construction=index.hnsw.efConstruction,
+            ef_search=index.hnsw.efSearch,
+        )
+    elif isinstance(index, faiss.IndexIVFPQ):
+        meta.update(
+            type="ivfpq",
+            nlist=index.nlist,
+            nprobe=index.nprobe,
+            pq_m=index.pq.M,
+            pq_bits=index.pq.nbits,
+        )
+    elif isinstance(index, faiss.IndexScalarQuantizer):
+        meta.update(type="sq8")
+
+    return meta
+
+
+def estimate_index_bytes(index: faiss.Index) -> int:
+    """인덱스가 차지하는 메모리를 대략적으로 계산하는 함수
+
+    Args:
+        index (faiss.Index): FAISS 인덱스
+
+    Returns:
+        int: 벡터 코드와 그래프/역파일 목록의 추정 바이트 수
+    """
+    index = faiss.downcast_index(index)
+
+    if isinstance(index, faiss.IndexIDMap):
+        # 청크 ID(8바이트) 배열
+        return estimate_index_bytes(index.index) + index.ntotal * 8
+    if isinstance(index, faiss.IndexHNSW):
+        # 0층 이웃 목록(2M개)이 대부분을 차지합니다.
+        links = index.ntotal * index.hnsw.nb_neighbors(0) * 4
+        return estimate_index_bytes(index.storage) + links
+    if isinstance(index, faiss.IndexIVF):
+        # 벡터 코드 + 벡터 ID(8바이트) + 중심점
+        return index.ntotal * (index.code_size + 8) + index.nlist * index.d * 4
+
+    return index.ntotal * getattr(index, "code_size", index.d * 4)
+
+
+def save_index_meta(path: str, index: faiss.Index) -> None:
+    """인덱스 메타데이터를 벡터 스토어 디렉토리에 저장하는 함수
+
+    Args:
+        path (str): 벡터 스토어 디렉토리
+        index (faiss.Index): FAISS 인덱스
+    """
+    with open(os.path.join(path, INDEX_META_FILE_NAME), "w", encoding="utf-8") as f:
+        json.dump(describe_index(index), f)
@@ -1,3 +1,6 @@
+import asyncio
+import hashlib
+
 from langchain_community.chat_message_histories import ChatMessageHistory
 from langchain_core.documents import Document
 from langchain_core.prompts import ChatPromptTemplate
@@ -6,24 +9,42 @@ from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langfuse.callback import CallbackHandler
 
 from app.core.env import (
+    CHUNK_OVERLAP_TOKENS,
+    CHUNK_TOKENS,
     CLOVASTUDIO_API_TOKEN,
+    FAKE_EMBEDDING_LATENCY_MS,
+    FAKE_LLM_FIRST_TOKEN_MS,
+    FAKE_LLM_TOKENS_PER_SECOND,
     LANGFUSE_HOST,
     LANGFUSE_PUBLIC_KEY,
     LANGFUSE_SECRET_KEY,
+    LLM_BACKEND,
 )
-
-splitter = None
+from app.db.session_db import get_session_store
+from app.utils.admission_util import get_llm_admission
+from app.utils.embedding_util import CachedEmbeddings
+from app.utils.fake_util import FakeChatModel, FakeEmbeddings
+from app.utils.metrics_util import get_trace_id, timed
+from app.utils.text_util import count_tokens
+from app.utils.worker_util import run_in_process
+
+EMBEDDING_MODEL = "bge-m3"
+EMBEDDING_DIMENSIONS = 1024
+# 가짜 임베딩은 임베딩 캐시에서 실제 모델 결과와 섞이지 않도록 모델 이름을 나눕니다.
+FAKE_EMBEDDING_MODEL = "fake-bge-m3"
+CHAT_MAX_TOKENS = 128
+
+# 문단, 문장, 줄, 단어 순으로 경계를 찾아 청크를 나눕니다.
+CHUNK_SEPARATORS = ["\n\n", ". ", "\n", " ", ""]
+
+# (청크 토큰 수, 겹침 토큰 수) -> 스플리터
+splitters: dict[tuple[int, int], RecursiveCharacterTextSplitter] = {}
 embedding = None
 chain_clovaX = None
 clovaX = None
 langfuse_handler = None
-
-langfuseHandler = CallbackHandler(
-    secret_key=LANGFUSE_SECRET_KEY, public_key=LANGFUSE_PUBLIC_KEY, host=LANGFUSE_HOST
-)
-
-# 채팅 히스토리 저장용
-store = {}
+# True면 getter가 네트워크 없이 동작하는 가짜 임베딩/채팅 모델을 반환합니다.
+use_fake_clients = LLM_BACKEND == "fake"
 
 
 def get_session_history(session_id: str) -> ChatMessageHistory:
@@ -33,75 +54,226 @@ def get_session_history(session_id: str) -> ChatMessageHistory:
         session_id (str): 세션 ID
 
     Returns:
-        ChatMessageHistory: 세션 히스토리 객체
+        ChatMessageHistory: 세션 저장소에 저장된 대화로 만든 히스토리 객체
     """
-    if session_id not in store:
-        store[session_id] = ChatMessageHistory()
-    return store[session_id]
+    history = ChatMessageHistory()
+    for role, content in get_session_store().get_messages(session_id):
+        if role == "human":
+            history.add_user_message(content)
+        else:
+            history.add_ai_message(content)
+    return history
+
+
+def get_splitter(
+    chunk_tokens: int = CHUNK_TOKENS, chunk_overlap: int = CHUNK_OVERLAP_TOKENS
+) -> RecursiveCharacterTextSplitter:
+    """텍스트 파싱 스플리터 객체 반환
 
+    청크 크기는 문자 수가 아니라 추정 모델 토큰 수로 계산합니다.
 
-def get_splitter() -> RecursiveCharacterTextSplitter:
-    """텍스트 파싱 스플리터 객체 반환
+    Args:
+        chunk_tokens (int): 청크 최대 토큰 수
+        chunk_overlap (int): 이웃 청크와 겹치는 토큰 수
 
     Returns:
         RecursiveCharacterTextSplitter: 스플리터 객체
     """
-    global splitter
+    key = (chunk_tokens, chunk_overlap)
+    if key not in splitters:
+        splitters[key] = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_tokens,
+            chunk_overlap=chunk_overlap,
+            length_function=count_tokens,
+            separators=CHUNK_SEPARATORS,
+            keep_separator="end",
+            add_start_index=True,
+        )
 
-    if splitter is None:
-        splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=20)
+    return splitters[key]
 
-    return splitter
 
+def split_pages(
+    texts: list[str],
+    chunk_tokens: int,
+    chunk_overlap: int,
+    pages: list[int] | None = None,
+) -> list[Document]:
+    """페이지별로 청크를 나누고 페이지/위치/토큰 수 메타데이터를 붙이는 함수
+    (프로세스 풀에서 실행)
 
-async def create_chunks_to_text(texts: list[str]) -> list[Document]:
-    """텍스트를 받아서 청크 리스트를 생성하는 함수
+    Args:
+        texts (list[str]): 페이지 텍스트 리스트
+        chunk_tokens (int): 청크 최대 토큰 수
+        chunk_overlap (int): 이웃 청크와 겹치는 토큰 수
+        pages (list[int] | None): texts의 페이지 번호(1부터), None이면 순서대로
+
+    Returns:
+        list[Document]: metadata에 page(1부터), start_index(페이지 내 문자 위치),
+            tokens가 들어간 청크 리스트
+    """
+    pages = pages or list(range(1, len(texts) + 1))
+    documents = get_splitter(chunk_tokens, chunk_overlap).create_documents(
+        texts=texts, metadatas=[{"page": page} for page in pages]
+    )
+    for document in documents:
+        document.metadata["tokens"] = count_tokens(document.page_content)
+    return documents
+
+
+@timed("ingest.chunk")
+async def create_chunks_to_text(
+    texts: list[str],
+    chunk_tokens: int | None = None,
+    chunk_overlap: int | None = None,
+    pages: list[int] | None = None,
+) -> list[Document]:
+    """페이지 텍스트를 받아서 청크 리스트를 생성하는 함수
+
+    청크는 페이지를 넘지 않으며 문단, 줄 경계를 우선해 나눕니다. 토큰 수 계산이
+    이벤트 루프를 막지 않도록 프로세스 풀에서 실행합니다.
 
     Args:
-        texts (list[str]): 텍스트 리스트
+        texts (list[str]): 페이지 텍스트 리스트
+        chunk_tokens (int | None): 청크 최대 토큰 수, None이면 CHUNK_TOKENS
+        chunk_overlap (int | None): 겹침 토큰 수, None이면 CHUNK_OVERLAP_TOKENS
+        pages (list[int] | None): texts의 페이지 번호(1부터), None이면 순서대로
 
     Returns:
         list[Document]: 청크 리스트 객체
     """
-    return get_splitter().create_documents(texts=texts)
+    return await run_in_process(
+        split_pages,
+        texts,
+        chunk_tokens or CHUNK_TOKENS,
+        CHUNK_OVERLAP_TOKENS if chunk_overlap is None else chunk_overlap,
+        pages,
+    )
 
 
-async def get_embedding() -> ClovaXEmbeddings:
+def hash_pages(
+    texts: list[str],
+    chunk_tokens: int | None = None,
+    chunk_overlap: int | None = None,
+) -> list[str]:
+    """페이지별 내용 해시를 계산하는 함수
+
+    청크 설정이 바뀌면 같은 페이지도 청크가 달라지므로 해시에 함께 넣습니다.
+
+    Args:
+        texts (list[str]): 페이지 텍스트 리스트
+        chunk_tokens (int | None): 청크 최대 토큰 수, None이면 CHUNK_TOKENS
+        chunk_overlap (int | None): 겹침 토큰 수, None이면 CHUNK_OVERLAP_TOKENS
+
+    Returns:
+        list[str]: 페이지 순서대로의 sha256 해시 리스트
+    """
+    settings = "{}:{}:".format(
+        chunk_tokens or CHUNK_TOKENS,
+        CHUNK_OVERLAP_TOKENS if chunk_overlap is None else chunk_overlap,
+    )
+    return [
+        hashlib.sha256((settings + text).encode("utf-8")).hexdigest() for text in texts
+    ]
+
+
+async def get_embedding() -> CachedEmbeddings:
     """임베딩을 반환하는 함수
 
+    청크 임베딩은 텍스트 해시 캐시를 먼저 확인한 뒤 없는 것만 API로 요청합니다.
+    LLM_BACKEND가 fake면 네트워크 없이 동작하는 가짜 임베딩을 사용합니다.
+
     Returns:
-        ClovaXEmbeddings: 생성된 임베딩
+        CachedEmbeddings: 캐시가 적용된 ClovaX(또는 가짜) 임베딩
     """
     global embedding
 
-    if embedding is None:
-        embedding = ClovaXEmbeddings(
-            model="bge-m3",
-            dimensions=1024,
-            api_key=CLOVASTUDIO_API_TOKEN,
+    if embedding is None and use_fake_clients:
+        embedding = create_fake_embedding(latency_ms=FAKE_EMBEDDING_LATENCY_MS)
+    elif embedding is None:
+        embedding = CachedEmbeddings(
+            embedding=ClovaXEmbeddings(
+                model=EMBEDDING_MODEL,
+                dimensions=EMBEDDING_DIMENSIONS,
+                api_key=CLOVASTUDIO_API_TOKEN,
+            ),
+            model=EMBEDDING_MODEL,
+            dimensions=EMBEDDING_DIMENSIONS,
         )
 
     return embedding
 
 
-async def get_clovaX() -> ChatClovaX:
+async def get_clovaX() -> ChatClovaX | FakeChatModel:
     """클로바엑스 객체 반환 함수
 
+    LLM_BACKEND가 fake면 네트워크 없이 동작하는 가짜 채팅 모델을 사용합니다.
+
     Returns:
-        ChatClovaX: 클로바엑스 객체
+        ChatClovaX | FakeChatModel: 클로바엑스(또는 가짜) 객체
     """
     global clovaX
 
-    if clovaX is None:
+    if clovaX is None and use_fake_clients:
+        clovaX = FakeChatModel(
+            first_token_latency=FAKE_LLM_FIRST_TOKEN_MS / 1000,
+            tokens_per_second=FAKE_LLM_TOKENS_PER_SECOND,
+            max_tokens=CHAT_MAX_TOKENS,
+        )
+    elif clovaX is None:
         clovaX = ChatClovaX(
             model="HCX-003",
-            max_tokens=128,
+            max_tokens=CHAT_MAX_TOKENS,
             api_key=CLOVASTUDIO_API_TOKEN,
         )
 
     return clovaX
 
 
+def create_fake_embedding(latency_ms: float = 0.0) -> CachedEmbeddings:
+    """캐시가 적용된 가짜 임베딩을 만드는 함수
+
+    Args:
+        latency_ms (float): 임베딩 호출마다 줄 지연(ms)
+
+    Returns:
+        CachedEmbeddings: 가짜 임베딩을 감싼 캐시 임베딩
+    """
+    return CachedEmbeddings(
+        embedding=FakeEmbeddings(EMBEDDING_DIMENSIONS, latency=latency_ms / 1000),
+        model=FAKE_EMBEDDING_MODEL,
+        dimensions=EMBEDDING_DIMENSIONS,
+    )
+
+
+def install_fake_clients(
+    first_token_ms: float = FAKE_LLM_FIRST_TOKEN_MS,
+    tokens_per_second: float = FAKE_LLM_TOKENS_PER_SECOND,
+    embedding_latency_ms: float = FAKE_EMBEDDING_LATENCY_MS,
+) -> None:
+    """getter가 반환할 임베딩/채팅 모델을 가짜 객체로 바꾸는 함수
+
+    테스트나 벤치마크에서 서버(lifespan) 시작 전에 호출하면 모든 서비스가
+    네트워크 없이 지정한 지연으로 동작하고 랭퓨즈 콜백도 사용하지 않습니다.
+
+    Args:
+        first_token_ms (float): 첫 토큰까지의 지연(ms)
+        tokens_per_second (float): 초당 생성 토큰 수, 0이면 지연 없음
+        embedding_latency_ms (float): 임베딩 호출마다 줄 지연(ms)
+    """
+    global embedding, clovaX, chain_clovaX, langfuse_handler, use_fake_clients
+
+    use_fake_clients = True
+    embedding = create_fake_embedding(latency_ms=embedding_latency_ms)
+    clovaX = FakeChatModel(
+        first_token_latency=first_token_ms / 1000,
+        tokens_per_second=tokens_per_second,
+        max_tokens=CHAT_MAX_TOKENS,
+    )
+    chain_clovaX = None
+    langfuse_handler = None
+
+
 async def get_chain_clovaX():
     """클로바엑스 프롬프트 체인 객체 반환 함수
 
@@ -138,15 +310,21 @@ async def get_chain_clovaX():
     return chain_clovaX
 
 
-async def get_langfuse_handler() -> CallbackHandler:
+async def get_langfuse_handler() -> CallbackHandler | None:
     """랭퓨즈 클라이언트 반환 함수
 
     Returns:
-        CallbackHandler: 랭퓨즈 클라이언트 객체
+        CallbackHandler | None: 랭퓨즈 클라이언트 객체, 랭퓨즈 키가 없거나 가짜
+            모델을 사용하면 None
     """
     global langfuse_handler
 
-    if langfuse_handler is None:
+    if (
+        langfuse_handler is None
+        and not use_fake_clients
+        and LANGFUSE_PUBLIC_KEY
+        and LANGFUSE_SECRET_KEY
+    ):
         langfuse_handler = CallbackHandler(
             public_key=LANGFUSE_PUBLIC_KEY,
             secret_key=LANGFUSE_SECRET_KEY,
@@ -156,25 +334,77 @@ async def get_langfuse_handler() -> CallbackHandler:
     return langfuse_handler
 
 
-async def use_chain_clovaX(chunk: list[Document], query: str) -> str:
+async def get_run_config() -> dict:
+    """체인 실행 설정을 반환하는 함수
+
+    랭퓨즈가 설정되지 않았으면 콜백 없이 실행하고, 현재 요청의 트레이스 ID를
+    메타데이터로 넘겨 랭퓨즈 트레이스와 /metrics, 응답 헤더를 연결합니다.
+
+    Returns:
+        dict: callbacks와 metadata가 담긴 RunnableConfig
+    """
+    handler = await get_langfuse_handler()
+
+    return {
+        "callbacks": [handler] if handler is not None else [],
+        "metadata": {"trace_id": get_trace_id()},
+    }
+
+
+async def warmup_clients() -> None:
+    """서버 시작 시 임베딩, 클로바엑스, 체인, 랭퓨즈 객체를 미리 생성하는 함수
+
+    첫 요청이 클라이언트 생성 비용을 부담하지 않도록 lifespan에서 호출합니다.
+    """
+    await get_embedding()
+    await get_chain_clovaX()
+    await get_langfuse_handler()
+
+
+async def keep_clients_warm(interval: float) -> None:
+    """주기적으로 가벼운 임베딩 요청을 보내 HTTP 연결을 유지하는 함수
+
+    캐시를 거치지 않고 실제 API를 호출해야 하므로 내부 임베딩 객체를 직접 사용합니다.
+
+    Args:
+        interval (float): 요청 주기(초)
+    """
+    while True:
+        try:
+            await (await get_embedding()).embedding.aembed_query("ping")
+        except Exception as e:
+            print(f"Error keeping embedding client warm: {e}")
+        await asyncio.sleep(interval)
+
+
+@timed("llm.invoke")
+async def use_chain_clovaX(context: str, query: str) -> str:
     """체이닝된 클로바엑스 객체 사용 함수
 
+    호출은 입장 제어를 거치며, 요청 한도 초과나 서버 오류는 지터를 섞은
+    지수 백오프로 다시 시도합니다.
+
     Args:
-        chunk (list[Document]): 가장 유사도 높은 청크
+        context (str): 검색한 청크로 만든 컨텍스트 텍스트
         query (str): 질문
 
     Returns:
         str: 질문에 대한 대답
+
+    Raises:
+        AdmissionRejectedError: 대기열이 가득 찼거나 대기 시간이 초과된 경우
     """
     chain = await get_chain_clovaX()
-    await get_langfuse_handler()
-
-    result = await chain.ainvoke(
-        {
-            "results": chunk,
-            "query": query,
-        },
-        config={"callbacks": [langfuseHandler]},
+    config = await get_run_config()
+
+    result = await get_llm_admission().run(
+        lambda: chain.ainvoke(
+            {
+                "results": context,
+                "query": query,
+            },
+            config=config,
+        )
     )
     return result.content
 
@@ -187,6 +417,4 @@ async def add_to_history(session_id: str, query: str, response: str):
         query (str): 사용자 질문
         response (str): AI 응답
     """
-    history = get_session_history(session_id)
-    history.add_user_message(query)
-    history.add_ai_message(response)
+    get_session_store().add_messages(session_id, [("human", query), ("ai", response)])
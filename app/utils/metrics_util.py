@@ -0,0 +1,222 @@
+import asyncio
+import functools
+import threading
+import time
+import uuid
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# 지연 시간 히스토그램 버킷 경계(초)
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+)
+STAGE_METRIC = "rag_stage_duration_seconds"
+REQUEST_METRIC = "rag_request_duration_seconds"
+LLM_WAIT_METRIC = "rag_llm_queue_wait_seconds"
+LLM_QUEUE_METRIC = "rag_llm_queue_depth"
+LLM_IN_FLIGHT_METRIC = "rag_llm_in_flight"
+LLM_REJECTED_METRIC = "rag_llm_rejected_total"
+LLM_RETRIES_METRIC = "rag_llm_retries_total"
+METRIC_HELP = {
+    STAGE_METRIC: "Duration of each request/ingest stage in seconds.",
+    REQUEST_METRIC: "Duration of HTTP requests until response headers in seconds.",
+    LLM_WAIT_METRIC: "Time LLM calls waited for admission in seconds.",
+    LLM_QUEUE_METRIC: "LLM calls waiting for admission.",
+    LLM_IN_FLIGHT_METRIC: "LLM calls currently running.",
+    LLM_REJECTED_METRIC: "LLM calls rejected by admission control.",
+    LLM_RETRIES_METRIC: "LLM calls retried after a retryable error.",
+}
+TRACE_ID_HEADER = "X-Trace-Id"
+
+# 현재 요청(또는 인제스트 작업)의 트레이스 ID
+trace_id_var: ContextVar[str | None] = ContextVar("trace_id", default=None)
+
+# (메트릭 이름, 라벨) -> [버킷별 개수..., +Inf 구간 개수, 합계, 개수]
+histograms: dict[tuple[str, tuple[tuple[str, str], ...]], list[float]] = {}
+# (메트릭 이름, 라벨) -> 현재 값 / 누적 값
+gauges: dict[tuple[str, tuple[tuple[str, str], ...]], float] = {}
+counters: dict[tuple[str, tuple[tuple[str, str], ...]], float] = {}
+# 인제스트/검색 단계는 스레드에서도 실행되므로 잠금으로 보호합니다.
+metrics_lock = threading.Lock()
+
+
+def start_trace(trace_id: str | None = None) -> str:
+    """현재 컨텍스트의 트레이스 ID를 설정하는 함수
+
+    Args:
+        trace_id (str | None): 이어받을 트레이스 ID, None이면 새로 생성
+
+    Returns:
+        str: 설정된 트레이스 ID
+    """
+    trace_id = trace_id or uuid.uuid4().hex
+    trace_id_var.set(trace_id)
+    return trace_id
+
+
+def get_trace_id() -> str | None:
+    """현재 컨텍스트의 트레이스 ID를 반환하는 함수
+
+    Returns:
+        str | None: 트레이스 ID, 요청 밖이면 None
+    """
+    return trace_id_var.get()
+
+
+def observe(name: str, seconds: float, **labels: str) -> None:
+    """히스토그램에 관측값을 기록하는 함수
+
+    Args:
+        name (str): 메트릭 이름
+        seconds (float): 관측값(초)
+        **labels (str): 메트릭 라벨
+    """
+    key = (name, tuple(sorted(labels.items())))
+    with metrics_lock:
+        values = histograms.get(key)
+        if values is None:
+            values = histograms[key] = [0.0] * (len(LATENCY_BUCKETS) + 3)
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                values[i] += 1
+                break
+        else:
+            values[len(LATENCY_BUCKETS)] += 1
+        values[-2] += seconds
+        values[-1] += 1
+
+
+def set_gauge(name: str, value: float, **labels: str) -> None:
+    """게이지 값을 설정하는 함수
+
+    Args:
+        name (str): 메트릭 이름
+        value (float): 현재 값
+        **labels (str): 메트릭 라벨
+    """
+    with metrics_lock:
+        gauges[(name, tuple(sorted(labels.items())))] = value
+
+
+def increment(name: str, amount: float = 1.0, **labels: str) -> None:
+    """카운터 값을 늘리는 함수
+
+    Args:
+        name (str): 메트릭 이름
+        amount (float): 늘릴 값
+        **labels (str): 메트릭 라벨
+    """
+    key = (name, tuple(sorted(labels.items())))
+    with metrics_lock:
+        counters[key] = counters.get(key, 0.0) + amount
+
+
+@contextmanager
+def measure(stage: str) -> Iterator[None]:
+    """with 블록의 실행 시간을 단계 히스토그램에 기록하는 컨텍스트 매니저
+
+    Args:
+        stage (str): 단계 이름
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(STAGE_METRIC, time.perf_counter() - start, stage=stage)
+
+
+def timed(stage: str) -> Callable[[Callable], Callable]:
+    """함수(동기/비동기) 실행 시간을 단계 히스토그램에 기록하는 데코레이터
+
+    Args:
+        stage (str): 단계 이름
+
+    Returns:
+        Callable: 데코레이터
+    """
+
+    def decorator(func: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with measure(stage):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with measure(stage):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def format_labels(labels: tuple[tuple[str, str], ...]) -> str:
+    return ",".join(
+        '{}="{}"'.format(
+            key,
+            value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"),
+        )
+        for key, value in labels
+    )
+
+
+def render_metrics() -> str:
+    """기록된 메트릭을 Prometheus 텍스트 형식으로 만드는 함수
+
+    Returns:
+        str: Prometheus 텍스트 노출 형식(0.0.4) 문자열
+    """
+    with metrics_lock:
+        snapshot = sorted((key, list(values)) for key, values in histograms.items())
+        scalars = [
+            ("gauge", sorted(gauges.items())),
+            ("counter", sorted(counters.items())),
+        ]
+
+    lines = []
+    for name in sorted({name for (name, _), _ in snapshot}):
+        lines.append(f"# HELP {name} {METRIC_HELP.get(name, name)}")
+        lines.append(f"# TYPE {name} histogram")
+        for (metric, labels), values in snapshot:
+            if metric != name:
+                continue
+            cumulative = 0.0
+            for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), values):
+                cumulative += count
+                bucket_labels = format_labels(labels + (("le", str(bound)),))
+                lines.append(f"{name}_bucket{{{bucket_labels}}} {cumulative:g}")
+            label_text = f"{{{format_labels(labels)}}}" if labels else ""
+            lines.append(f"{name}_sum{label_text} {values[-2]:.6f}")
+            lines.append(f"{name}_count{label_text} {values[-1]:g}")
+
+    for metric_type, items in scalars:
+        for name in sorted({name for (name, _), _ in items}):
+            lines.append(f"# HELP {name} {METRIC_HELP.get(name, name)}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for (metric, labels), value in items:
+                if metric == name:
+                    label_text = f"{{{format_labels(labels)}}}" if labels else ""
+                    lines.append(f"{name}{label_text} {value:g}")
+
+    return "\n".join(lines) + "\n"
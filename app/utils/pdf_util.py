@@ -1,60 +1,340 @@
+import asyncio
+import hashlib
+import importlib.util
+import io
+import mmap
 import os
-import shutil
-from typing import Any
+import tempfile
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import BinaryIO, cast
 
 import PyPDF2
 from fastapi import UploadFile
 
-from app.utils.text_util import preprocessing_text
+from app.core.env import INGEST_WORKERS, MAX_UPLOAD_BYTES, PDF_BACKEND
+from app.utils.metrics_util import timed
+from app.utils.text_util import preprocessing_texts
+from app.utils.worker_util import run_in_process
 
 UPLOAD_DIRECTORY = os.path.abspath(
     os.path.join(os.path.dirname(__file__), "..", "..", "uploaded_files")
 )
 
+# 워커 하나가 맡는 최소 페이지 수 (작은 파일은 나누지 않음)
+MIN_PAGES_PER_TASK = 8
 
-async def parse_pdf(file: str | UploadFile) -> list[str]:
+# 업로드 파일을 디스크에 쓸 때 한 번에 읽는 크기
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# PDF 텍스트 추출 백엔드와 import 모듈 이름 (auto는 설치된 것 중 앞에서부터 선택)
+PDF_BACKEND_MODULES = {
+    "pypdfium2": "pypdfium2",
+    "pypdf2": "PyPDF2",
+    "pdfminer": "pdfminer",
+}
+
+
+class UploadTooLargeError(Exception):
+    """업로드 파일이 MAX_UPLOAD_BYTES를 넘었을 때 발생하는 예외"""
+
+
+@contextmanager
+def open_pdf(source: str | bytes) -> Iterator[PyPDF2.PdfReader]:
+    """파일 경로는 mmap으로, 바이트는 메모리 스트림으로 열어 PdfReader 반환
+
+    PdfReader에 경로를 넘기면 파일 전체를 메모리로 복사하므로, mmap을 넘겨
+    필요한 부분만 페이지 캐시에서 읽도록 합니다.
+
+    Args:
+        source (str | bytes): 파일 경로 또는 pdf 바이트
+
+    Yields:
+        PyPDF2.PdfReader: pdf 리더 객체
+    """
+    if not isinstance(source, str):
+        yield PyPDF2.PdfReader(io.BytesIO(source))
+        return
+
+    with open(source, "rb") as f, mmap.mmap(
+        f.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mapped:
+        # mmap은 PdfReader가 쓰는 read/seek/tell을 모두 제공합니다.
+        yield PyPDF2.PdfReader(cast(BinaryIO, mapped))
+
+
+@contextmanager
+def open_pdf_stream(source: str | bytes) -> Iterator[BinaryIO]:
+    """파일 경로 또는 바이트를 읽기용 바이너리 스트림으로 여는 함수
+
+    Args:
+        source (str | bytes): 파일 경로 또는 pdf 바이트
+
+    Yields:
+        BinaryIO: 바이너리 스트림
+    """
+    if not isinstance(source, str):
+        yield io.BytesIO(source)
+        return
+
+    with open(source, "rb") as f:
+        yield f
+
+
+def get_pdf_backend(backend: str | None = None) -> str:
+    """사용할 PDF 텍스트 추출 백엔드 이름을 반환
+
+    지정한 백엔드가 설치되어 있지 않으면 기본 의존성인 pypdf2를 사용합니다.
+
+    Args:
+        backend (str | None): auto, pypdfium2, pypdf2, pdfminer 중 하나,
+            None이면 PDF_BACKEND 설정 사용
+
+    Returns:
+        str: 설치된 백엔드 이름
+    """
+    backend = backend or PDF_BACKEND
+    candidates = PDF_BACKEND_MODULES if backend == "auto" else [backend]
+    for candidate in candidates:
+        module = PDF_BACKEND_MODULES.get(candidate)
+        if module is not None and importlib.util.find_spec(module) is not None:
+            return candidate
+
+    print(f"PDF backend {backend} is not available, falling back to pypdf2")
+    return "pypdf2"
+
+
+def count_pages(source: str | bytes, backend: str = "pypdf2") -> int:
+    """pdf 페이지 수 반환 (프로세스 풀에서 실행)
+
+    Args:
+        source (str | bytes): 파일 경로 또는 pdf 바이트
+        backend (str): get_pdf_backend로 고른 백엔드 이름
+
+    Returns:
+        int: 페이지 수
+    """
+    if backend == "pypdfium2":
+        import pypdfium2
+
+        pdf = pypdfium2.PdfDocument(source)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+
+    if backend == "pdfminer":
+        from pdfminer.pdfpage import PDFPage
+
+        with open_pdf_stream(source) as stream:
+            return sum(1 for _ in PDFPage.get_pages(stream))
+
+    with open_pdf(source) as reader:
+        return len(reader.pages)
+
+
+def extract_raw_pages(
+    source: str | bytes, start: int, stop: int, backend: str
+) -> list[str]:
+    """선택한 백엔드로 pdf의 [start, stop) 범위 페이지 텍스트를 추출
+
+    Args:
+        source (str | bytes): 파일 경로 또는 pdf 바이트
+        start (int): 시작 페이지 인덱스
+        stop (int): 끝 페이지 인덱스 (미포함)
+        backend (str): get_pdf_backend로 고른 백엔드 이름
+
+    Returns:
+        list[str]: 전처리 전 페이지 텍스트 리스트
+    """
+    if backend == "pypdfium2":
+        import pypdfium2
+
+        pdf = pypdfium2.PdfDocument(source)
+        try:
+            texts = []
+            for i in range(start, stop):
+                page = pdf[i]
+                text_page = page.get_textpage()
+                texts.append(text_page.get_text_range())
+                text_page.close()
+                page.close()
+            return texts
+        finally:
+            pdf.close()
+
+    if backend == "pdfminer":
+        from pdfminer.converter import TextConverter
+        from pdfminer.layout import LAParams
+        from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+        from pdfminer.pdfpage import PDFPage
+
+        resource_manager = PDFResourceManager()
+        texts = []
+        with open_pdf_stream(source) as stream:
+            for i, page in enumerate(PDFPage.get_pages(stream)):
+                if i >= stop:
+                    break
+                if i < start:
+                    continue
+
+                output = io.StringIO()
+                device = TextConverter(resource_manager, output, laparams=LAParams())
+                PDFPageInterpreter(resource_manager, device).process_page(page)
+                device.close()
+                texts.append(output.getvalue())
+        return texts
+
+    with open_pdf(source) as reader:
+        pages = reader.pages
+        return [pages[i].extract_text() for i in range(start, stop)]
+
+
+def extract_pages(
+    source: str | bytes, start: int, stop: int, backend: str = "pypdf2"
+) -> list[str]:
+    """pdf의 [start, stop) 범위 페이지를 추출하고 전처리 (프로세스 풀에서 실행)
+
+    Args:
+        source (str | bytes): 파일 경로 또는 pdf 바이트
+        start (int): 시작 페이지 인덱스
+        stop (int): 끝 페이지 인덱스 (미포함)
+        backend (str): get_pdf_backend로 고른 백엔드 이름
+
+    Returns:
+        list[str]: 전처리된 페이지 텍스트 리스트
+    """
+    return preprocessing_texts(extract_raw_pages(source, start, stop, backend))
+
+
+@timed("ingest.parse")
+async def parse_pdf(
+    file: str | UploadFile,
+    on_progress: Callable[[int, int], None] | None = None,
+) -> list[str]:
     """pdf 파일 또는 UploadFile 스트림을 받아서 파싱 리스트 반환
 
+    페이지를 구간으로 나누어 프로세스 풀에서 병렬로 추출하므로 이벤트 루프를
+    막지 않습니다.
+
     Args:
         file (str): 파일명 또는 파일 스트림 객체
+        on_progress (Callable[[int, int], None] | None): (파싱된 페이지 수, 전체 페이지 수) 콜백
 
     Returns:
         list[str]: 파싱 리스트 반환
     """
-    parse_list = []
-
-    pdf: Any
+    source: str | bytes
     # file의 타입에 따라 형식 변경
     if isinstance(file, str):
-        pdf = file
+        source = file
     else:
         await file.seek(0)
-        pdf = file.file
+        source = await file.read()
+        # 다른 함수에서 파일을 다시 읽을 수 있도록 파일 포인터를 초기화합니다.
+        await file.seek(0)
 
-    for page in PyPDF2.PdfReader(pdf).pages:
-        text = page.extract_text()
-        processed_text = preprocessing_text(text=text)
+    backend = get_pdf_backend()
+    total = await run_in_process(count_pages, source, backend)
 
-        parse_list.append(processed_text)
+    parsed = 0
 
-    # 다른 함수에서 파일을 다시 읽을 수 있도록 파일 포인터를 초기화합니다.
-    if not isinstance(file, str):
-        await file.seek(0)
+    async def extract(start: int, stop: int) -> list[str]:
+        nonlocal parsed
+
+        texts = await run_in_process(extract_pages, source, start, stop, backend)
+        parsed += len(texts)
+        if on_progress is not None:
+            on_progress(parsed, total)
+        return texts
+
+    step = max(MIN_PAGES_PER_TASK, -(-total // max(1, INGEST_WORKERS)))
+    parts = await asyncio.gather(
+        *(extract(start, min(start + step, total)) for start in range(0, total, step))
+    )
+
+    return [text for part in parts for text in part]
+
+
+def get_pdf_path(safe_name: str) -> str:
+    """문서의 원본 PDF 경로를 반환
+
+    Args:
+        safe_name (str): 안전한 이름
+
+    Returns:
+        str: 인제스트가 끝난 PDF가 저장되는 경로
+    """
+    return os.path.join(UPLOAD_DIRECTORY, f"{safe_name}.pdf")
 
-    return parse_list
 
+async def save_pdf(file: UploadFile, safe_name: str) -> tuple[str, str]:
+    """UploadFile 객체를 청크 단위로 읽어 서버에 저장하면서 해시를 계산
 
-async def save_pdf(file: UploadFile, safe_name: str) -> None:
-    """UploadFile 객체를 서버에 저장
+    파일 전체를 메모리에 올리지 않고 한 번만 읽으며, 크기 제한을 넘으면 즉시
+    중단합니다. 업로드마다 고유한 임시 파일에 저장하므로 인제스트가 끝나기
+    전까지 기존 PDF는 바뀌지 않습니다. (promote_pdf로 교체)
 
     Args:
         file (UploadFile): 업로드된 파일 객체
         safe_name (str): 저장될 파일명
+
+    Returns:
+        tuple[str, str]: 임시로 저장된 파일 경로와 내용의 sha256 해시
+
+    Raises:
+        UploadTooLargeError: 파일 크기가 MAX_UPLOAD_BYTES를 넘는 경우
     """
+    if file.size is not None and file.size > MAX_UPLOAD_BYTES:
+        raise UploadTooLargeError(file.size)
+
     os.makedirs(UPLOAD_DIRECTORY, exist_ok=True)
-    file_path = os.path.join(UPLOAD_DIRECTORY, safe_name)
+    fd, staged_path = tempfile.mkstemp(
+        prefix=f"{safe_name}.", suffix=".upload", dir=UPLOAD_DIRECTORY
+    )
+
+    digest = hashlib.sha256()
+    written = 0
 
-    # 다른 함수에서 파일을 읽었을 수 있으므로 파일 포인터를 초기화합니다.
     await file.seek(0)
-    with open(file_path + ".pdf", "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    try:
+        with open(fd, "wb") as buffer:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                written += len(chunk)
+                if written > MAX_UPLOAD_BYTES:
+                    raise UploadTooLargeError(written)
+
+                digest.update(chunk)
+                await asyncio.to_thread(buffer.write, chunk)
+    except BaseException:
+        os.remove(staged_path)
+        raise
+
+    return staged_path, digest.hexdigest()
+
+
+def promote_pdf(staged_path: str, safe_name: str) -> str:
+    """인제스트가 끝난 업로드 파일로 문서의 PDF를 교체
+
+    Args:
+        staged_path (str): save_pdf가 저장한 임시 파일 경로
+        safe_name (str): 안전한 이름
+
+    Returns:
+        str: 교체된 PDF 경로
+    """
+    file_path = get_pdf_path(safe_name)
+    if staged_path != file_path:
+        os.replace(staged_path, file_path)
+    return file_path
+
+
+def discard_pdf(staged_path: str, safe_name: str) -> None:
+    """인제스트에 실패한 업로드 파일을 지움 (기존 PDF는 그대로 유지)
+
+    Args:
+        staged_path (str): save_pdf가 저장한 임시 파일 경로
+        safe_name (str): 안전한 이름
+    """
+    if staged_path != get_pdf_path(safe_name) and os.path.exists(staged_path):
+        os.remove(staged_path)
@@ -0,0 +1,280 @@
+import asyncio
+import os
+from collections.abc import Hashable, Sequence
+from typing import TypeVar
+
+from langchain_core.documents import Document
+
+from app.core.env import RETRIEVAL_K, RETRIEVAL_MODE
+from app.db.sparse_db import load_sparse_index, search_sparse_index
+from app.db.text_db import read_text_db
+from app.db.vector_db import VECTOR_DB_DIRECTORY, VectorStore, select_vector_store
+from app.utils.embedding_util import CachedEmbeddings
+from app.utils.langchain_util import get_embedding
+from app.utils.metrics_util import timed
+
+# 융합 전에 각 검색기에서 가져올 후보 수 (k의 배수)
+FETCH_MULTIPLIER = 5
+# Reciprocal Rank Fusion 상수
+RRF_K = 60
+
+K = TypeVar("K", bound=Hashable)
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[K]], rrf_k: int = RRF_K
+) -> list[K]:
+    """여러 검색 결과 순위를 Reciprocal Rank Fusion으로 합치는 함수
+
+    Args:
+        rankings (Sequence[Sequence[K]]): 검색기별 문서 키 순위 리스트
+        rrf_k (int): 상위 순위 가중치를 완화하는 상수
+
+    Returns:
+        list[K]: 융합 점수 순으로 정렬된 문서 키 리스트
+    """
+    scores: dict[K, float] = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking):
+            scores[key] = scores.get(key, 0.0) + 1.0 / (rrf_k + rank + 1)
+
+    return sorted(scores, key=scores.__getitem__, reverse=True)
+
+
+async def search_vector_ids(
+    vector_store: VectorStore, vector: list[float], k: int
+) -> list[tuple[int, float]]:
+    """질문 벡터와 가장 가까운 벡터의 청크 ID와 거리를 반환하는 함수
+
+    Args:
+        vector_store (VectorStore): 벡터 스토어 객체
+        vector (list[float]): 질문 임베딩
+        k (int): 반환할 청크 수
+
+    Returns:
+        list[tuple[int, float]]: 거리 순으로 정렬된 (청크 ID, L2 거리) 리스트
+    """
+    return await asyncio.to_thread(vector_store.search, vector, k)
+
+
+async def search_store(
+    vector_store: VectorStore,
+    safe_name: str,
+    query: str,
+    k: int,
+    mode: str,
+    vector: list[float] | None = None,
+) -> tuple[list[tuple[int, float]], list[tuple[int, float]]]:
+    """스토어 하나에서 벡터 검색과 BM25 검색을 수행하는 함수
+
+    Args:
+        vector_store (VectorStore): 벡터 스토어 객체
+        safe_name (str): 벡터 스토어 이름
+        query (str): 질문
+        k (int): 검색기별로 가져올 후보 수
+        mode (str): 검색 방식 (vector, bm25, hybrid)
+        vector (list[float] | None): 미리 계산한 질문 임베딩, None이면 필요할 때 계산
+
+    Returns:
+        tuple: (벡터 검색 결과, BM25 검색 결과), BM25 인덱스가 없으면 벡터 검색만 수행
+    """
+    sparse_index = None
+    if mode != "vector":
+        sparse_index = load_sparse_index(
+            name=safe_name, path=os.path.join(VECTOR_DB_DIRECTORY, safe_name)
+        )
+
+    vector_hits: list[tuple[int, float]] = []
+    if mode != "bm25" or sparse_index is None:
+        if vector is None:
+            vector = await vector_store.embedding_function.aembed_query(query)
+        vector_hits = await search_vector_ids(vector_store, vector, k)
+
+    sparse_hits: list[tuple[int, float]] = []
+    if sparse_index is not None:
+        sparse_hits = await asyncio.to_thread(
+            search_sparse_index, sparse_index, query, k
+        )
+
+    return vector_hits, sparse_hits
+
+
+@timed("retrieval.single")
+async def retrieve_documents(
+    vector_store: VectorStore,
+    safe_name: str,
+    query: str,
+    k: int = RETRIEVAL_K,
+    mode: str = RETRIEVAL_MODE,
+) -> list[Document]:
+    """질문과 관련된 청크를 검색하는 함수
+
+    hybrid 모드는 벡터 검색과 BM25 검색 결과를 Reciprocal Rank Fusion으로
+    합칩니다. BM25 인덱스가 없는 이전 스토어는 벡터 검색만 사용합니다.
+
+    Args:
+        vector_store (VectorStore): 벡터 스토어 객체
+        safe_name (str): 벡터 스토어 이름
+        query (str): 질문
+        k (int): 반환할 청크 수
+        mode (str): 검색 방식 (vector, bm25, hybrid)
+
+    Returns:
+        list[Document]: 관련도 순으로 정렬된 청크 리스트
+    """
+    fetch_k = k * FETCH_MULTIPLIER if mode == "hybrid" else k
+    vector_hits, sparse_hits = await search_store(
+        vector_store, safe_name, query, fetch_k, mode
+    )
+
+    ids = fuse_hits(vector_hits, sparse_hits, k)
+    return await asyncio.to_thread(vector_store.get_documents, ids)
+
+
+def fuse_hits(
+    vector_hits: list[tuple[int, float]], sparse_hits: list[tuple[int, float]], k: int
+) -> list[int]:
+    """벡터 검색과 BM25 검색 결과를 합쳐 상위 k개 청크 ID를 고르는 함수
+
+    Args:
+        vector_hits (list[tuple[int, float]]): 거리 순 (청크 ID, 거리) 리스트
+        sparse_hits (list[tuple[int, float]]): 점수 순 (청크 ID, 점수) 리스트
+        k (int): 반환할 청크 수
+
+    Returns:
+        list[int]: 융합 순위 상위 k개 청크 ID 리스트
+    """
+    rankings = [
+        [chunk_id for chunk_id, _ in hits] for hits in (vector_hits, sparse_hits)
+    ]
+    return reciprocal_rank_fusion(rankings)[:k]
+
+
+@timed("retrieval.batch")
+async def retrieve_documents_batch(
+    vector_store: VectorStore,
+    safe_name: str,
+    queries: list[str],
+    k: int = RETRIEVAL_K,
+    mode: str = RETRIEVAL_MODE,
+) -> list[list[Document]]:
+    """여러 질문의 관련 청크를 한 스토어에서 한꺼번에 검색하는 함수
+
+    질문 임베딩은 한 번의 배치 호출로 계산하고, FAISS는 질문 행렬 하나로 모든
+    질문을 검색합니다. BM25 인덱스도 한 번만 엽니다.
+
+    Args:
+        vector_store (VectorStore): 벡터 스토어 객체
+        safe_name (str): 벡터 스토어 이름
+        queries (list[str]): 질문 리스트
+        k (int): 질문마다 반환할 청크 수
+        mode (str): 검색 방식 (vector, bm25, hybrid)
+
+    Returns:
+        list[list[Document]]: 질문 순서와 같은 순서의 청크 리스트
+    """
+    fetch_k = k * FETCH_MULTIPLIER if mode == "hybrid" else k
+    sparse_index = None
+    if mode != "vector":
+        sparse_index = load_sparse_index(
+            name=safe_name, path=os.path.join(VECTOR_DB_DIRECTORY, safe_name)
+        )
+
+    vector_hits: list[list[tuple[int, float]]] = [[] for _ in queries]
+    if mode != "bm25" or sparse_index is None:
+        embedding = vector_store.embedding_function
+        if isinstance(embedding, CachedEmbeddings):
+            vectors = await embedding.aembed_queries(queries)
+        else:
+            vectors = list(
+                await asyncio.gather(*(embedding.aembed_query(q) for q in queries))
+            )
+        vector_hits = await asyncio.to_thread(
+            vector_store.search_batch, vectors, fetch_k
+        )
+
+    def search_sparse() -> list[list[tuple[int, float]]]:
+        return [search_sparse_index(sparse_index, query, fetch_k) for query in queries]
+
+    sparse_hits: list[list[tuple[int, float]]] = [[] for _ in queries]
+    if sparse_index is not None:
+        sparse_hits = await asyncio.to_thread(search_sparse)
+
+    def get_documents() -> list[list[Document]]:
+        return [
+            vector_store.get_documents(fuse_hits(vector, sparse, k))
+            for vector, sparse in zip(vector_hits, sparse_hits)
+        ]
+
+    return await asyncio.to_thread(get_documents)
+
+
+@timed("retrieval.across")
+async def retrieve_documents_across(
+    query: str, k: int = RETRIEVAL_K, mode: str = RETRIEVAL_MODE
+) -> list[Document]:
+    """업로드된 모든 문서에서 질문과 관련된 청크를 검색하는 함수
+
+    질문 임베딩을 한 번 계산한 뒤 문서별 스토어를 동시에 검색하고, 벡터 거리 순,
+    스토어별 BM25 순위 순으로 각각 합쳐 Reciprocal Rank Fusion으로 상위 k개를 고릅니다.
+    반환되는 청크의 metadata["source"]에는 원본 파일 이름이 들어갑니다.
+
+    Args:
+        query (str): 질문
+        k (int): 반환할 청크 수
+        mode (str): 검색 방식 (vector, bm25, hybrid)
+
+    Returns:
+        list[Document]: 관련도 순으로 정렬된 청크 리스트
+    """
+    catalog = await read_text_db()
+    if not catalog:
+        return []
+    fetch_k = k * FETCH_MULTIPLIER if mode == "hybrid" else k
+
+    # 모든 스토어가 같은 임베딩 모델을 사용하므로 질문 임베딩은 한 번만 계산합니다.
+    vector = None
+    if mode != "bm25":
+        vector = await (await get_embedding()).aembed_query(query)
+
+    async def search(safe_name: str):
+        vector_store = await select_vector_store(name=safe_name)
+        if vector_store is None:
+            return None, [], []
+        return vector_store, *await search_store(
+            vector_store, safe_name, query, fetch_k, mode, vector
+        )
+
+    results = await asyncio.gather(*(search(safe_name) for _, safe_name in catalog))
+
+    vector_hits = sorted(
+        (distance, i, chunk_id)
+        for i, (_, hits, _) in enumerate(results)
+        for chunk_id, distance in hits
+    )
+    # BM25 점수는 스토어마다 IDF, 평균 길이가 달라 서로 비교할 수 없으므로 스토어 안의
+    # 순위로 번갈아 합치고, 같은 순위끼리는 스토어 최고점으로 정규화한 점수로 정렬합니다.
+    sparse_hits = sorted(
+        (rank, -score / hits[0][1], i, chunk_id)
+        for i, (_, _, hits) in enumerate(results)
+        for rank, (chunk_id, score) in enumerate(hits)
+    )
+    keys = reciprocal_rank_fusion(
+        [
+            [(i, chunk_id) for _, i, chunk_id in vector_hits],
+            [(i, chunk_id) for _, _, i, chunk_id in sparse_hits],
+        ]
+    )[:k]
+
+    def get_documents() -> list[Document]:
+        return [
+            Document(
+                page_content=document.page_content,
+                metadata={**document.metadata, "source": catalog[i][0]},
+            )
+            for i, chunk_id in keys
+            for document in results[i][0].get_documents([chunk_id])
+        ]
+
+    # 청크는 스토어마다 다른 SQLite 파일에 있으므로 한 스레드에서 순서대로 읽습니다.
+    return await asyncio.to_thread(get_documents)
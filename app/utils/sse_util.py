@@ -0,0 +1,110 @@
+import asyncio
+import json
+import time
+from collections.abc import AsyncIterator
+
+
+def format_sse(data: str, event_id: int | None = None, event: str | None = None) -> str:
+    """SSE 프레임 문자열을 만드는 함수
+
+    데이터에 줄바꿈이 있으면 줄마다 data 필드를 나누어 클라이언트가 원문 그대로
+    복원할 수 있게 합니다.
+
+    Args:
+        data (str): 전송할 데이터
+        event_id (int | None): 이벤트 ID (재연결 시 Last-Event-ID로 사용)
+        event (str | None): 이벤트 이름, None이면 기본 message 이벤트
+
+    Returns:
+        str: SSE 프레임
+    """
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event is not None:
+        lines.append(f"event: {event}")
+    lines.extend(f"data: {line}" for line in data.split("\n"))
+
+    return "\n".join(lines) + "\n\n"
+
+
+def format_ndjson(data: dict) -> str:
+    """NDJSON 한 줄을 만드는 함수
+
+    Args:
+        data (dict): 전송할 객체
+
+    Returns:
+        str: 줄바꿈으로 끝나는 JSON 문자열
+    """
+    return json.dumps(data, ensure_ascii=False) + "\n"
+
+
+async def coalesce_deltas(
+    deltas: AsyncIterator[str], flush_ms: int = 0, flush_bytes: int = 0
+) -> AsyncIterator[str]:
+    """모델이 보내는 조각을 시간/크기 기준으로 모아서 내보내는 함수
+
+    flush_ms가 지나면 다음 조각이 도착하지 않아도 모아 둔 조각을 내보내므로,
+    모델이 잠시 멈춰도 이미 받은 텍스트가 늦게 전달되지 않습니다. 둘 다 0이면
+    조각을 받는 즉시 그대로 내보냅니다.
+
+    Args:
+        deltas (AsyncIterator[str]): 모델 응답 조각
+        flush_ms (int): 조각을 모아 보낼 최대 시간(ms), 0이면 사용하지 않음
+        flush_bytes (int): 조각을 모아 보낼 최대 크기(바이트), 0이면 사용하지 않음
+
+    Yields:
+        str: 모은 조각 텍스트
+    """
+    if flush_ms <= 0 and flush_bytes <= 0:
+        async for delta in deltas:
+            yield delta
+        return
+
+    pending: list[str] = []
+    pending_bytes = 0
+    deadline = 0.0
+    # 시간 초과로 기다리기를 멈춰도 다음 조각을 받는 작업은 취소하지 않고 이어서 기다립니다.
+    next_delta: asyncio.Future[str] | None = None
+    try:
+        while True:
+            if next_delta is None:
+                next_delta = asyncio.ensure_future(anext(deltas))
+
+            timeout = None
+            if pending and flush_ms > 0:
+                timeout = max(0.0, deadline - time.monotonic())
+            done, _ = await asyncio.wait({next_delta}, timeout=timeout)
+
+            if done:
+                try:
+                    delta = next_delta.result()
+                except StopAsyncIteration:
+                    break
+                finally:
+                    next_delta = None
+
+                if not pending:
+                    deadline = time.monotonic() + flush_ms / 1000
+                pending.append(delta)
+                pending_bytes += len(delta.encode("utf-8"))
+                if not (
+                    (flush_bytes > 0 and pending_bytes >= flush_bytes)
+                    or (flush_ms > 0 and time.monotonic() >= deadline)
+                ):
+                    continue
+
+            yield "".join(pending)
+            pending.clear()
+            pending_bytes = 0
+    finally:
+        # 읽는 도중에 끝나면 원본 스트림을 닫을 수 있도록 받던 작업이 끝날 때까지 기다립니다.
+        if next_delta is not None:
+            next_delta.cancel()
+            await asyncio.wait({next_delta})
+            if not next_delta.cancelled():
+                next_delta.exception()
+
+    if pending:
+        yield "".join(pending)
@@ -1,5 +1,32 @@
 import re
 
+# 허용 문자(한글, 영문, 숫자, 일부 기호, 공백)가 아닌 문자 구간과 2칸 이상의 공백
+DISALLOWED_PATTERN = re.compile(r"[^ㄱ-ㅎㅏ-ㅣ가-힣a-zA-Z0-9()+\-*/=<>%., ]+")
+SPACES_PATTERN = re.compile(r" {2,}")
+
+# 페이지 전처리용 패턴 (줄바꿈은 남겨 줄/문단 경계를 유지)
+KEEP_LINES_ALLOWED_PATTERN = re.compile(r"[ㄱ-ㅎㅏ-ㅣ가-힣a-zA-Z0-9()+\-*/=<>%., \n]")
+WHITESPACE_RUN_PATTERN = re.compile(r"[ \n]{2,}")
+
+# 여러 페이지를 한 번에 처리할 때의 구분자 (전처리에서 지워지므로 원문과 겹치지 않음)
+PAGE_SEPARATOR = "\0"
+
+
+class _KeepLinesTable(dict):
+    """str.translate용 변환표로, 처음 보는 문자만 허용 여부를 판정해 캐시합니다."""
+
+    def __missing__(self, code: int) -> int | None:
+        value = code if KEEP_LINES_ALLOWED_PATTERN.match(chr(code)) else None
+        self[code] = value
+        return value
+
+
+KEEP_LINES_TABLE = _KeepLinesTable()
+
+
+# 모델 토큰 수 추정용 패턴 (한글 1~2음절, 영문 1~4자, 숫자 1~3자리, 기호 1개가 약 1토큰)
+TOKEN_PATTERN = re.compile(r"[가-힣]{1,2}|[A-Za-z]{1,4}|[0-9]{1,3}|[^\s가-힣A-Za-z0-9]")
+
 
 def preprocessing_text(text: str) -> str:
     """텍스트 전처리 함수
@@ -10,7 +37,76 @@ def preprocessing_text(text: str) -> str:
     Returns:
         str: 전처리된 텍스트
     """
-    text = re.sub(r"[^ㄱ-ㅎㅏ-ㅣ가-힣a-zA-Z0-9()+\-*/=<>%., ]", "", text)
-    text = re.sub(r" {2,}", " ", text)
+    text = DISALLOWED_PATTERN.sub("", text)
+    text = SPACES_PATTERN.sub(" ", text)
 
     return text
+
+
+def squeeze_whitespace(match: re.Match) -> str:
+    """공백/줄바꿈 구간을 공백 하나, 줄바꿈 하나 또는 빈 줄 하나로 줄이는 함수
+
+    Args:
+        match (re.Match): WHITESPACE_RUN_PATTERN에 걸린 구간
+
+    Returns:
+        str: 줄인 구간
+    """
+    newlines = match.group().count("\n")
+    if newlines == 0:
+        return " "
+    return "\n" if newlines == 1 else "\n\n"
+
+
+def preprocessing_page(text: str) -> str:
+    """페이지 텍스트 전처리 함수
+
+    preprocessing_text와 같은 문자를 지우되 줄바꿈은 남기고, 빈 줄은 문단 경계로
+    하나만 남겨 청킹 시 줄/문단 단위로 나눌 수 있게 합니다. 허용되지 않는 문자는
+    str.translate로 지우고, 공백/줄바꿈 구간은 정규식 한 번으로 정리합니다.
+
+    Args:
+        text (str): 전처리할 페이지 텍스트
+
+    Returns:
+        str: 전처리된 페이지 텍스트
+    """
+    text = text.translate(KEEP_LINES_TABLE)
+
+    return WHITESPACE_RUN_PATTERN.sub(squeeze_whitespace, text).strip()
+
+
+def preprocessing_texts(texts: list[str]) -> list[str]:
+    """여러 페이지 텍스트를 한 번에 전처리하는 함수
+
+    페이지마다 허용되지 않는 문자를 지운 뒤 구분자로 이어 붙여 공백 정리를 한 번에
+    처리하고 다시 나눕니다. 결과는 페이지마다 preprocessing_page를 호출한 것과 같습니다.
+
+    Args:
+        texts (list[str]): 전처리할 페이지 텍스트 리스트
+
+    Returns:
+        list[str]: 전처리된 페이지 텍스트 리스트
+    """
+    if not texts:
+        return []
+
+    joined = PAGE_SEPARATOR.join(text.translate(KEEP_LINES_TABLE) for text in texts)
+    joined = WHITESPACE_RUN_PATTERN.sub(squeeze_whitespace, joined)
+
+    return [page.strip() for page in joined.split(PAGE_SEPARATOR)]
+
+
+def count_tokens(text: str) -> int:
+    """텍스트의 모델 토큰 수를 추정하는 함수
+
+    HyperCLOVA X 토크나이저는 API로만 제공되므로 한국어 위주 BPE 토크나이저의
+    평균적인 분할 단위로 근사합니다.
+
+    Args:
+        text (str): 텍스트
+
+    Returns:
+        int: 추정 토큰 수
+    """
+    return len(TOKEN_PATTERN.findall(text))
@@ -0,0 +1,52 @@
+import asyncio
+import multiprocessing
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+from app.core.env import INGEST_WORKERS
+
+process_pool = None
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """CPU 작업용 프로세스 풀 반환
+
+    스레드를 사용하는 서버 프로세스에서 fork 시 교착 상태가 생기지 않도록
+    spawn 방식으로 워커를 생성합니다.
+
+    Returns:
+        ProcessPoolExecutor: 프로세스 풀 객체
+    """
+    global process_pool
+
+    if process_pool is None:
+        process_pool = ProcessPoolExecutor(
+            max_workers=max(1, INGEST_WORKERS),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    return process_pool
+
+
+async def run_in_process(func: Callable[..., Any], *args: Any) -> Any:
+    """함수를 프로세스 풀에서 실행하고 결과를 기다리는 함수
+
+    Args:
+        func (Callable[..., Any]): 모듈 최상위에 정의된(피클 가능한) 함수
+        *args (Any): 함수 인자
+
+    Returns:
+        Any: 함수 실행 결과
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_process_pool(), func, *args)
+
+
+def shutdown_process_pool() -> None:
+    """프로세스 풀을 종료하는 함수"""
+    global process_pool
+
+    if process_pool is not None:
+        process_pool.shutdown(cancel_futures=True)
+        process_pool = None
@@ -0,0 +1,98 @@
+"""FAISS 인덱스 종류(flat, hnsw, ivfpq, sq8)별 recall@k, 검색 지연, 메모리 벤치마크
+
+bge-m3와 같은 1024차원의 정규화된 합성 벡터(군집 분포)를 사용합니다. 인덱스마다
+별도 프로세스에서 생성하여 RSS 증가량이 서로 섞이지 않게 하고, 정답은 같은
+벡터에 대한 정확(brute-force) 검색 결과입니다.
+
+실행: python -m benchmarks.bench_ann_index --vectors 50000 --queries 200
+"""
+
+import argparse
+import multiprocessing
+import os
+import time
+
+import faiss
+import numpy as np
+
+from app.utils.index_util import INDEX_TYPES, build_index, describe_index
+
+
+def get_rss_bytes() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def make_vectors(count: int, dimensions: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(1, count // 100), dimensions))
+    vectors = centers[rng.integers(len(centers), size=count)]
+    vectors += rng.standard_normal((count, dimensions)) * 0.5
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors.astype(np.float32)
+
+
+def run(index_type: str, args: argparse.Namespace) -> dict:
+    faiss.omp_set_num_threads(1)
+    vectors = make_vectors(args.vectors, args.dimensions, seed=0)
+    queries = (
+        vectors[: args.queries]
+        + make_vectors(args.queries, args.dimensions, seed=1) * 0.1
+    )
+
+    rss_before = get_rss_bytes()
+    start = time.perf_counter()
+    index = build_index(vectors, index_type)
+    index.add(vectors)
+    build_seconds = time.perf_counter() - start
+    rss_bytes = get_rss_bytes() - rss_before
+
+    latencies = []
+    found = []
+    for query in queries:
+        start = time.perf_counter()
+        _, ids = index.search(query[None, :], args.k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        found.append(ids[0])
+
+    _, expected = faiss.knn(queries, vectors, args.k)
+    recall = np.mean([len(set(f) & set(e)) / args.k for f, e in zip(found, expected)])
+
+    latencies.sort()
+    return {
+        "type": describe_index(index)["type"],
+        "recall": recall,
+        "p50": latencies[len(latencies) // 2],
+        "p99": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+        "build": build_seconds,
+        "rss_mb": rss_bytes / 1024 / 1024,
+        "estimate_mb": describe_index(index)["bytes"] / 1024 / 1024,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--vectors", type=int, default=50000)
+    parser.add_argument("--dimensions", type=int, default=1024)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--types", nargs="+", default=list(INDEX_TYPES))
+    args = parser.parse_args()
+
+    print(
+        f"{'type':>6} {'recall@k':>9} {'p50(ms)':>8} {'p99(ms)':>8} "
+        f"{'build(s)':>9} {'rss(MB)':>8} {'est(MB)':>8}"
+    )
+    context = multiprocessing.get_context("spawn")
+    for index_type in args.types:
+        with context.Pool(1) as pool:
+            result = pool.apply(run, (index_type, args))
+        print(
+            f"{result['type']:>6} {result['recall']:>9.3f} {result['p50']:>8.3f} "
+            f"{result['p99']:>8.3f} {result['build']:>9.2f} "
+            f"{result['rss_mb']:>8.1f} {result['estimate_mb']:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
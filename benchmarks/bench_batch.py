@@ -0,0 +1,161 @@
+"""/chat 개별 호출과 /chat/batch 비교 벤치마크
+
+가짜 ClovaX/임베딩(LLM_BACKEND=fake)으로 서버를 띄우고 PDF 하나를 올린 뒤, 같은
+질문 목록을 (1) /chat을 concurrency개씩 동시에 호출하는 방식과 (2) /chat/batch 한
+번으로 보내는 방식으로 답변받아 전체 시간, 첫 답변까지의 시간과 임베딩/검색 단계
+호출 수(/metrics)를 비교합니다. 답변 캐시가 섞이지 않도록 두 방식은 서로 다른
+질문을 사용합니다. (pip install fpdf2 필요)
+
+실행: python -m benchmarks.bench_batch --queries 200 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.bench_load import make_pdf, start_server, upload, wait_ready
+
+STAGE_COUNT_PATTERN = re.compile(
+    r'^rag_stage_duration_seconds_count\{stage="([^"]+)"\} (\S+)$', re.MULTILINE
+)
+STAGES = (
+    "embedding.query",
+    "embedding.queries",
+    "vector_db.search",
+    "vector_db.search_batch",
+    "sparse_db.load",
+    "llm.invoke",
+)
+
+
+async def read_stage_counts(client: httpx.AsyncClient) -> dict[str, float]:
+    text = (await client.get("/metrics")).text
+    return {stage: float(count) for stage, count in STAGE_COUNT_PATTERN.findall(text)}
+
+
+def make_queries(codes: list[int], count: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    return [
+        f"PX-{code:05d} 제품의 보증 기간은? ({seed})"
+        for code in rng.sample(codes, min(count, len(codes)))
+    ]
+
+
+async def run_single(
+    client: httpx.AsyncClient, name: str, queries: list[str], concurrency: int
+) -> tuple[float, float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    start = time.perf_counter()
+    first = None
+
+    async def ask(query: str) -> None:
+        nonlocal first
+        async with semaphore:
+            response = await client.get("/chat", params={"name": name, "query": query})
+            response.raise_for_status()
+            if first is None:
+                first = time.perf_counter() - start
+
+    await asyncio.gather(*(ask(query) for query in queries))
+    return time.perf_counter() - start, first or 0.0
+
+
+async def run_batch(
+    client: httpx.AsyncClient, name: str, queries: list[str], concurrency: int
+) -> tuple[float, float]:
+    start = time.perf_counter()
+    first = None
+    answered = 0
+    body = {"name": name, "queries": queries, "concurrency": concurrency}
+    async with client.stream("POST", "/chat/batch", json=body) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if not line:
+                continue
+            if json.loads(line)["status_code"] != 200:
+                raise RuntimeError(f"batch answer failed: {line}")
+            answered += 1
+            if first is None:
+                first = time.perf_counter() - start
+    if answered != len(queries):
+        raise RuntimeError(f"batch returned {answered}/{len(queries)} answers")
+    return time.perf_counter() - start, first or 0.0
+
+
+async def run(args: argparse.Namespace) -> dict:
+    with tempfile.TemporaryDirectory() as data:
+        process, url = start_server(args, data)
+        async with httpx.AsyncClient(base_url=url, timeout=600) as client:
+            try:
+                await wait_ready(client, process)
+
+                name = "batch"
+                path = os.path.join(data, f"{name}.pdf")
+                codes = make_pdf(path, 0, args.pages)
+                await upload(client, path, name, {"upload": [], "ingest": []})
+
+                report = {"config": vars(args)}
+                modes = (("single", run_single, 1), ("batch", run_batch, 2))
+                for mode, runner, seed in modes:
+                    queries = make_queries(codes, args.queries, seed)
+                    before = await read_stage_counts(client)
+                    elapsed, first = await runner(
+                        client, name, queries, args.concurrency
+                    )
+                    after = await read_stage_counts(client)
+                    report[mode] = {
+                        "queries": len(queries),
+                        "seconds": elapsed,
+                        "first_answer_ms": first * 1000,
+                        "queries_per_second": len(queries) / elapsed,
+                        "stage_calls": {
+                            stage: after.get(stage, 0) - before.get(stage, 0)
+                            for stage in STAGES
+                        },
+                    }
+            finally:
+                process.terminate()
+                process.wait()
+
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--first-token-ms", type=float, default=300)
+    parser.add_argument("--tokens-per-second", type=float, default=0)
+    parser.add_argument("--embedding-latency-ms", type=float, default=50)
+    parser.add_argument("--json", default=None, help="결과를 저장할 JSON 경로")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+
+    for mode in ("single", "batch"):
+        result = report[mode]
+        calls = ", ".join(
+            f"{stage}={count:g}" for stage, count in result["stage_calls"].items()
+        )
+        print(
+            f"{mode:>6}: {result['queries']} queries in {result['seconds']:.2f}s "
+            f"({result['queries_per_second']:.1f} q/s), "
+            f"first answer {result['first_answer_ms']:.0f}ms"
+        )
+        print(f"        {calls}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
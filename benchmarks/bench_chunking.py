@@ -0,0 +1,128 @@
+"""청킹 방식별 검색 recall과 프롬프트 크기 벤치마크
+
+계약서 형태의 합성 페이지(조항 제목, 줄바꿈된 문단)에 제품별 보증 기간 문장을
+넣고, 이전 방식(줄바꿈 제거 후 1000자/20자 겹침)과 토큰 기준 구조 인식 청킹으로
+각각 BM25 인덱스를 만들어 비교합니다. 이전 방식의 recall@k 이상을 처음 달성하는
+k와 그때의 질문당 컨텍스트 토큰 수, 그리고 고정 k(--k)에서의 값을 함께 출력합니다.
+
+실행: python -m benchmarks.bench_chunking --pages 200 --queries 200
+"""
+
+import argparse
+import random
+import re
+import tempfile
+import textwrap
+
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from app.db.sparse_db import build_sparse_index, load_sparse_index, search_sparse_index
+from app.utils.langchain_util import split_pages
+from app.utils.text_util import count_tokens, preprocessing_text, preprocessing_texts
+
+SENTENCES = [
+    "본 계약의 당사자는 아래 조건에 따라 제품을 공급하고 대금을 지급한다.",
+    "공급자는 납품 전 품질 검사를 실시하고 그 결과를 구매자에게 통보한다.",
+    "구매자는 검수 완료 후 30일 이내에 대금을 지급하여야 한다.",
+    "천재지변 등 불가항력으로 인한 지연은 책임을 지지 아니한다.",
+    "본 계약에 명시되지 않은 사항은 관련 법령 및 상관례에 따른다.",
+    "계약 기간 중 단가 변경은 양 당사자의 서면 합의로만 가능하다.",
+]
+TITLES = ["목적", "정의", "공급", "검수", "대금", "보증", "해지", "기타"]
+LINE_WIDTH = 40
+MAX_K = 8
+
+
+def make_pages(count: int, seed: int) -> tuple[list[str], dict[int, str]]:
+    rng = random.Random(seed)
+    pages = []
+    facts: dict[int, str] = {}
+    clause = 1
+    for _ in range(count):
+        lines = []
+        for _ in range(rng.randint(2, 4)):
+            paragraph = " ".join(rng.choices(SENTENCES, k=rng.randint(3, 8)))
+            if rng.random() < 0.7:
+                code = len(facts)
+                facts[code] = (
+                    f"제품 코드 PX-{code:05d} 의 보증 기간은 {code % 5 + 1}년이다."
+                )
+                paragraph += " " + facts[code]
+            lines.append(f"제{clause}조 ({rng.choice(TITLES)})")
+            lines.extend(textwrap.wrap(paragraph, width=LINE_WIDTH))
+            lines.append("")
+            clause += 1
+        pages.append("\n".join(lines))
+    return pages, facts
+
+
+def squash(text: str) -> str:
+    return re.sub(r"\s+", "", text)
+
+
+def evaluate(
+    name: str, chunks: list[Document], facts: dict[int, str], codes: list[int]
+) -> tuple[list[float], list[float]]:
+    path = tempfile.mkdtemp()
+    texts = [chunk.page_content for chunk in chunks]
+    build_sparse_index(path, list(enumerate(texts)))
+    index = load_sparse_index(name=name, path=path)
+
+    recalls = [0.0] * MAX_K
+    tokens = [0.0] * MAX_K
+    for code in codes:
+        hits = search_sparse_index(index, f"PX-{code:05d} 제품의 보증 기간은?", MAX_K)
+        expected = squash(facts[code])
+        found = False
+        used = 0
+        for k in range(MAX_K):
+            if k < len(hits):
+                text = texts[hits[k][0]]
+                used += count_tokens(text)
+                found = found or expected in squash(text)
+            recalls[k] += found
+            tokens[k] += used
+
+    return [r / len(codes) for r in recalls], [t / len(codes) for t in tokens]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[64, 128, 256])
+    args = parser.parse_args()
+
+    pages, facts = make_pages(args.pages, seed=0)
+    codes = random.Random(1).sample(sorted(facts), min(args.queries, len(facts)))
+
+    legacy = RecursiveCharacterTextSplitter(
+        chunk_size=1000, chunk_overlap=20
+    ).create_documents([preprocessing_text(page) for page in pages])
+    configs = [("legacy-1000c", legacy)] + [
+        (f"tokens-{size}", split_pages(preprocessing_texts(pages), size, size // 8))
+        for size in args.sizes
+    ]
+
+    baseline, _ = evaluate("legacy-1000c", legacy, facts, codes)
+    target = baseline[args.k - 1]
+    print(f"target recall (legacy @k={args.k}): {target:.3f}")
+    print(
+        f"{'chunking':>14} {'chunks':>7} {'avg tok':>8} {'k':>3} "
+        f"{'recall':>7} {'ctx tok':>8} {'recall@k':>9} {'ctx tok@k':>10}"
+    )
+    for name, chunks in configs:
+        recalls, tokens = evaluate(name, chunks, facts, codes)
+        k = next((k for k in range(MAX_K) if recalls[k] >= target), MAX_K - 1)
+        average = sum(count_tokens(c.page_content) for c in chunks) / len(chunks)
+        print(
+            f"{name:>14} {len(chunks):>7} {average:>8.1f} {k + 1:>3} "
+            f"{recalls[k]:>7.3f} {tokens[k]:>8.1f} "
+            f"{recalls[args.k - 1]:>9.3f} {tokens[args.k - 1]:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
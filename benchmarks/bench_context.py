@@ -0,0 +1,83 @@
+"""컨텍스트 구성(중복 제거, MMR, 토큰 예산 패킹) 전후의 프롬프트 크기 벤치마크
+
+bench_chunking의 합성 계약서 페이지를 토큰 기준으로 청킹하고 BM25로 후보를
+검색한 뒤, 이전 방식(상위 k개 Document repr)과 build_context 결과의 토큰 수,
+정답 문장 포함률, 컨텍스트 구성 시간을 비교합니다. 네트워크 없이 실행되도록
+결정적 가짜 임베딩을 사용하므로 MMR 재정렬은 순위 가중치만 의미가 있습니다.
+
+실행: python -m benchmarks.bench_context --pages 200 --queries 200
+"""
+
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from app.db.sparse_db import build_sparse_index, load_sparse_index, search_sparse_index
+from app.utils.context_util import build_context, get_context_stats
+from app.utils.langchain_util import split_pages
+from app.utils.text_util import count_tokens, preprocessing_texts
+from benchmarks.bench_chunking import make_pages, squash
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--candidates", type=int, default=12)
+    parser.add_argument("--budgets", type=int, nargs="+", default=[256, 512, 768])
+    args = parser.parse_args()
+
+    pages, facts = make_pages(args.pages, seed=0)
+    codes = random.Random(1).sample(sorted(facts), min(args.queries, len(facts)))
+    chunks = split_pages(preprocessing_texts(pages), 128, 32)
+
+    path = tempfile.mkdtemp()
+    build_sparse_index(path, [(i, c.page_content) for i, c in enumerate(chunks)])
+    index = load_sparse_index(name="bench", path=path)
+    embedding = DeterministicFakeEmbedding(size=256)
+
+    candidates = {}
+    for code in codes:
+        hits = search_sparse_index(
+            index, f"PX-{code:05d} 제품의 보증 기간은?", args.candidates
+        )
+        candidates[code] = [chunks[chunk_id] for chunk_id, _ in hits]
+
+    def recall(texts: dict[int, str]) -> float:
+        return sum(squash(facts[c]) in squash(texts[c]) for c in codes) / len(codes)
+
+    # repr은 줄바꿈을 이스케이프하므로 포함률은 본문으로, 토큰 수는 repr로 계산합니다.
+    baseline = {
+        code: " ".join(d.page_content for d in docs[: args.k])
+        for code, docs in candidates.items()
+    }
+    tokens = sum(
+        count_tokens(str(docs[: args.k])) for docs in candidates.values()
+    ) / len(codes)
+    print(f"{'context':>14} {'recall':>7} {'tokens':>8} {'ms/query':>9}")
+    print(
+        f"{f'repr top-{args.k}':>14} {recall(baseline):>7.3f} {tokens:>8.1f} {'-':>9}"
+    )
+
+    for budget in args.budgets:
+        before = get_context_stats()
+        contexts = {}
+        start = time.perf_counter()
+        for code, docs in candidates.items():
+            contexts[code], _ = await build_context(docs, embedding, budget=budget)
+        elapsed = (time.perf_counter() - start) * 1000 / len(codes)
+        stats = get_context_stats()
+        tokens = (stats["context_tokens"] - before["context_tokens"]) / len(codes)
+        print(
+            f"{f'packed-{budget}':>14} {recall(contexts):>7.3f} {tokens:>8.1f} "
+            f"{elapsed:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,66 @@
+"""업로드 파싱 중 이벤트 루프 지연(lag) 측정
+
+같은 PDF를 (1) 이벤트 루프에서 직접 파싱할 때와 (2) parse_pdf(프로세스 풀)로
+파싱할 때, 10ms 주기 타이머가 얼마나 늦게 깨어나는지 비교합니다.
+
+실행: python -m benchmarks.bench_event_loop_lag --pdf sample.pdf
+"""
+
+import argparse
+import asyncio
+import time
+
+from app.utils.pdf_util import count_pages, extract_pages, parse_pdf
+from app.utils.worker_util import shutdown_process_pool
+
+TICK = 0.01
+
+
+async def measure_lag(work) -> tuple[float, float, float]:
+    lags: list[float] = []
+    running = True
+
+    async def ticker() -> None:
+        while running:
+            start = time.perf_counter()
+            await asyncio.sleep(TICK)
+            lags.append(time.perf_counter() - start - TICK)
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(TICK * 2)
+
+    start = time.perf_counter()
+    await work()
+    elapsed = time.perf_counter() - start
+
+    running = False
+    await task
+
+    lags.sort()
+    return elapsed, lags[len(lags) // 2] * 1000, lags[-1] * 1000
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pdf", required=True)
+    args = parser.parse_args()
+
+    async def inline() -> None:
+        extract_pages(args.pdf, 0, count_pages(args.pdf))
+
+    async def pooled() -> None:
+        await parse_pdf(file=args.pdf)
+
+    # 워커 프로세스 기동 시간은 측정에서 제외합니다.
+    await pooled()
+
+    print(f"{'mode':>8} {'parse(s)':>9} {'p50 lag(ms)':>12} {'max lag(ms)':>12}")
+    for mode, work in (("inline", inline), ("pool", pooled)):
+        elapsed, p50, worst = await measure_lag(work)
+        print(f"{mode:>8} {elapsed:>9.3f} {p50:>12.1f} {worst:>12.1f}")
+
+    shutdown_process_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,49 @@
+"""청크 개수에 따른 FAISS 인덱스 생성 시간 벤치마크
+
+네트워크 없이 측정할 수 있도록 결정적(deterministic) 가짜 임베딩을 사용합니다.
+
+실행: python -m benchmarks.bench_index_build --counts 100 1000 5000
+"""
+
+import argparse
+import time
+
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+
+def make_chunks(count: int) -> list[Document]:
+    return [
+        Document(page_content=f"제{i}조 테스트 문서의 {i}번째 청크입니다. 내용 {i * 7}")
+        for i in range(count)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--counts", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--dimensions", type=int, default=1024)
+    args = parser.parse_args()
+
+    embedding = DeterministicFakeEmbedding(size=args.dimensions)
+
+    print(f"{'chunks':>8} {'build(s)':>10} {'add 10%(s)':>11} {'chunks/s':>10}")
+    for count in args.counts:
+        chunks = make_chunks(count)
+
+        start = time.perf_counter()
+        store = FAISS.from_documents(documents=chunks, embedding=embedding)
+        build = time.perf_counter() - start
+
+        # 10% 분량을 기존 인덱스에 증분 추가하는 시간
+        extra = make_chunks(max(1, count // 10))
+        start = time.perf_counter()
+        store.add_documents(documents=extra)
+        add = time.perf_counter() - start
+
+        print(f"{count:>8} {build:>10.3f} {add:>11.3f} {count / build:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
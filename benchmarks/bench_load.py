@@ -0,0 +1,340 @@
+"""/upload, /chat, /stream 동시 부하 테스트
+
+가짜 ClovaX/임베딩(LLM_BACKEND=fake)으로 서버를 별도 프로세스에서 띄우고
+(데이터 파일은 임시 디렉토리 사용), PDF를 동시에 업로드해 인제스트를 기다린 뒤
+여러 사용자가 /chat과 /stream을 섞어 호출합니다. 엔드포인트별 처리량, p50/p99
+지연, /stream의 TTFB(첫 바이트)와 첫 토큰 시간, 서버 RSS를 출력합니다.
+--json으로 결과를 저장하고 --max-p99-ms를 넘으면 종료 코드 1을 반환하므로 CI에서
+회귀를 확인할 수 있습니다. --url을 주면 이미 떠 있는 서버를 대상으로 합니다.
+(pip install fpdf2 필요)
+
+실행: python -m benchmarks.bench_load --users 16 --queries 400 --uploads 4
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+from fpdf import FPDF
+
+SENTENCE = (
+    "Clause {clause}. The supplier delivers product PX-{code:05d} "
+    "(warranty {years} years) within 30 days. "
+)
+
+
+def make_pdf(path: str, index: int, pages: int) -> list[int]:
+    pdf = FPDF()
+    pdf.set_font("helvetica", size=9)
+    codes = []
+    for p in range(pages):
+        pdf.add_page()
+        lines = []
+        for i in range(20):
+            code = (index * pages + p) * 20 + i
+            codes.append(code)
+            lines.append(SENTENCE.format(clause=i, code=code, years=code % 5 + 1))
+        pdf.multi_cell(0, 4, "".join(lines))
+    pdf.output(path)
+    return codes
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def read_rss(pid: int) -> dict[str, int]:
+    # /proc/<pid>/status의 VmRSS(현재), VmHWM(최대) (kB, 리눅스 전용)
+    rss = {}
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in ("VmRSS", "VmHWM"):
+                    rss[key] = int(value.split()[0])
+    except OSError:
+        pass
+    return rss
+
+
+def serve(port: int, data: str) -> None:
+    # 서버 프로세스: 데이터 파일 경로를 임시 디렉토리로 바꾼 뒤 실행합니다.
+    import uvicorn
+
+    import app.db.embedding_db as embedding_db
+    import app.db.job_db as job_db
+    import app.db.session_db as session_db
+    import app.db.state_db as state_db
+    import app.db.text_db as text_db
+    import app.db.vector_db as vector_db
+    import app.services.file_service as file_service
+    import app.utils.pdf_util as pdf_util
+    import app.utils.retrieval_util as retrieval_util
+    import main
+
+    text_db.CATALOG_DB_PATH = os.path.join(data, "text_db.sqlite3")
+    text_db.DB_FILE_PATH = os.path.join(data, "text_db.txt")
+    embedding_db.EMBEDDING_DB_PATH = os.path.join(data, "embedding_cache.sqlite3")
+    job_db.JOB_DB_PATH = os.path.join(data, "job_db.sqlite3")
+    session_db.SESSION_DB_PATH = os.path.join(data, "session_db.sqlite3")
+    state_db.STATE_DB_PATH = os.path.join(data, "state_db.sqlite3")
+    vector_db.VECTOR_DB_DIRECTORY = retrieval_util.VECTOR_DB_DIRECTORY = os.path.join(
+        data, "vector_db"
+    )
+    pdf_util.UPLOAD_DIRECTORY = file_service.UPLOAD_DIRECTORY = os.path.join(
+        data, "uploaded_files"
+    )
+
+    uvicorn.run(main.app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def start_server(args: argparse.Namespace, data: str) -> tuple[subprocess.Popen, str]:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+
+    env = {
+        **os.environ,
+        "LLM_BACKEND": "fake",
+        "FAKE_LLM_FIRST_TOKEN_MS": str(args.first_token_ms),
+        "FAKE_LLM_TOKENS_PER_SECOND": str(args.tokens_per_second),
+        "FAKE_EMBEDDING_LATENCY_MS": str(args.embedding_latency_ms),
+    }
+    process = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.bench_load", "--serve", str(port), data],
+        env=env,
+    )
+    return process, f"http://127.0.0.1:{port}"
+
+
+async def wait_ready(client: httpx.AsyncClient, process: subprocess.Popen | None):
+    for _ in range(600):
+        if process is not None and process.poll() is not None:
+            raise RuntimeError("server exited")
+        try:
+            if (await client.get("/")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+
+async def upload(
+    client: httpx.AsyncClient, path: str, name: str, results: dict
+) -> None:
+    start = time.perf_counter()
+    with open(path, "rb") as f:
+        response = await client.post(
+            "/upload", files={"file": (f"{name}.pdf", f, "application/pdf")}
+        )
+    results["upload"].append(time.perf_counter() - start)
+    response.raise_for_status()
+
+    job_id = response.json()["job_id"]
+    while True:
+        job = (await client.get(f"/jobs/{job_id}")).json()["data"]
+        if job["stage"] in ("done", "failed"):
+            break
+        await asyncio.sleep(0.05)
+    if job["stage"] == "failed":
+        raise RuntimeError(f"ingest failed: {job['error']}")
+    results["ingest"].append(time.perf_counter() - start)
+
+
+async def chat(client: httpx.AsyncClient, params: dict, results: dict) -> None:
+    start = time.perf_counter()
+    response = await client.get("/chat", params=params)
+    response.raise_for_status()
+    results["chat"].append(time.perf_counter() - start)
+
+
+async def stream(client: httpx.AsyncClient, params: dict, results: dict) -> None:
+    start = time.perf_counter()
+    first_byte = first_token = None
+    event = None
+    async with client.stream("GET", "/stream", params=params) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if first_byte is None:
+                first_byte = time.perf_counter() - start
+            if line.startswith("event: "):
+                event = line[len("event: ") :]
+            elif line == "":
+                event = None
+            elif (
+                line.startswith("data: ")
+                and event is None
+                and first_token is None
+                and line != "data: [DONE]"
+            ):
+                first_token = time.perf_counter() - start
+    results["stream"].append(time.perf_counter() - start)
+    results["stream_ttfb"].append(first_byte or 0.0)
+    results["stream_first_token"].append(first_token or 0.0)
+
+
+async def run(args: argparse.Namespace) -> dict:
+    with tempfile.TemporaryDirectory() as data:
+        process = None
+        url = args.url
+        if url is None:
+            process, url = start_server(args, data)
+        pid = process.pid if process is not None else args.pid
+
+        limits = httpx.Limits(max_connections=args.users * 2)
+        async with httpx.AsyncClient(
+            base_url=url, timeout=300, limits=limits
+        ) as client:
+            try:
+                await wait_ready(client, process)
+                rss_idle = read_rss(pid) if pid else {}
+                results: dict[str, list[float]] = {
+                    key: []
+                    for key in (
+                        "upload",
+                        "ingest",
+                        "chat",
+                        "stream",
+                        "stream_ttfb",
+                        "stream_first_token",
+                    )
+                }
+
+                # 업로드 단계: 문서를 동시에 올리고 인제스트 완료까지 기다립니다.
+                names = [f"load{i}" for i in range(args.uploads)]
+                codes: list[tuple[str, int]] = []
+                for i, name in enumerate(names):
+                    path = os.path.join(data, f"{name}.pdf")
+                    codes.extend((name, c) for c in make_pdf(path, i, args.pages))
+                start = time.perf_counter()
+                await asyncio.gather(
+                    *(
+                        upload(client, os.path.join(data, f"{n}.pdf"), n, results)
+                        for n in names
+                    )
+                )
+                upload_elapsed = time.perf_counter() - start
+
+                # 질문 단계: 사용자 수만큼 동시에 /chat, /stream을 섞어 호출합니다.
+                rng = random.Random(0)
+                queue: asyncio.Queue = asyncio.Queue()
+                for i in range(args.queries):
+                    name, code = rng.choice(codes)
+                    # --repeat 비율만큼은 이전 질문을 반복해 답변 캐시 경로도 측정
+                    if i and rng.random() < args.repeat:
+                        name, code = rng.choice(codes[: max(1, i // 4)])
+                    params = {
+                        "query": f"PX-{code:05d} 제품의 보증 기간은?",
+                        "session_id": f"user{i % args.users}",
+                    }
+                    if not args.all_documents:
+                        params["name"] = name
+                    queue.put_nowait(
+                        (stream if rng.random() < args.stream_ratio else chat, params)
+                    )
+
+                async def user() -> None:
+                    while not queue.empty():
+                        request, params = queue.get_nowait()
+                        await request(client, params, results)
+
+                start = time.perf_counter()
+                await asyncio.gather(*(user() for _ in range(args.users)))
+                query_elapsed = time.perf_counter() - start
+
+                rss_loaded = read_rss(pid) if pid else {}
+            finally:
+                if process is not None:
+                    process.terminate()
+                    process.wait()
+
+    return {
+        "config": vars(args),
+        "upload_seconds": upload_elapsed,
+        "query_seconds": query_elapsed,
+        "pages_per_second": args.uploads * args.pages / upload_elapsed,
+        "queries_per_second": args.queries / query_elapsed,
+        "latency_ms": {
+            key: {
+                "count": len(values),
+                "p50": percentile(values, 0.5) * 1000,
+                "p99": percentile(values, 0.99) * 1000,
+            }
+            for key, values in results.items()
+        },
+        "rss_kb": {"idle": rss_idle, "loaded": rss_loaded},
+    }
+
+
+def main() -> None:
+    if len(sys.argv) == 4 and sys.argv[1] == "--serve":
+        serve(int(sys.argv[2]), sys.argv[3])
+        return
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default=None, help="이미 떠 있는 서버 주소")
+    parser.add_argument("--pid", type=int, default=None, help="--url 서버의 PID")
+    parser.add_argument("--users", type=int, default=16)
+    parser.add_argument("--queries", type=int, default=400)
+    parser.add_argument("--uploads", type=int, default=4)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--stream-ratio", type=float, default=0.5)
+    parser.add_argument("--repeat", type=float, default=0.0)
+    parser.add_argument("--all-documents", action="store_true")
+    parser.add_argument("--first-token-ms", type=float, default=300)
+    parser.add_argument("--tokens-per-second", type=float, default=50)
+    parser.add_argument("--embedding-latency-ms", type=float, default=50)
+    parser.add_argument("--json", default=None, help="결과를 저장할 JSON 경로")
+    parser.add_argument("--max-p99-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+
+    print(
+        f"upload: {report['upload_seconds']:.2f}s "
+        f"({report['pages_per_second']:.1f} pages/s), "
+        f"queries: {report['query_seconds']:.2f}s "
+        f"({report['queries_per_second']:.1f} req/s)"
+    )
+    print(f"{'endpoint':>20} {'count':>6} {'p50(ms)':>9} {'p99(ms)':>9}")
+    for key, latency in report["latency_ms"].items():
+        print(
+            f"{key:>20} {latency['count']:>6} "
+            f"{latency['p50']:>9.1f} {latency['p99']:>9.1f}"
+        )
+    for phase, rss in report["rss_kb"].items():
+        if rss:
+            print(
+                f"rss {phase}: {rss.get('VmRSS', 0) / 1024:.1f} MiB "
+                f"(peak {rss.get('VmHWM', 0) / 1024:.1f} MiB)"
+            )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.max_p99_ms is not None:
+        slow = [
+            key
+            for key in ("chat", "stream")
+            if report["latency_ms"][key]["p99"] > args.max_p99_ms
+        ]
+        if slow:
+            print(f"p99 over {args.max_p99_ms}ms: {', '.join(slow)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""PDF 텍스트 추출 백엔드별 파싱 속도(pages/sec) 벤치마크
+
+fpdf2로 여러 개의 PDF를 생성한 뒤 설치된 백엔드마다 같은 코퍼스를 파싱합니다.
+단일 프로세스 추출(extract_pages)과 프로세스 풀을 사용하는 parse_pdf를 각각
+측정하고, 전처리만의 처리량도 함께 출력합니다. (pip install fpdf2 필요)
+
+실행: python -m benchmarks.bench_pdf_parse --files 10 --pages 50
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import os
+import tempfile
+import time
+
+from fpdf import FPDF
+
+from app.utils import pdf_util
+from app.utils.pdf_util import (
+    PDF_BACKEND_MODULES,
+    count_pages,
+    extract_pages,
+    extract_raw_pages,
+    parse_pdf,
+)
+from app.utils.text_util import preprocessing_texts
+from app.utils.worker_util import shutdown_process_pool
+
+SENTENCE = (
+    "Clause {clause}. The supplier delivers product PX-{code:05d} "
+    "(warranty {years} years) within 30 days, fee = 1,200 + 10%. "
+)
+
+
+def make_corpus(directory: str, files: int, pages: int) -> list[str]:
+    paths = []
+    for f in range(files):
+        pdf = FPDF()
+        pdf.set_font("helvetica", size=9)
+        for p in range(pages):
+            pdf.add_page()
+            pdf.multi_cell(
+                0,
+                4,
+                "".join(
+                    SENTENCE.format(
+                        clause=i, code=(f * pages + p) * 30 + i, years=i % 5 + 1
+                    )
+                    for i in range(30)
+                ),
+            )
+        path = os.path.join(directory, f"doc{f}.pdf")
+        pdf.output(path)
+        paths.append(path)
+    return paths
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=10)
+    parser.add_argument("--pages", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = make_corpus(directory, args.files, args.pages)
+        total = args.files * args.pages
+
+        backends = [
+            backend
+            for backend, module in PDF_BACKEND_MODULES.items()
+            if importlib.util.find_spec(module) is not None
+        ]
+
+        # 프로세스 풀 생성 비용이 첫 백엔드 측정에 섞이지 않도록 미리 띄웁니다.
+        await parse_pdf(paths[0])
+
+        print(f"{'backend':>10} {'serial(p/s)':>12} {'pool(p/s)':>10}")
+        raw_pages: list[str] = []
+        for backend in backends:
+            start = time.perf_counter()
+            for path in paths:
+                pages = count_pages(path, backend)
+                extract_pages(path, 0, pages, backend)
+            serial = total / (time.perf_counter() - start)
+
+            pdf_util.PDF_BACKEND = backend
+            start = time.perf_counter()
+            for path in paths:
+                await parse_pdf(path)
+            pool = total / (time.perf_counter() - start)
+
+            print(f"{backend:>10} {serial:>12.1f} {pool:>10.1f}")
+            if not raw_pages:
+                raw_pages = extract_raw_pages(paths[0], 0, args.pages, backend)
+
+        start = time.perf_counter()
+        for _ in range(20):
+            preprocessing_texts(raw_pages)
+        elapsed = time.perf_counter() - start
+        print(f"preprocessing: {20 * len(raw_pages) / elapsed:.0f} pages/s")
+
+    shutdown_process_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,121 @@
+"""수정된 PDF 재업로드(증분 인제스트) 벤치마크
+
+가짜 ClovaX/임베딩(LLM_BACKEND=fake)으로 서버를 띄우고 --pages 쪽 PDF를 올린 뒤,
+--changed 쪽을 고치고 한 쪽을 끼워 넣은 개정판을 같은 이름으로 다시 올립니다.
+같은 개정판을 새 이름으로 올린 전체 인제스트(임베딩 캐시는 채워진 상태)와 비교해
+시간, 다시 임베딩한 청크 수, 재사용한 페이지 수를 출력합니다. (pip install fpdf2 필요)
+
+실행: python -m benchmarks.bench_reingest --pages 500 --changed 5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+import httpx
+from fpdf import FPDF
+
+from benchmarks.bench_load import SENTENCE, start_server, wait_ready
+
+
+def make_manual(path: str, pages: int, revised: set[int], inserted: int | None):
+    pdf = FPDF()
+    pdf.set_font("helvetica", size=9)
+    for p in range(pages):
+        if p == inserted:
+            pdf.add_page()
+            pdf.multi_cell(
+                0, 4, "Inserted notice: all warranty claims need a receipt. " * 20
+            )
+        pdf.add_page()
+        revision = " (revised)" if p in revised else ""
+        lines = [
+            SENTENCE.format(clause=i, code=p * 20 + i, years=(p + i) % 5 + 1) + revision
+            for i in range(20)
+        ]
+        pdf.multi_cell(0, 4, "".join(lines))
+    pdf.output(path)
+
+
+async def ingest(client: httpx.AsyncClient, path: str, name: str) -> dict:
+    start = time.perf_counter()
+    with open(path, "rb") as f:
+        response = await client.post(
+            "/upload", files={"file": (f"{name}.pdf", f, "application/pdf")}
+        )
+    response.raise_for_status()
+
+    job_id = response.json()["job_id"]
+    while True:
+        job = (await client.get(f"/jobs/{job_id}")).json()["data"]
+        if job["stage"] in ("done", "failed"):
+            break
+        await asyncio.sleep(0.05)
+    if job["stage"] == "failed":
+        raise RuntimeError(f"ingest failed: {job['error']}")
+
+    return {
+        "seconds": time.perf_counter() - start,
+        "pages": job["pages_total"],
+        "chunks_embedded": job["chunks_total"],
+        "pages_reused": job["pages_reused"],
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    with tempfile.TemporaryDirectory() as data:
+        original = os.path.join(data, "original.pdf")
+        revised = os.path.join(data, "revised.pdf")
+        make_manual(original, args.pages, set(), None)
+        make_manual(
+            revised,
+            args.pages,
+            set(range(0, args.pages, max(1, args.pages // max(1, args.changed)))),
+            args.pages // 2,
+        )
+
+        process, url = start_server(args, data)
+        async with httpx.AsyncClient(base_url=url, timeout=600) as client:
+            try:
+                await wait_ready(client, process)
+                return {
+                    "config": vars(args),
+                    "initial": await ingest(client, original, "manual"),
+                    "incremental": await ingest(client, revised, "manual"),
+                    "full": await ingest(client, revised, "manual-full"),
+                }
+            finally:
+                process.terminate()
+                process.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--changed", type=int, default=5)
+    parser.add_argument("--first-token-ms", type=float, default=0)
+    parser.add_argument("--tokens-per-second", type=float, default=0)
+    parser.add_argument("--embedding-latency-ms", type=float, default=50)
+    parser.add_argument("--json", default=None, help="결과를 저장할 JSON 경로")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+
+    for mode in ("initial", "incremental", "full"):
+        result = report[mode]
+        print(
+            f"{mode:>11}: {result['seconds']:.2f}s, {result['pages']} pages, "
+            f"{result['chunks_embedded']} chunks embedded, "
+            f"{result['pages_reused']} pages reused"
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""검색 방식(vector, bm25, hybrid)별 recall@k와 지연 시간 벤치마크
+
+각 청크에 고유한 조항 번호/제품 코드를 넣고, 그 코드를 포함한 질문으로 정답
+청크를 찾는 비율을 측정합니다. 네트워크 없이 실행되도록 결정적 가짜 임베딩을
+사용하므로 vector 모드의 recall은 의미 검색 성능이 아니라 하한선입니다.
+
+실행: python -m benchmarks.bench_retrieval --chunks 5000 --queries 200
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+import faiss
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from app.db.chunk_db import CHUNK_DB_FILE_NAME, ChunkStore
+from app.db.vector_db import VectorStore, open_vector_store, save_vector_store
+from app.utils import retrieval_util
+from app.utils.retrieval_util import retrieve_documents
+
+FILLER = "본 계약의 당사자는 아래 조건에 따라 제품을 공급하고 대금을 지급한다"
+
+
+def make_corpus(count: int) -> list[str]:
+    return [
+        f"제{i}조 {FILLER}. 제품 코드 PX-{i:05d} 의 보증 기간은 {i % 5 + 1}년이다."
+        for i in range(count)
+    ]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=4)
+    args = parser.parse_args()
+
+    texts = make_corpus(args.chunks)
+    embedding = DeterministicFakeEmbedding(size=256)
+
+    retrieval_util.VECTOR_DB_DIRECTORY = tempfile.mkdtemp()
+    path = os.path.join(retrieval_util.VECTOR_DB_DIRECTORY, "bench")
+    os.makedirs(path)
+    store = VectorStore(
+        index=faiss.IndexIDMap(faiss.IndexFlatL2(256)),
+        chunks=ChunkStore(os.path.join(path, CHUNK_DB_FILE_NAME)),
+        embedding_function=embedding,
+    )
+    store.add(
+        [Document(page_content=t) for t in texts], embedding.embed_documents(texts)
+    )
+    await save_vector_store(path=path, store=store)
+    store = open_vector_store(path, embedding)
+
+    targets = random.Random(0).sample(range(args.chunks), args.queries)
+    print(f"{'mode':>8} {'recall@k':>9} {'p50(ms)':>8} {'p99(ms)':>8}")
+    for mode in ("vector", "bm25", "hybrid"):
+        hits = 0
+        latencies = []
+        for target in targets:
+            expected = texts[target]
+            start = time.perf_counter()
+            documents = await retrieve_documents(
+                vector_store=store,
+                safe_name="bench",
+                query=f"PX-{target:05d} 제품의 보증 기간은?",
+                k=args.k,
+                mode=mode,
+            )
+            latencies.append((time.perf_counter() - start) * 1000)
+            hits += any(d.page_content == expected for d in documents)
+
+        latencies.sort()
+        p50 = latencies[len(latencies) // 2]
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(f"{mode:>8} {hits / len(targets):>9.3f} {p50:>8.2f} {p99:>8.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
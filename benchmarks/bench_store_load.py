@@ -0,0 +1,111 @@
+"""벡터 스토어 형식별 로드 시간과 메모리 벤치마크
+
+이전 형식(langchain FAISS.save_local, pickle docstore)과 현재 형식(mmap 인덱스 +
+SQLite 청크)을 같은 청크로 저장한 뒤, 각각 새 프로세스에서 열어 로드 시간, RSS
+증가량, 첫 검색(top-k 청크 읽기 포함) 시간을 측정합니다.
+
+실행: python -m benchmarks.bench_store_load --counts 1000 10000 50000
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import tempfile
+import time
+
+import faiss
+import numpy as np
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from langchain_core.embeddings import FakeEmbeddings
+
+from app.db.chunk_db import CHUNK_DB_FILE_NAME, ChunkStore
+from app.db.vector_db import VectorStore, open_vector_store, save_vector_store
+
+FILLER = "본 계약의 당사자는 아래 조건에 따라 제품을 공급하고 대금을 지급한다. " * 10
+
+
+def get_rss_bytes() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def build(path: str, count: int, dimensions: int) -> None:
+    documents = [
+        Document(page_content=f"제{i}조 {FILLER}", metadata={"page": i // 10})
+        for i in range(count)
+    ]
+    vectors = np.random.default_rng(0).random((count, dimensions), dtype=np.float32)
+
+    FAISS.from_embeddings(
+        text_embeddings=[(d.page_content, v) for d, v in zip(documents, vectors)],
+        embedding=FakeEmbeddings(size=dimensions),
+        metadatas=[d.metadata for d in documents],
+    ).save_local(os.path.join(path, "legacy"))
+
+    os.makedirs(os.path.join(path, "current"))
+    store = VectorStore(
+        index=faiss.IndexIDMap(faiss.IndexFlatL2(dimensions)),
+        chunks=ChunkStore(os.path.join(path, "current", CHUNK_DB_FILE_NAME)),
+        embedding_function=FakeEmbeddings(size=dimensions),
+    )
+    store.add(documents, vectors.tolist())
+    asyncio.run(save_vector_store(path=os.path.join(path, "current"), store=store))
+
+
+def load(path: str, store_format: str, dimensions: int, k: int) -> tuple:
+    embedding = FakeEmbeddings(size=dimensions)
+    query = embedding.embed_query("보증 기간")
+
+    rss_before = get_rss_bytes()
+    start = time.perf_counter()
+    if store_format == "legacy":
+        legacy_store = FAISS.load_local(
+            os.path.join(path, "legacy"),
+            embedding,
+            allow_dangerous_deserialization=True,
+        )
+    else:
+        store = open_vector_store(os.path.join(path, "current"), embedding)
+    load_seconds = time.perf_counter() - start
+    rss_bytes = get_rss_bytes() - rss_before
+
+    start = time.perf_counter()
+    if store_format == "legacy":
+        legacy_store.similarity_search_by_vector(query, k=k)
+    else:
+        store.get_documents([chunk_id for chunk_id, _ in store.search(query, k)])
+    search_seconds = time.perf_counter() - start
+
+    return load_seconds, rss_bytes, search_seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--counts", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--dimensions", type=int, default=1024)
+    parser.add_argument("--k", type=int, default=4)
+    args = parser.parse_args()
+
+    print(
+        f"{'chunks':>8} {'format':>8} {'load(ms)':>9} {'rss(MB)':>8} "
+        f"{'search(ms)':>11}"
+    )
+    context = multiprocessing.get_context("spawn")
+    for count in args.counts:
+        with tempfile.TemporaryDirectory() as path:
+            build(path, count, args.dimensions)
+            for store_format in ("legacy", "current"):
+                with context.Pool(1) as pool:
+                    load_seconds, rss_bytes, search_seconds = pool.apply(
+                        load, (path, store_format, args.dimensions, args.k)
+                    )
+                print(
+                    f"{count:>8} {store_format:>8} {load_seconds * 1000:>9.1f} "
+                    f"{rss_bytes / 1024 / 1024:>8.1f} {search_seconds * 1000:>11.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""/stream SSE 응답의 첫 바이트 시간(TTFB)과 전체 스트림 시간 벤치마크
+
+install_fake_clients로 ClovaX/임베딩을 가짜 객체로 바꾸고 검색 단계와 체인을
+고정된 답변으로 대신해 네트워크 없이 측정합니다. legacy는 이전 구현처럼 글자마다
+20ms를 쉬는 방식입니다.
+
+실행: python -m benchmarks.bench_stream --chars 500 --token-chars 4 --token-ms 30
+"""
+
+import argparse
+import asyncio
+import time
+from types import SimpleNamespace
+
+from app.db.vector_db import VectorStore
+from app.services import file_service
+from app.utils.langchain_util import install_fake_clients
+
+
+def install_fakes(answer: str, token_chars: int, token_ms: float) -> None:
+    install_fake_clients()
+
+    class FakeChain:
+        async def astream(self, inputs, config=None):
+            for i in range(0, len(answer), token_chars):
+                await asyncio.sleep(token_ms / 1000)
+                yield SimpleNamespace(content=answer[i : i + token_chars])
+
+    async def fake_scope(name: str | None) -> tuple[str, VectorStore | None] | None:
+        return "bench", None
+
+    async def fake_context(
+        name: str | None, safe_name: str, vector_store: VectorStore | None, query: str
+    ) -> tuple[str, list[str]]:
+        return "", ["bench"]
+
+    async def fake_chain() -> FakeChain:
+        return FakeChain()
+
+    async def no_answer(safe_name: str, query: str) -> None:
+        return None
+
+    async def skip_save(
+        safe_name: str, query: str, answer: str, sources: list[str] | None = None
+    ) -> None:
+        return None
+
+    async def skip_history(session_id: str, query: str, response: str) -> None:
+        return None
+
+    file_service.find_search_scope = fake_scope
+    file_service.retrieve_context = fake_context
+    file_service.get_chain_clovaX = fake_chain
+    # 모드마다 실제 스트리밍을 측정하도록 답변 캐시와 대화 기록은 사용하지 않습니다.
+    file_service.find_answer = no_answer
+    file_service.save_answer = skip_save
+    file_service.add_to_history = skip_history
+
+
+async def legacy_stream(frames):
+    # 이전 구현: 받은 조각을 글자 단위로 나누어 글자마다 20ms 대기
+    async for frame in frames:
+        if frame.startswith("id:") and "[DONE]" not in frame:
+            text = frame.split("data: ", 1)[1].rstrip("\n")
+            for t in text:
+                yield f"data: {t}\n\n"
+                await asyncio.sleep(0.02)
+        else:
+            yield frame
+
+
+async def measure(stream) -> tuple[float, float, int, int]:
+    start = time.perf_counter()
+    ttfb = None
+    frames = 0
+    size = 0
+    async for frame in stream:
+        if ttfb is None:
+            ttfb = time.perf_counter() - start
+        frames += 1
+        size += len(frame.encode("utf-8"))
+    return ttfb, time.perf_counter() - start, frames, size
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chars", type=int, default=500)
+    parser.add_argument("--token-chars", type=int, default=4)
+    parser.add_argument("--token-ms", type=float, default=30)
+    args = parser.parse_args()
+
+    install_fakes(
+        "가나다라 마바사" * (args.chars // 8 + 1), args.token_chars, args.token_ms
+    )
+
+    def chat_stream(flush_ms: int = 0, flush_bytes: int = 0):
+        return file_service.chat_stream_service(
+            name="bench",
+            query="q",
+            session_id="bench",
+            flush_ms=flush_ms,
+            flush_bytes=flush_bytes,
+        )
+
+    modes = {
+        "legacy": lambda: legacy_stream(chat_stream()),
+        "immediate": lambda: chat_stream(),
+        "flush 100ms": lambda: chat_stream(flush_ms=100),
+        "flush 256B": lambda: chat_stream(flush_bytes=256),
+    }
+
+    print(f"{'mode':>12} {'ttfb(ms)':>9} {'total(s)':>9} {'frames':>7} {'bytes':>7}")
+    for mode, stream in modes.items():
+        ttfb, total, frames, size = await measure(stream())
+        print(f"{mode:>12} {ttfb * 1000:>9.1f} {total:>9.2f} {frames:>7} {size:>7}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
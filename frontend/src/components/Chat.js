@@ -1,5 +1,8 @@
 import React, { useState, useRef, useEffect } from 'react';
 
+// 스트리밍 응답 표시 속도 (ms/글자), 0이면 받는 즉시 표시
+const PACE_MS = 0;
+
 const Chat = ({ selectedFile }) => {
   const [query, setQuery] = useState('');
   const [isLoading, setIsLoading] = useState(false);
@@ -39,34 +42,78 @@ const Chat = ({ selectedFile }) => {
       const url = `http://127.0.0.1:8000/stream?name=${encodeURIComponent(selectedFile)}&query=${encodeURIComponent(query)}&session_id=${sessionIdRef.current}`;
       const eventSource = new EventSource(url);
 
-      let aiMessage = ''; // 스트리밍 중인 AI 메시지 누적
+      // 마지막 AI 메시지에 텍스트 추가 (없으면 새로 추가)
+      const appendToAiMessage = (text) => {
+        setMessages((prev) => {
+          if (prev.length > 0 && prev[prev.length - 1].role === 'ai') {
+            const updated = [...prev];
+            updated[updated.length - 1] = {
+              ...updated[updated.length - 1],
+              content: updated[updated.length - 1].content + text,
+            };
+            return updated;
+          }
+          return [...prev, { role: 'ai', content: text }];
+        });
+      };
+
+      // PACE_MS > 0 이면 받은 텍스트를 한 글자씩 천천히 표시합니다.
+      let pending = '';
+      let done = false;
+      const paceTimer =
+        PACE_MS > 0
+          ? setInterval(() => {
+              if (pending) {
+                appendToAiMessage(pending[0]);
+                pending = pending.slice(1);
+              } else if (done) {
+                clearInterval(paceTimer);
+                setIsLoading(false);
+              }
+            }, PACE_MS)
+          : null;
 
       eventSource.onmessage = (event) => {
         console.debug('SSE message:', event.data);
         if (event.data === '[DONE]') {
           eventSource.close();
+          done = true;
           // 최종 완료 시 로딩 해제만 수행 (실시간으로 이미 메시지를 반영함)
-          setIsLoading(false);
-          aiMessage = '';
+          if (!paceTimer) {
+            setIsLoading(false);
+          }
+        } else if (paceTimer) {
+          pending += event.data;
         } else {
-          aiMessage += event.data;
-          // 실시간으로 마지막 AI 메시지 업데이트 (없으면 새로 추가)
-          setMessages((prev) => {
-            if (prev.length > 0 && prev[prev.length - 1].role === 'ai') {
-              const updated = [...prev];
-              updated[updated.length - 1] = {
-                ...updated[updated.length - 1],
-                content: updated[updated.length - 1].content + event.data,
-              };
-              return updated;
-            }
-            return [...prev, { role: 'ai', content: event.data }];
-          });
+          appendToAiMessage(event.data);
         }
       };
 
+      // 서버가 입장 제어로 요청을 거절한 경우 (재연결하지 않고 스트림을 닫음)
+      eventSource.addEventListener('rejected', (event) => {
+        console.debug('SSE rejected:', event.data);
+        eventSource.close();
+        if (paceTimer) {
+          clearInterval(paceTimer);
+        }
+        let detail = 'The server is busy.';
+        let retryAfter = null;
+        try {
+          const data = JSON.parse(event.data);
+          detail = data.detail || detail;
+          retryAfter = data.retry_after;
+        } catch (parseErr) {
+          console.error('SSE rejected parse error:', parseErr);
+        }
+        setError(retryAfter ? `${detail} Please retry in ${Math.ceil(retryAfter)}s.` : detail);
+        setIsLoading(false);
+      });
+
       eventSource.onerror = (err) => {
         console.error('SSE Error:', err);
+        if (paceTimer) {
+          clearInterval(paceTimer);
+        }
         setError('Stream connection error.');
         eventSource.close();
         setIsLoading(false);
@@ -30,11 +30,29 @@ const FileUpload = ({ onUploadSuccess }) => {
 
       const data = await response.json();
 
-      if (response.ok) {
-        setMessage(`File uploaded successfully: ${data.detail}`);
-        onUploadSuccess();
-      } else {
+      if (!response.ok) {
         setMessage(`Error: ${data.detail}`);
+      } else {
+        // 업로드는 바로 작업 ID를 반환하므로 인제스트가 끝날 때까지 상태를 조회합니다.
+        while (true) {
+          const jobResponse = await fetch(`http://127.0.0.1:8000/jobs/${data.job_id}`);
+          const job = (await jobResponse.json()).data;
+
+          if (!jobResponse.ok || job.stage === 'failed') {
+            setMessage(`Error: ${job ? job.error : 'job not found'}`);
+            break;
+          }
+          if (job.stage === 'done') {
+            setMessage('File uploaded successfully');
+            onUploadSuccess();
+            break;
+          }
+
+          setMessage(
+            `${job.stage}... pages ${job.pages_parsed}/${job.pages_total}, chunks ${job.chunks_embedded}/${job.chunks_total}`
+          );
+          await new Promise((resolve) => setTimeout(resolve, 1000));
+        }
       }
     } catch (error) {
       setMessage(`Error: ${error.message}`);
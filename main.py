@@ -1,17 +1,102 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from starlette.status import HTTP_413_REQUEST_ENTITY_TOO_LARGE
 
+from app.core.env import KEEP_WARM_INTERVAL_SECONDS, MAX_UPLOAD_BYTES
 from app.routers.file_router import router as f_router
+from app.services.job_service import start_job_workers, stop_job_workers
+from app.services.state_service import sync_shared_state
+from app.utils.admission_util import AdmissionRejectedError
+from app.utils.langchain_util import keep_clients_warm, warmup_clients
+from app.utils.metrics_util import REQUEST_METRIC, TRACE_ID_HEADER, observe, start_trace
+from app.utils.worker_util import shutdown_process_pool
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await warmup_clients()
+    keep_warm = None
+    if KEEP_WARM_INTERVAL_SECONDS > 0:
+        keep_warm = asyncio.create_task(
+            keep_clients_warm(interval=KEEP_WARM_INTERVAL_SECONDS)
+        )
+    await start_job_workers()
+
+    yield
+
+    await stop_job_workers()
+    if keep_warm is not None:
+        keep_warm.cancel()
+    shutdown_process_pool()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+@app.exception_handler(AdmissionRejectedError)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejectedError):
+    # 클라이언트가 다시 시도할 시점을 Retry-After 헤더로 알려줍니다.
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": exc.detail},
+        headers={"Retry-After": str(int(exc.retry_after))},
+    )
+
+
+@app.middleware("http")
+async def sync_worker_state(request: Request, call_next):
+    # 다른 워커에서 삭제/재업로드된 문서의 캐시를 요청 처리 전에 비웁니다.
+    await sync_shared_state()
+    return await call_next(request)
+
+
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    # 본문을 읽기 전에 Content-Length로 큰 업로드를 먼저 거절합니다.
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit():
+        if int(content_length) > MAX_UPLOAD_BYTES:
+            return JSONResponse(
+                status_code=HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                content={"detail": "업로드 파일이 너무 큽니다."},
+            )
+    return await call_next(request)
+
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    # 요청마다 트레이스 ID를 정하고(클라이언트가 보낸 값 우선) 응답 헤더로 돌려줍니다.
+    trace_id = start_trace(request.headers.get(TRACE_ID_HEADER))
+    start = time.perf_counter()
+    response = await call_next(request)
+
+    # 경로 파라미터로 라벨이 늘어나지 않도록 라우트 템플릿을 사용합니다.
+    route = request.scope.get("route")
+    observe(
+        REQUEST_METRIC,
+        time.perf_counter() - start,
+        method=request.method,
+        route=getattr(route, "path", "unmatched"),
+        status=str(response.status_code),
+    )
+    response.headers[TRACE_ID_HEADER] = trace_id
+    return response
 
-app = FastAPI()
 
+# CORS 미들웨어를 마지막에 추가하여 413 응답에도 CORS 헤더가 붙도록 합니다.
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[TRACE_ID_HEADER],
 )
 
 app.include_router(router=f_router)
@@ -0,0 +1,22 @@
+import os
+
+import uvicorn
+
+from app.core.env import SERVER_HOST, SERVER_PORT, SERVER_WORKERS
+
+if __name__ == "__main__":
+    workers = max(1, SERVER_WORKERS)
+
+    if workers > 1:
+        # 워커 프로세스가 같은 대화 기록을 보도록 세션은 SQLite에 저장합니다.
+        if os.environ.setdefault("SESSION_BACKEND", "sqlite") != "sqlite":
+            print(
+                "SESSION_BACKEND=memory는 워커마다 세션이 달라지므로 sqlite를 사용합니다."
+            )
+            os.environ["SESSION_BACKEND"] = "sqlite"
+        # 워커마다 파싱 프로세스 풀을 만들므로 CPU 수를 워커 수로 나눕니다.
+        os.environ.setdefault(
+            "INGEST_WORKERS", str(max(1, (os.cpu_count() or 1) // workers))
+        )
+
+    uvicorn.run("main:app", host=SERVER_HOST, port=SERVER_PORT, workers=workers)